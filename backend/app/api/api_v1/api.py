@@ -1,18 +1,50 @@
+from dataclasses import dataclass
+from importlib import import_module
+
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import items, login, pdf_processing, products, users, utils
 from app.core.config import settings
 
-api_router = APIRouter()
-api_router.include_router(login.router, tags=["login"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
-api_router.include_router(items.router, prefix="/items", tags=["items"])
-api_router.include_router(pdf_processing.router, prefix="/pdf", tags=["pdf-processing"])
-api_router.include_router(products.router, prefix="/products", tags=["products"])
 
-# Include private routes only in local environment
-if settings.ENVIRONMENT == "local":
-    from app.api.api_v1.endpoints import private
+@dataclass(frozen=True)
+class EndpointRouter:
+    """An endpoint module of app.api.api_v1.endpoints and where to mount it."""
+
+    module: str
+    prefix: str
+    tag: str
+    enabled: bool = True
+
+
+# Modules of disabled routers are never imported, so optional subsystems
+# cost no import time or memory in the processes that do not serve them
+ENDPOINT_ROUTERS = [
+    EndpointRouter("login", "", "login"),
+    EndpointRouter("users", "/users", "users"),
+    EndpointRouter("utils", "/utils", "utils"),
+    EndpointRouter("email_utils", "/utils", "utils", enabled=settings.emails_enabled),
+    EndpointRouter("items", "/items", "items"),
+    EndpointRouter("pdf_processing", "/pdf", "pdf-processing"),
+    EndpointRouter("products", "/products", "products"),
+    EndpointRouter("analytics", "/analytics", "analytics"),
+    # Private routes exist only in the local environment
+    EndpointRouter(
+        "private", "/private", "private", enabled=settings.ENVIRONMENT == "local"
+    ),
+]
+
+
+def build_api_router(endpoint_routers: list[EndpointRouter]) -> APIRouter:
+    """Import the enabled endpoint modules and mount their routers."""
+    api_router = APIRouter()
+    for endpoint in endpoint_routers:
+        if not endpoint.enabled:
+            continue
+        module = import_module(f"app.api.api_v1.endpoints.{endpoint.module}")
+        api_router.include_router(
+            module.router, prefix=endpoint.prefix, tags=[endpoint.tag]
+        )
+    return api_router
+
 
-    api_router.include_router(private.router, prefix="/private", tags=["private"])
+api_router = build_api_router(ENDPOINT_ROUTERS)
@@ -0,0 +1,123 @@
+from collections.abc import AsyncIterator
+from datetime import date
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app import crud
+from app.api import deps
+from app.core.db import async_session
+from app.models import User
+from app.models.product import ProductCategory
+from app.schemas.analytics import (
+    PeriodBasket,
+    PeriodPrice,
+    PeriodSpending,
+    StoreSpending,
+    TimeBucket,
+)
+
+router = APIRouter()
+
+
+def stream_rows(statement: Select[Any], model: type[BaseModel]) -> StreamingResponse:
+    """
+    Respond with the rows of a statement as a JSON array, written as they are
+    read from a server-side cursor, so no result is held in memory whole.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        # Dependency sessions are closed before the body is sent
+        async with async_session() as session:
+            result = await session.stream(statement)
+            separator = b"["
+            async for row in result.mappings():
+                item = model.model_validate(dict(row))
+                yield separator + item.model_dump_json().encode()
+                separator = b","
+            yield b"[]" if separator == b"[" else b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+@router.get(
+    "/spending/stores",
+    response_class=StreamingResponse,
+    responses={200: {"model": list[StoreSpending]}},
+)
+async def get_spending_by_store(
+    current_user: User = Depends(deps.get_current_active_user_async),
+    start: date | None = None,
+    end: date | None = None,
+) -> StreamingResponse:
+    """Receipts, items and amount spent per store, biggest spend first."""
+    statement = crud.analytics.spending_by_store(
+        user_id=current_user.id, start=start, end=end
+    )
+    return stream_rows(statement, StoreSpending)
+
+
+@router.get(
+    "/spending/periods",
+    response_class=StreamingResponse,
+    responses={200: {"model": list[PeriodSpending]}},
+)
+async def get_spending_by_period(
+    current_user: User = Depends(deps.get_current_active_user_async),
+    bucket: TimeBucket = TimeBucket.MONTH,
+    category: ProductCategory | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> StreamingResponse:
+    """Receipts, items and amount spent per day, week, month... oldest first."""
+    statement = crud.analytics.spending_by_period(
+        user_id=current_user.id, bucket=bucket, category=category, start=start, end=end
+    )
+    return stream_rows(statement, PeriodSpending)
+
+
+@router.get(
+    "/baskets",
+    response_class=StreamingResponse,
+    responses={200: {"model": list[PeriodBasket]}},
+)
+async def get_baskets(
+    current_user: User = Depends(deps.get_current_active_user_async),
+    bucket: TimeBucket = TimeBucket.MONTH,
+    start: date | None = None,
+    end: date | None = None,
+) -> StreamingResponse:
+    """Average number of items and amount per receipt, per time bucket."""
+    statement = crud.analytics.basket_by_period(
+        user_id=current_user.id, bucket=bucket, start=start, end=end
+    )
+    return stream_rows(statement, PeriodBasket)
+
+
+@router.get(
+    "/products/{product_id}/prices",
+    response_class=StreamingResponse,
+    responses={200: {"model": list[PeriodPrice]}},
+)
+async def get_price_history(
+    product_id: int,
+    current_user: User = Depends(deps.get_current_active_user_async),
+    bucket: TimeBucket = TimeBucket.MONTH,
+    start: date | None = None,
+    end: date | None = None,
+) -> StreamingResponse:
+    """
+    Unit price paid for a product per time bucket, with the average of the
+    bucket before to show the change.
+    """
+    statement = crud.analytics.price_history(
+        user_id=current_user.id,
+        product_id=product_id,
+        bucket=bucket,
+        start=start,
+        end=end,
+    )
+    return stream_rows(statement, PeriodPrice)
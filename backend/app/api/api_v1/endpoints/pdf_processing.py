@@ -1,303 +1,512 @@
 import logging
 import traceback
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Row
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.api import deps
-from app.core.db import get_db
-from app.models import User
+from app.core.config import settings
+from app.core.db import get_async_db, get_db, run_sync
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
+from app.models import (
+    DuplicateUploadPolicy,
+    ExtractedData,
+    JobStatus,
+    PDFDocument,
+    User,
+)
 from app.schemas.pdf_document import (
+    DocumentView,
     ExtractedDataResponse,
+    PDFBatchUploadItem,
+    PDFBatchUploadResponse,
+    PDFDocumentSummary,
     PDFDocumentWithDataResponse,
     PDFProcessingStatus,
     PDFSearchRequest,
     PDFSearchResponse,
     PDFUploadResponse,
+    ProcessingBatchStatus,
 )
-from app.services.file_storage import file_storage
-from app.services.pdf_processor import pdf_processor
+from app.services.file_storage import StoredFile, file_storage
 from app.services.product_integration import product_integration
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-async def process_pdf_background(document_id: int, file_path: str):
-    """Background task to process PDF and extract data."""
-    from sqlmodel import Session
-
-    from app.core.db import engine
-
-    with Session(engine) as db:
-        try:
-
-            # Get the document
-            document = crud.pdf_document.get(db, id=document_id)
-            if not document:
-                return
-
-
-            # Read the PDF file
-            pdf_content = file_storage.read_file(file_path)
-
-            # Process the PDF
-            try:
-                extracted_info = pdf_processor.process_receipt(pdf_content)
-            except Exception as process_error:
-                raise process_error
-
-            # Convert date objects to strings for database storage
-            if extracted_info.get('transaction_date') and hasattr(extracted_info['transaction_date'], 'isoformat'):
-                extracted_info['transaction_date'] = extracted_info['transaction_date'].isoformat()
-
-            # Convert Decimal objects to float for JSON serialization
-            for key in ['subtotal', 'tax_amount', 'total_amount']:
-                if extracted_info.get(key) is not None:
-                    try:
-                        extracted_info[key] = float(extracted_info[key])
-                    except (TypeError, ValueError) as e:
-                        extracted_info[key] = None
-
-            # Ensure items is a list
-            if extracted_info.get('items') is None:
-                extracted_info['items'] = []
-
-            # Ensure tax_breakdown is a dict
-            if extracted_info.get('tax_breakdown') is None:
-                extracted_info['tax_breakdown'] = {}
-
-            # Save extracted data
-            from app.models.extracted_data import ExtractedDataCreate
+def _extracted_data_response(data: ExtractedData) -> ExtractedDataResponse:
+    assert data.id is not None
+    return ExtractedDataResponse(
+        id=data.id,
+        document_id=data.document_id,
+        store_name=data.store_name,
+        store_address=data.store_address,
+        store_phone=data.store_phone,
+        receipt_number=data.receipt_number,
+        cashier_id=data.cashier_id,
+        register_number=data.register_number,
+        transaction_date=data.transaction_date.isoformat() if data.transaction_date else None,
+        transaction_time=data.transaction_time,
+        subtotal=data.subtotal,
+        tax_amount=data.tax_amount,
+        total_amount=data.total_amount,
+        payment_method=data.payment_method,
+        items=data.items,
+        tax_breakdown=data.tax_breakdown,
+        extraction_confidence=data.extraction_confidence,
+        extra_metadata=data.extra_metadata,
+        created_at=data.created_at,
+        updated_at=data.updated_at
+    )
 
-            extracted_data_create = ExtractedDataCreate(
-                document_id=document_id,
-                **extracted_info
-            )
 
+def _document_response(document: PDFDocument) -> PDFDocumentWithDataResponse:
+    """Build the response for a document whose extracted data is already loaded."""
+    assert document.id is not None
+    return PDFDocumentWithDataResponse(
+        id=document.id,
+        filename=document.filename,
+        original_filename=document.original_filename,
+        file_size=document.file_size,
+        content_type=document.content_type,
+        processed=document.processed,
+        processing_error=document.processing_error,
+        content_hash=document.content_hash,
+        created_at=document.created_at,
+        updated_at=document.updated_at,
+        owner_id=document.owner_id,
+        extracted_data=[
+            _extracted_data_response(data)
+            for data in document.extracted_data
+            if data.id is not None
+        ]
+    )
 
-            try:
-                extracted_data_record = crud.extracted_data.create(db, obj_in=extracted_data_create)
-            except Exception as db_error:
-                raise db_error
 
-            # Process products from receipt items
-            try:
-                _product_results = product_integration.process_receipt_items(
-                    db, extracted_data_record, document.owner_id, auto_create_products=True
-                )
-            except Exception:
-                # Continue processing even if product matching fails
-                pass
-            
-            # Mark document as processed
-            try:
-                crud.pdf_document.mark_as_processed(db, document_id=document_id)
-            except Exception:
-                # Rollback and try again with a fresh transaction
-                db.rollback()
-                try:
-                    crud.pdf_document.mark_as_processed(db, document_id=document_id)
-                except Exception:
-                    pass
-
-
-        except Exception as e:
-            # Mark document as processed with error
-            try:
-                db.rollback()  # Rollback any failed transaction first
-                crud.pdf_document.mark_as_processed(db, document_id=document_id, error=str(e))
-            except Exception:
-                # Try one more time with a completely fresh session
-                try:
-                    with Session(engine) as fresh_db:
-                        crud.pdf_document.mark_as_processed(fresh_db, document_id=document_id, error=str(e))
-                except Exception:
-                    pass
+def _summary_response(row: Row[Any]) -> PDFDocumentSummary:
+    return PDFDocumentSummary.model_validate(row._mapping)
 
 
 @router.post("/upload", response_model=PDFUploadResponse)
 async def upload_pdf(
     *,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
     file: UploadFile = File(...)
 ) -> Any:
     """
     Upload a PDF document for processing.
+
+    The file is streamed to storage on the event loop, database and file
+    system calls run in the threadpool.
     """
+    stored: StoredFile | None = None
     try:
-        # Save the file
-        filename, file_path, file_size = await file_storage.save_file(file, str(current_user.id))
-
-        # Create database record
-        from app.models.pdf_document import PDFDocument
-
-        document = PDFDocument(
-            filename=filename,
-            original_filename=file.filename or "unknown.pdf",
-            file_size=file_size,
-            content_type=file.content_type or "application/pdf",
-            file_path=file_path,
-            owner_id=current_user.id
+        # Save the file, identical content is stored only once
+        stored = await file_storage.save_file(file)
+        return await run_in_threadpool(
+            _create_document,
+            db,
+            current_user,
+            stored,
+            file.filename or "unknown.pdf",
+            file.content_type or "application/pdf",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error uploading PDF")
+    finally:
+        if stored:
+            await run_in_threadpool(file_storage.discard, stored)
+
+
+def _create_document(
+    db: Session,
+    current_user: User,
+    stored: StoredFile,
+    original_filename: str,
+    content_type: str,
+) -> PDFUploadResponse:
+    """Insert and queue the document of a single upload, or link a duplicate."""
+    existing = crud.pdf_document.get_by_owner_and_hash(
+        db, owner_id=current_user.id, content_hash=stored.content_hash
+    )
+    if (
+        existing
+        and existing.id is not None
+        and current_user.duplicate_upload_policy
+        == DuplicateUploadPolicy.LINK_EXISTING
+    ):
+        return PDFUploadResponse(
+            message="PDF was already uploaded, linked to the existing document",
+            document_id=existing.id,
+            filename=existing.filename,
+            processing_status="completed" if existing.processed else "queued",
+            duplicate_of=existing.id,
         )
 
-        db.add(document)
-        db.commit()
-        db.refresh(document)
+    # The lock keeps the file until the document below is committed
+    crud.pdf_document.lock_file_paths(db, file_paths=[stored.file_path])
+    file_storage.place(stored)
+
+    # Create database record
+    document = PDFDocument(
+        filename=stored.filename,
+        original_filename=original_filename,
+        file_size=stored.file_size,
+        content_type=content_type,
+        file_path=stored.file_path,
+        content_hash=stored.content_hash,
+        owner_id=current_user.id
+    )
 
-        # Ensure document ID is not None after commit
-        if document.id is None:
-            raise HTTPException(status_code=500, detail="Failed to create document")
+    db.add(document)
+    db.flush()
 
-        # Queue background processing
-        background_tasks.add_task(process_pdf_background, document.id, file_path)
+    # Ensure document ID is not None after flush
+    if document.id is None:
+        raise HTTPException(status_code=500, detail="Failed to create document")
 
+    # A previous upload of the same file was already extracted, reuse it
+    cached = None
+    if existing:
+        cached = crud.extracted_data.get_latest_by_content_hash(
+            db, owner_id=current_user.id, content_hash=stored.content_hash
+        )
+    if cached:
+        document.processed = True
+        db.add(document)
+        crud.extracted_data.copy_to_document(
+            db, source=cached, document_id=document.id
+        )
         return PDFUploadResponse(
-            message="PDF uploaded successfully and queued for processing",
+            message="PDF was already uploaded, reused the existing extraction",
             document_id=document.id,
-            filename=filename,
-            processing_status="queued"
+            filename=document.filename,
+            processing_status="completed",
+            duplicate_of=existing.id if existing else None,
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Error uploading PDF")
+    # Queue processing in the same transaction, picked up by app/worker.py
+    crud.processing_job.enqueue(db, document_id=document.id, commit=False)
+    db.commit()
+    db.refresh(document)
+
+    return PDFUploadResponse(
+        message="PDF uploaded successfully and queued for processing",
+        document_id=document.id,
+        filename=document.filename,
+        processing_status="queued",
+        duplicate_of=existing.id if existing else None,
+    )
 
 
-@router.get("/documents", response_model=list[PDFDocumentWithDataResponse])
-def get_user_documents(
+@router.post("/upload/batch", response_model=PDFBatchUploadResponse)
+async def upload_pdf_batch(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100
+    files: list[UploadFile] = File(...)
 ) -> Any:
     """
-    Get all PDF documents for the current user with extracted data.
+    Upload many PDF documents, or ZIP archives of PDFs, in one request.
+
+    Files are streamed to storage one at a time, all documents are inserted
+    with a single statement and queued as one batch. Poll
+    /pdf/batches/{batch_id} for progress. A file that fails validation is
+    reported in the response without failing the rest of the batch. Database
+    and file system calls run in the threadpool, off the event loop.
     """
-    documents = crud.pdf_document.get_by_owner(
-        db, owner_id=current_user.id, skip=skip, limit=limit
+    max_files = settings.PDF_BATCH_MAX_FILES
+    if len(files) > max_files:
+        raise HTTPException(
+            status_code=400, detail=f"Too many files. Maximum is {max_files}"
+        )
+
+    # Stream every file (and every PDF inside ZIP archives) to storage
+    uploads: list[tuple[str, StoredFile | HTTPException]] = []
+    try:
+        for file in files:
+            name = file.filename or "unknown.pdf"
+            if file_storage.is_zip(file):
+                uploads.extend(
+                    await file_storage.save_zip(
+                        file, max_entries=max_files - len(uploads)
+                    )
+                )
+            else:
+                try:
+                    uploads.append((name, await file_storage.save_file(file)))
+                except HTTPException as e:
+                    uploads.append((name, e))
+            if len(uploads) > max_files:
+                raise HTTPException(
+                    status_code=400, detail=f"Too many files. Maximum is {max_files}"
+                )
+        return await run_in_threadpool(_create_batch, db, current_user, uploads)
+    finally:
+        # Uploads that did not become documents leave no temp files behind
+        await run_in_threadpool(_discard_uploads, uploads)
+
+
+def _discard_uploads(uploads: list[tuple[str, StoredFile | HTTPException]]) -> None:
+    for _, stored in uploads:
+        if isinstance(stored, StoredFile):
+            file_storage.discard(stored)
+
+
+def _create_batch(
+    db: Session,
+    current_user: User,
+    uploads: list[tuple[str, StoredFile | HTTPException]],
+) -> PDFBatchUploadResponse:
+    """Insert and queue the documents of a batch upload in one transaction."""
+    stored_files = [stored for _, stored in uploads if isinstance(stored, StoredFile)]
+    content_hashes = list({stored.content_hash for stored in stored_files})
+    existing = crud.pdf_document.get_by_owner_and_hashes(
+        db, owner_id=current_user.id, content_hashes=content_hashes
+    )
+    link_existing = (
+        current_user.duplicate_upload_policy == DuplicateUploadPolicy.LINK_EXISTING
     )
+    cached: dict[str, ExtractedData] = {}
+    if not link_existing:
+        cached = crud.extracted_data.get_latest_by_content_hashes(
+            db, owner_id=current_user.id, content_hashes=list(existing)
+        )
+
+    items: list[PDFBatchUploadItem] = []
+    rows: list[dict[str, Any]] = []
+    # Index into ``rows`` for each item that becomes a new document
+    row_of_item: dict[int, int] = {}
+    # First new row per content hash, for duplicates within the batch
+    row_of_hash: dict[str, int] = {}
+    duplicate_row_of_item: dict[int, int] = {}
+    now = datetime.utcnow()
+
+    for name, stored in uploads:
+        item = PDFBatchUploadItem(filename=name)
+        items.append(item)
+        if isinstance(stored, HTTPException):
+            item.error = str(stored.detail)
+            continue
 
-    # Load extracted data for each document and convert to proper format
-    result = []
-    for document in documents:
-        # Load extracted data for this document
-        if document.id is not None:
-            extracted_data = crud.extracted_data.get_by_document(db, document_id=document.id)
+        existing_document = existing.get(stored.content_hash)
+        if link_existing and existing_document:
+            item.document_id = item.duplicate_of = existing_document.id
+            item.processing_status = (
+                "completed" if existing_document.processed else "queued"
+            )
+            continue
+        if link_existing and stored.content_hash in row_of_hash:
+            duplicate_row_of_item[len(items) - 1] = row_of_hash[stored.content_hash]
+            continue
+
+        if existing_document:
+            item.duplicate_of = existing_document.id
+        row_of_hash.setdefault(stored.content_hash, len(rows))
+        row_of_item[len(items) - 1] = len(rows)
+        rows.append({
+            "filename": stored.filename,
+            "original_filename": name,
+            "file_size": stored.file_size,
+            "content_type": "application/pdf",
+            "file_path": stored.file_path,
+            "content_hash": stored.content_hash,
+            # Reused extraction results need no processing
+            "processed": stored.content_hash in cached,
+            "processing_error": None,
+            "owner_id": current_user.id,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    # Files of new documents are placed under lock, until the commit below
+    new_paths = {row["file_path"] for row in rows}
+    crud.pdf_document.lock_file_paths(db, file_paths=new_paths)
+    for stored in stored_files:
+        if stored.file_path in new_paths:
+            file_storage.place(stored)
+    document_ids = crud.pdf_document.create_many(db, documents=rows)
+
+    queued_ids: list[int] = []
+    reused_ids: list[int] = []
+    for row, document_id in zip(rows, document_ids, strict=True):
+        source = cached.get(row["content_hash"])
+        if source:
+            crud.extracted_data.copy_to_document(
+                db, source=source, document_id=document_id, commit=False
+            )
+            reused_ids.append(document_id)
         else:
-            extracted_data = []
-
-        # Convert to response format
-        response_data: dict[str, Any] = {
-            "id": document.id,
-            "filename": document.filename,
-            "original_filename": document.original_filename,
-            "file_size": document.file_size,
-            "content_type": document.content_type,
-            "processed": document.processed,
-            "processing_error": document.processing_error,
-            "created_at": document.created_at,
-            "updated_at": document.updated_at,
-            "owner_id": document.owner_id,
-            "extracted_data": []
-        }
+            queued_ids.append(document_id)
+
+    batch_id = None
+    if document_ids:
+        batch = crud.processing_job.enqueue_batch(
+            db,
+            owner_id=current_user.id,
+            document_ids=queued_ids,
+            completed_document_ids=reused_ids,
+        )
+        batch_id = batch.id
+    db.commit()
+
+    for index, row_index in row_of_item.items():
+        items[index].document_id = document_ids[row_index]
+        items[index].processing_status = (
+            "completed" if rows[row_index]["processed"] else "queued"
+        )
+    for index, row_index in duplicate_row_of_item.items():
+        items[index].document_id = items[index].duplicate_of = document_ids[row_index]
+        items[index].processing_status = (
+            "completed" if rows[row_index]["processed"] else "queued"
+        )
+
+    failed = sum(1 for item in items if item.error)
+    return PDFBatchUploadResponse(
+        message=f"{len(document_ids)} of {len(items)} files queued as a batch",
+        batch_id=batch_id,
+        queued=len(queued_ids),
+        reused=len(reused_ids),
+        duplicates=len(items) - len(document_ids) - failed,
+        failed=failed,
+        items=items,
+    )
+
 
-        # Convert extracted data to proper format
-        for data in extracted_data:
-            extracted_dict = {
-                "id": data.id,
-                "document_id": data.document_id,
-                "store_name": data.store_name,
-                "store_address": data.store_address,
-                "store_phone": data.store_phone,
-                "receipt_number": data.receipt_number,
-                "cashier_id": data.cashier_id,
-                "register_number": data.register_number,
-                "transaction_date": data.transaction_date.isoformat() if data.transaction_date else None,
-                "transaction_time": data.transaction_time,
-                "subtotal": data.subtotal,
-                "tax_amount": data.tax_amount,
-                "total_amount": data.total_amount,
-                "payment_method": data.payment_method,
-                "items": data.items,
-                "tax_breakdown": data.tax_breakdown,
-                "extraction_confidence": data.extraction_confidence,
-                "extra_metadata": data.extra_metadata,
-                "created_at": data.created_at,
-                "updated_at": data.updated_at
-            }
-            response_data["extracted_data"].append(extracted_dict)
-
-        result.append(response_data)
-
-    return result
+@router.get("/batches/{batch_id}", response_model=ProcessingBatchStatus)
+async def get_batch_status(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
+    batch_id: int
+) -> Any:
+    """
+    Get aggregate processing progress of a batch upload.
+    """
+    batch = await run_sync(
+        db, crud.processing_job.get_batch, batch_id=batch_id, owner_id=current_user.id
+    )
+    if not batch or batch.id is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    counts = await run_sync(db, crud.processing_job.count_by_status, batch_id=batch.id)
+    pending = counts.get(JobStatus.PENDING, 0)
+    running = counts.get(JobStatus.RUNNING, 0)
+    return ProcessingBatchStatus(
+        batch_id=batch.id,
+        created_at=batch.created_at,
+        total=sum(counts.values()),
+        pending=pending,
+        running=running,
+        succeeded=counts.get(JobStatus.SUCCEEDED, 0),
+        failed=counts.get(JobStatus.FAILED, 0),
+        finished=pending + running == 0,
+    )
+
+
+@router.get(
+    "/documents",
+    response_model=list[PDFDocumentWithDataResponse] | list[PDFDocumentSummary],
+)
+async def get_user_documents(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    view: DocumentView = DocumentView.FULL,
+) -> Any:
+    """
+    Get all PDF documents for the current user with extracted data.
+
+    With ``view=summary`` only the fields of PDFDocumentSummary are loaded
+    and returned. Pass the ``X-Next-Cursor`` response header back as
+    ``cursor`` to fetch the next page. ``skip`` is still accepted but offset
+    pages get slower the deeper they are.
+    """
+    if view == DocumentView.SUMMARY:
+        if skip and not cursor:
+            rows = await run_sync(
+                db,
+                crud.pdf_document.get_summaries_by_owner,
+                owner_id=current_user.id,
+                skip=skip,
+                limit=limit,
+            )
+            return [_summary_response(row) for row in rows]
+        try:
+            rows, next_cursor = await run_sync(
+                db,
+                crud.pdf_document.get_summary_page_by_owner,
+                owner_id=current_user.id,
+                cursor=cursor,
+                limit=limit,
+            )
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [_summary_response(row) for row in rows]
+
+    if skip and not cursor:
+        documents = await run_sync(
+            db,
+            crud.pdf_document.get_by_owner_with_extracted_data,
+            owner_id=current_user.id,
+            skip=skip,
+            limit=limit,
+        )
+        return [_document_response(document) for document in documents]
+
+    try:
+        documents, next_cursor = await run_sync(
+            db,
+            crud.pdf_document.get_page_by_owner_with_extracted_data,
+            owner_id=current_user.id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [_document_response(document) for document in documents]
 
 
 @router.get("/documents/{document_id}", response_model=PDFDocumentWithDataResponse)
-def get_document_with_data(
+async def get_document_with_data(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
     document_id: int
 ) -> Any:
     """
     Get a specific PDF document with its extracted data.
     """
     try:
-        document = crud.pdf_document.get_with_extracted_data(
-            db, document_id=document_id, owner_id=current_user.id
+        document = await run_sync(
+            db,
+            crud.pdf_document.get_with_extracted_data,
+            document_id=document_id,
+            owner_id=current_user.id,
         )
 
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
 
-
-        # Convert SQLModel to Pydantic-compatible dict
-        response_data: dict[str, Any] = {
-            "id": document.id,
-            "filename": document.filename,
-            "original_filename": document.original_filename,
-            "file_size": document.file_size,
-            "content_type": document.content_type,
-            "processed": document.processed,
-            "processing_error": document.processing_error,
-            "created_at": document.created_at,
-            "updated_at": document.updated_at,
-            "owner_id": document.owner_id,
-            "extracted_data": []
-        }
-
-        # Convert extracted data to proper format
-        for data in document.extracted_data:
-            extracted_dict = {
-                "id": data.id,
-                "document_id": data.document_id,
-                "store_name": data.store_name,
-                "store_address": data.store_address,
-                "store_phone": data.store_phone,
-                "receipt_number": data.receipt_number,
-                "cashier_id": data.cashier_id,
-                "register_number": data.register_number,
-                "transaction_date": data.transaction_date.isoformat() if data.transaction_date else None,
-                "transaction_time": data.transaction_time,
-                "subtotal": data.subtotal,
-                "tax_amount": data.tax_amount,
-                "total_amount": data.total_amount,
-                "payment_method": data.payment_method,
-                "items": data.items,
-                "tax_breakdown": data.tax_breakdown,
-                "extraction_confidence": data.extraction_confidence,
-                "extra_metadata": data.extra_metadata,
-                "created_at": data.created_at,
-                "updated_at": data.updated_at
-            }
-            response_data["extracted_data"].append(extracted_dict)
-
-        return response_data
+        return _document_response(document)
 
     except HTTPException:
         raise
@@ -306,18 +515,21 @@ def get_document_with_data(
 
 
 @router.get("/documents/{document_id}/status", response_model=PDFProcessingStatus)
-def get_processing_status(
+async def get_processing_status(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
     document_id: int
 ) -> Any:
     """
     Get processing status of a PDF document.
     """
     try:
-        document = crud.pdf_document.get_by_owner_and_id(
-            db, owner_id=current_user.id, document_id=document_id
+        document = await run_sync(
+            db,
+            crud.pdf_document.get_by_owner_and_id,
+            owner_id=current_user.id,
+            document_id=document_id,
         )
 
         if not document:
@@ -325,13 +537,21 @@ def get_processing_status(
 
 
         # Get latest extracted data for confidence score
-        extracted_data = crud.extracted_data.get_latest_by_document(db, document_id=document_id)
+        extracted_data = await run_sync(
+            db, crud.extracted_data.get_latest_by_document, document_id=document_id
+        )
+
+        job = await run_sync(
+            db, crud.processing_job.get_latest_by_document, document_id=document_id
+        )
 
         return PDFProcessingStatus(
             document_id=document_id,  # Use the parameter instead of document.id
             processed=document.processed,
             processing_error=document.processing_error,
-            extraction_confidence=extracted_data.extraction_confidence if extracted_data else None
+            extraction_confidence=extracted_data.extraction_confidence if extracted_data else None,
+            job_status=job.status if job else None,
+            job_attempts=job.attempts if job else None,
         )
 
     except HTTPException:
@@ -340,107 +560,145 @@ def get_processing_status(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+async def _search_summaries(
+    db: AsyncSession, current_user: User, search_params: PDFSearchRequest
+) -> PDFSearchResponse:
+    """Search returning summary rows, filtered on each document's latest extraction."""
+    filters: dict[str, Any] = {
+        "owner_id": current_user.id,
+        "store_name": search_params.store_name,
+        "start_date": search_params.start_date,
+        "end_date": search_params.end_date,
+        "query": search_params.query,
+    }
+    next_cursor = None
+    try:
+        if search_params.cursor is not None or not search_params.skip:
+            rows, next_cursor, total = await run_sync(
+                db,
+                crud.pdf_document.search_summary_page,
+                cursor=search_params.cursor,
+                limit=search_params.limit,
+                **filters,
+            )
+        else:
+            rows, total = await run_sync(
+                db,
+                crud.pdf_document.search_summaries,
+                skip=search_params.skip,
+                limit=search_params.limit,
+                **filters,
+            )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return PDFSearchResponse(
+        documents=[_summary_response(row) for row in rows],
+        total=total,
+        skip=search_params.skip,
+        limit=search_params.limit,
+        next_cursor=next_cursor,
+    )
+
+
 @router.post("/search", response_model=PDFSearchResponse)
-def search_documents(
+async def search_documents(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
     search_params: PDFSearchRequest
 ) -> Any:
     """
     Search PDF documents and extracted data.
     """
-    documents = []
+    if search_params.view == DocumentView.SUMMARY:
+        return await _search_summaries(db, current_user, search_params)
 
-    if search_params.store_name or (search_params.start_date and search_params.end_date):
-        # Search with filters
-        extracted_data_list = crud.extracted_data.search(
-            db,
-            owner_id=current_user.id,
-            store_name=search_params.store_name,
-            start_date=search_params.start_date,
-            end_date=search_params.end_date,
-            skip=search_params.skip,
-            limit=search_params.limit
-        )
+    documents = []
+    next_cursor = None
+    total = None
+    use_cursor = search_params.cursor is not None or not search_params.skip
 
-        # Get unique documents with extracted data
-        document_ids = list({ed.document_id for ed in extracted_data_list})
-        documents = crud.pdf_document.get_multiple_with_extracted_data(
-            db, document_ids=document_ids, owner_id=current_user.id
-        )
+    try:
+        if (
+            search_params.query
+            or search_params.store_name
+            or search_params.start_date
+            or search_params.end_date
+        ):
+            # Search with filters
+            if use_cursor:
+                extracted_data_list, next_cursor, total = await run_sync(
+                    db,
+                    crud.extracted_data.search_page,
+                    owner_id=current_user.id,
+                    store_name=search_params.store_name,
+                    start_date=search_params.start_date,
+                    end_date=search_params.end_date,
+                    query=search_params.query,
+                    cursor=search_params.cursor,
+                    limit=search_params.limit,
+                )
+            else:
+                extracted_data_list, total = await run_sync(
+                    db,
+                    crud.extracted_data.search,
+                    owner_id=current_user.id,
+                    store_name=search_params.store_name,
+                    start_date=search_params.start_date,
+                    end_date=search_params.end_date,
+                    query=search_params.query,
+                    skip=search_params.skip,
+                    limit=search_params.limit,
+                )
 
-    else:
-        # Get all documents
-        documents = crud.pdf_document.get_by_owner(
-            db,
-            owner_id=current_user.id,
-            skip=search_params.skip,
-            limit=search_params.limit
-        )
+            # Get unique documents with extracted data, in the order they matched
+            positions: dict[int, int] = {}
+            for ed in extracted_data_list:
+                positions.setdefault(ed.document_id, len(positions))
+            found = await run_sync(
+                db,
+                crud.pdf_document.get_multiple_with_extracted_data,
+                document_ids=list(positions),
+                owner_id=current_user.id,
+            )
+            by_id = {document.id: document for document in found}
+            documents = [
+                by_id[document_id] for document_id in positions if document_id in by_id
+            ]
+
+        elif use_cursor:
+            documents, next_cursor = await run_sync(
+                db,
+                crud.pdf_document.get_page_by_owner_with_extracted_data,
+                owner_id=current_user.id,
+                cursor=search_params.cursor,
+                limit=search_params.limit,
+            )
 
-        # Load extracted data for each document
-        for doc in documents:
-            if doc.id is not None:
-                doc.extracted_data = crud.extracted_data.get_by_document(db, document_id=doc.id)
-
-    # Convert documents to response format
-    response_documents = []
-    for document in documents:
-        # Convert extracted data to proper format if it exists
-        extracted_data_responses = []
-        if hasattr(document, 'extracted_data') and document.extracted_data:
-            for data in document.extracted_data:
-                # Skip if data.id is None (shouldn't happen in practice)
-                if data.id is None:
-                    continue
-                extracted_response = ExtractedDataResponse(
-                    id=data.id,
-                    document_id=data.document_id,
-                    store_name=data.store_name,
-                    store_address=data.store_address,
-                    store_phone=data.store_phone,
-                    receipt_number=data.receipt_number,
-                    cashier_id=data.cashier_id,
-                    register_number=data.register_number,
-                    transaction_date=data.transaction_date.isoformat() if data.transaction_date else None,
-                    transaction_time=data.transaction_time,
-                    subtotal=data.subtotal,
-                    tax_amount=data.tax_amount,
-                    total_amount=data.total_amount,
-                    payment_method=data.payment_method,
-                    items=data.items,
-                    tax_breakdown=data.tax_breakdown,
-                    extraction_confidence=data.extraction_confidence,
-                    extra_metadata=data.extra_metadata,
-                    created_at=data.created_at,
-                    updated_at=data.updated_at
-                )
-                extracted_data_responses.append(extracted_response)
+        else:
+            # Get all documents
+            documents = await run_sync(
+                db,
+                crud.pdf_document.get_by_owner_with_extracted_data,
+                owner_id=current_user.id,
+                skip=search_params.skip,
+                limit=search_params.limit,
+            )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-        if document.id is None:
-            continue
-        # Create document response
-        document_response = PDFDocumentWithDataResponse(
-            id=document.id,
-            filename=document.filename,
-            original_filename=document.original_filename,
-            file_size=document.file_size,
-            content_type=document.content_type,
-            processed=document.processed,
-            processing_error=document.processing_error,
-            created_at=document.created_at,
-            updated_at=document.updated_at,
-            owner_id=document.owner_id,
-            extracted_data=extracted_data_responses
-        )
-        response_documents.append(document_response)
+    response_documents = [
+        _document_response(document) for document in documents if document.id is not None
+    ]
 
     return PDFSearchResponse(
         documents=response_documents,
-        total=len(response_documents),
+        # Filtered searches count all matching documents, listings only the page
+        total=len(response_documents) if total is None else total,
         skip=search_params.skip,
-        limit=search_params.limit
+        limit=search_params.limit,
+        next_cursor=next_cursor,
     )
 
 
@@ -461,11 +719,19 @@ def delete_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Delete the physical file
-    file_storage.delete_file(document.file_path)
+    file_path = document.file_path
+
+    # Files are shared by content, keep them while other documents use them.
+    # The lock keeps uploads of the same content out until the commit, so
+    # none of them can link to the file while it is being removed
+    crud.pdf_document.lock_file_paths(db, file_paths=[file_path])
 
     # Delete from database (cascade will handle extracted_data)
-    crud.pdf_document.remove(db, id=document_id)
+    db.delete(document)
+    db.flush()
+    if crud.pdf_document.count_by_file_path(db, file_path=file_path) == 0:
+        file_storage.delete_file(file_path)
+    db.commit()
 
     return {"message": "Document deleted successfully"}
 
@@ -473,7 +739,6 @@ def delete_document(
 @router.post("/documents/{document_id}/reprocess")
 async def reprocess_document(
     *,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
     document_id: int
@@ -488,19 +753,16 @@ async def reprocess_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Reset processing status
-    document.processed = False
-    document.processing_error = None
-    db.add(document)
-    db.commit()
-    db.refresh(document)
-
     # Ensure document ID is not None
     if document.id is None:
         raise HTTPException(status_code=500, detail="Document ID is missing")
 
-    # Queue background processing
-    background_tasks.add_task(process_pdf_background, document.id, document.file_path)
+    # Reset processing status and queue a job in one transaction
+    document.processed = False
+    document.processing_error = None
+    db.add(document)
+    crud.processing_job.enqueue(db, document_id=document.id, commit=False)
+    db.commit()
 
     return {"message": "Document queued for reprocessing"}
 
@@ -1,20 +1,24 @@
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.api import deps
-from app.core.db import get_db
+from app.core.db import get_async_db, get_db, run_sync
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
 from app.models import User
 from app.models.product import (
     ProductCategory,
     ProductCreate,
+    ProductInsightsRead,
     ProductPurchaseRead,
     ProductRead,
     ProductUpdate,
 )
+from app.services.product_integration import product_integration
 from app.services.product_matcher import product_matcher
 
 logger = logging.getLogger(__name__)
@@ -22,29 +26,60 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[ProductRead])
-def get_products(
+async def get_products(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),  # noqa: ARG001
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),  # noqa: ARG001
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=1000),
+    cursor: str | None = None,
     category: ProductCategory | None = None,
     search: str | None = None,
 ) -> Any:
     """
     Get products with optional filtering.
+
+    Unless ``search`` or ``skip`` is given, pages are keyset-paginated: pass
+    the ``X-Next-Cursor`` response header back as ``cursor``.
     """
+    next_cursor = None
     try:
         if search:
-            products = crud.product.search_by_name(db, query=search, limit=limit)
+            products = await run_sync(
+                db, crud.product.search_by_name, query=search, limit=limit
+            )
+        elif skip and not cursor:
+            if category:
+                products = await run_sync(
+                    db,
+                    crud.product.get_by_category,
+                    category=category,
+                    skip=skip,
+                    limit=limit,
+                )
+            else:
+                products = await run_sync(
+                    db, crud.product.get_multi, skip=skip, limit=limit
+                )
         elif category:
-            products = crud.product.get_by_category(
-                db, category=category, skip=skip, limit=limit
+            products, next_cursor = await run_sync(
+                db,
+                crud.product.get_page_by_category,
+                category=category,
+                cursor=cursor,
+                limit=limit,
             )
         else:
-            products = crud.product.get_multi(db, skip=skip, limit=limit)
+            products, next_cursor = await run_sync(
+                db, crud.product.get_page, cursor=cursor, limit=limit
+            )
 
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return products
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching products: {str(e)}"
@@ -77,24 +112,21 @@ def create_product(
     from app.models.product import Product
     product_data = product_in.model_dump()
     product_data["normalized_name"] = normalized_name
-    product = Product(**product_data)
-    db.add(product)
-    db.commit()
-    db.refresh(product)
+    product = crud.product.add(db, db_obj=Product(**product_data))
     return product
 
 
 @router.get("/{product_id}", response_model=ProductRead)
-def get_product(
+async def get_product(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),  # noqa: ARG001
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),  # noqa: ARG001
     product_id: int,
 ) -> Any:
     """
     Get product by ID.
     """
-    product = crud.product.get(db, id=product_id)
+    product = await run_sync(db, crud.product.get, id=product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -120,6 +152,13 @@ def update_product(
         update_data["normalized_name"] = product_matcher.normalize_product_name(
             update_data["name"]
         )
+        existing = crud.product.get_by_normalized_name(
+            db, normalized_name=update_data["normalized_name"]
+        )
+        if existing and existing.id != product_id:
+            raise HTTPException(
+                status_code=400, detail="A product with this name already exists"
+            )
 
     product = crud.product.update(db, db_obj=product, obj_in=update_data)
     return product
@@ -144,7 +183,7 @@ def delete_product(
 
 
 @router.get("/categories/", response_model=list[str])
-def get_categories() -> Any:
+async def get_categories() -> Any:
     """
     Get all available product categories.
     """
@@ -152,34 +191,37 @@ def get_categories() -> Any:
 
 
 @router.get("/popular/", response_model=list[ProductRead])
-def get_popular_products(
+async def get_popular_products(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
     limit: int = Query(default=20, le=100),
 ) -> Any:
     """
     Get most popular products based on purchase frequency.
     """
-    products = crud.product.get_popular_products(
-        db, user_id=current_user.id, limit=limit
+    products = await run_sync(
+        db, crud.product.get_popular_products, user_id=current_user.id, limit=limit
     )
     return products
 
 
 @router.post("/match/")
-def match_product(
+async def match_product(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),  # noqa: ARG001
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),  # noqa: ARG001
     item_name: str,
     confidence_threshold: float = Query(default=0.7, ge=0.0, le=1.0),
 ) -> Any:
     """
     Find matching product for a receipt item name.
     """
-    matched_product, confidence = product_matcher.find_best_match(
-        db, item_name=item_name, confidence_threshold=confidence_threshold
+    matched_product, confidence = await run_sync(
+        db,
+        product_matcher.find_best_match,
+        item_name=item_name,
+        confidence_threshold=confidence_threshold,
     )
 
     if matched_product:
@@ -221,21 +263,44 @@ def create_product_from_item(
 
 
 @router.get("/purchases/")
-def get_user_purchases(
+async def get_user_purchases(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=1000),
+    cursor: str | None = None,
     include_bill: bool = Query(default=False),
 ) -> Any:
     """
     Get user's product purchases, optionally with bill information.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page.
     """
 
-    purchases = crud.product_purchase.get_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit
-    )
+    if skip and not cursor:
+        purchases = await run_sync(
+            db,
+            crud.product_purchase.get_by_user,
+            user_id=current_user.id,
+            skip=skip,
+            limit=limit,
+        )
+    else:
+        try:
+            purchases, next_cursor = await run_sync(
+                db,
+                crud.product_purchase.get_page_by_user,
+                user_id=current_user.id,
+                cursor=cursor,
+                limit=limit,
+            )
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     if include_bill:
         result = []
@@ -288,22 +353,40 @@ def get_user_purchases(
         return purchases
 
 
+@router.get("/insights/", response_model=ProductInsightsRead)
+async def get_product_insights(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Get the user's spending summary: totals, top categories, most frequently
+    bought products and latest purchases.
+    """
+    return await run_sync(
+        db, product_integration.get_user_product_insights, current_user.id
+    )
+
+
 @router.get("/{product_id}/purchases/", response_model=list[ProductPurchaseRead])
-def get_product_purchases(
+async def get_product_purchases(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(deps.get_current_active_user_async),
     product_id: int,
 ) -> Any:
     """
     Get purchase history for a specific product.
     """
-    product = crud.product.get(db, id=product_id)
+    product = await run_sync(db, crud.product.get, id=product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    purchases = crud.product_purchase.get_by_product(
-        db, product_id=product_id, user_id=current_user.id
+    purchases = await run_sync(
+        db,
+        crud.product_purchase.get_by_product,
+        product_id=product_id,
+        user_id=current_user.id,
     )
     return purchases
 
@@ -1,29 +1,21 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends
-from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
-from app.schemas import Message
-from app.utils import generate_test_email, send_email
+from app.core.db import async_engine, engine
+from app.core.db_pool import pool_stats
 
 router = APIRouter()
 
 
-@router.post(
-    "/test-email/",
-    dependencies=[Depends(get_current_active_superuser)],
-    status_code=201,
-)
-def test_email(email_to: EmailStr) -> Message:
+@router.get("/db-pool/", dependencies=[Depends(get_current_active_superuser)])
+def db_pool() -> dict[str, Any]:
     """
-    Test emails.
+    Connection pool usage and checkout counters of this process, for the
+    sync and async engines.
     """
-    email_data = generate_test_email(email_to=email_to)
-    send_email(
-        email_to=email_to,
-        subject=email_data.subject,
-        html_content=email_data.html_content,
-    )
-    return Message(message="Test email sent")
+    return {"sync": pool_stats(engine), "async": pool_stats(async_engine)}
 
 
 @router.get("/health-check/")
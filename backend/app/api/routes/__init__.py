@@ -1,9 +0,0 @@
-# This module is deprecated.
-# Please use app.api.api_v1.endpoints instead.
-#
-# The routes have been moved to:
-# - app.api.api_v1.endpoints.users
-# - app.api.api_v1.endpoints.items
-# - app.api.api_v1.endpoints.login
-# - app.api.api_v1.endpoints.utils
-# - app.api.api_v1.endpoints.private
@@ -0,0 +1,91 @@
+"""
+Latency of read endpoints under concurrent load, against a running server.
+
+Usage: python -m app.benchmarks.api_latency --token TOKEN
+           [--url http://localhost:8000] [--clients 200] [--requests 20]
+           [--path /api/v1/products/ ...]
+
+Every client sends its requests one after the other, so ``--clients`` is the
+number of requests in flight. Run it against the server before and after a
+change to compare the p99 latencies.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/products/",
+    "/api/v1/products/purchases/",
+    "/api/v1/pdf/documents?view=summary&limit=20",
+]
+
+
+async def run_client(
+    client: httpx.AsyncClient, path: str, requests: int, latencies: list[float]
+) -> int:
+    errors = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+        except httpx.TransportError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors += 1
+    return errors
+
+
+async def measure(
+    url: str, token: str, path: str, clients: int, requests: int
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=url,
+        headers={"Authorization": f"Bearer {token}"},
+        limits=limits,
+        timeout=120,
+    ) as client:
+        # Warm up server-side caches
+        await client.get(path)
+        started = time.perf_counter()
+        errors = await asyncio.gather(
+            *(run_client(client, path, requests, latencies) for _ in range(clients))
+        )
+        elapsed = time.perf_counter() - started
+    return latencies, sum(errors), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Access token of a user")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+
+    print(f"{args.clients} concurrent clients, {args.requests} requests each")
+    for path in args.paths or DEFAULT_PATHS:
+        latencies, errors, elapsed = asyncio.run(
+            measure(args.url, args.token, path, args.clients, args.requests)
+        )
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{path}\n"
+            f"  p50={percentiles[49] * 1000:8.1f}ms "
+            f"p95={percentiles[94] * 1000:8.1f}ms "
+            f"p99={percentiles[98] * 1000:8.1f}ms "
+            f"max={max(latencies) * 1000:8.1f}ms "
+            f"{len(latencies) / elapsed:8.1f} req/s errors={errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
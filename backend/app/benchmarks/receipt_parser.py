@@ -0,0 +1,92 @@
+"""
+Per-receipt parse time of GermanReceiptProcessor on synthetic REWE receipts.
+
+Usage: python -m app.benchmarks.receipt_parser [--repeat 5] [--number 200]
+"""
+
+import argparse
+import random
+import timeit
+from functools import partial
+
+from app.services.pdf_processor import pdf_processor
+from app.services.receipt_patterns import receipt_patterns
+
+ITEM_NAMES = [
+    "BIO VOLLMILCH",
+    "BANANE CHIQUITA",
+    "HAFERMILCH BARISTA",
+    "KAESE GOUDA",
+    "VOLLKORNBROT",
+    "TOMATEN",
+    "BUTTER",
+    "JOGHURT NATUR",
+    "APFEL ELSTAR",
+    "NUDELN SPAGHETTI",
+]
+
+
+def build_receipt(item_count: int, seed: int = 0) -> str:
+    """Build a synthetic REWE receipt with ``item_count`` item lines."""
+    rng = random.Random(seed)
+    lines = [
+        "REWE Markt GmbH",
+        "Hochzoller Str. 12",
+        "86163 Augsburg",
+        "Tel.: +49 821 123456",
+        "UID Nr.: DE812706034",
+        "EUR",
+    ]
+    for _ in range(item_count):
+        price = f"{rng.randint(0, 9)},{rng.randint(10, 99)}"
+        lines.append(f"{rng.choice(ITEM_NAMES)} {price} {rng.choice('AB')}")
+        if rng.random() < 0.1:
+            lines.append(f"Rabatt -0,{rng.randint(10, 99)}")
+        if rng.random() < 0.1:
+            lines.append("PFAND 0,25 A")
+    lines += [
+        "--------------------------------------",
+        "SUMME EUR 9,70",
+        "Geg. Mastercard EUR 9,70",
+        "Kartenzahlung",
+        "Contactless",
+        "DEBIT MASTERCARD",
+        "Nr.############1234",
+        "Steuer % Netto Steuer Brutto",
+        "A= 19,0% 1,30 0,24 1,54",
+        "B= 7,0% 7,63 0,53 8,16",
+        "Gesamtbetrag 8,93 0,77 9,70",
+        "Datum: 12.03.2025 Uhrzeit: 18:42:13",
+        "Bon-Nr.:4711 Kasse: 3 Bed.: 12",
+        "Vielen Dank für Ihren Einkauf",
+    ]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 40, 150])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        text = build_receipt(size)
+        timings = timeit.repeat(
+            partial(pdf_processor.process_text, text),
+            repeat=args.repeat,
+            number=args.number,
+        )
+        per_receipt_us = min(timings) / args.number * 1_000_000
+        print(f"{size:>4} items: {per_receipt_us:8.1f} us/receipt")
+
+    print("\nSlowest patterns:")
+    for name, stats in list(receipt_patterns.stats().items())[:10]:
+        print(
+            f"  {name:<32} calls={stats['calls']:<8} hits={stats['hits']:<8} "
+            f"time={stats['total_time_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
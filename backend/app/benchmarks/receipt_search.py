@@ -0,0 +1,230 @@
+"""
+Receipt search latency for a user with many receipts, on the configured
+database.
+
+Usage: python -m app.benchmarks.receipt_search [--receipts 10000]
+           [--repeat 5] [--number 20] [--explain] [--keep]
+
+Creates a user with ``--receipts`` processed receipts spread over three years
+and several stores, each with a few items and its raw text, times
+crud.extracted_data.search and search_page for typical filters and free text
+queries, then deletes the user again unless ``--keep`` is given.
+``--explain`` prints the query plan of each search, to check which indexes
+Postgres picks.
+"""
+
+import argparse
+import random
+import timeit
+import uuid
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, event, insert, text
+from sqlmodel import Session, col
+
+from app import crud
+from app.core.db import engine
+from app.models import ExtractedData, PDFDocument, User
+from app.schemas import UserCreate
+
+STORE_NAMES = [
+    "REWE Markt GmbH",
+    "REWE City",
+    "ALDI SUED",
+    "LIDL Dienstleistung",
+    "EDEKA Center",
+    "dm-drogerie markt",
+    "Netto Marken-Discount",
+    "Kaufland",
+]
+ITEM_NAMES = [
+    "VOLLMILCH 3,5%",
+    "HAFERMILCH BARISTA",
+    "BANANE",
+    "BROT KRUSTENBROT",
+    "BUTTER",
+    "GOUDA JUNG",
+    "JOGHURT NATUR",
+    "KAFFEE CREMA",
+    "NUDELN FUSILLI",
+    "TOMATEN PASSIERT",
+    "APFEL BRAEBURN",
+    "MINERALWASSER",
+    "PFAND",
+    "ZAHNPASTA",
+    "KLOPAPIER",
+    "EIER FREILAND",
+]
+FIRST_DATE = date(2023, 1, 1)
+DAYS = 3 * 365
+
+
+def receipt(
+    rng: random.Random, document_id: int, owner_id: uuid.UUID, created_at: datetime
+) -> dict[str, Any]:
+    store_name = rng.choice(STORE_NAMES)
+    items = [
+        {"name": name, "price": rng.randrange(19, 999) / 100}
+        for name in rng.sample(ITEM_NAMES, rng.randrange(2, 9))
+    ]
+    lines = [f"{item['name']:<30}{item['price']:>8.2f} B" for item in items]
+    raw_text = "\n".join(
+        [store_name, "Musterstrasse 1", "EUR", *lines, "SUMME", "Vielen Dank"]
+    )
+    return {
+        "document_id": document_id,
+        "owner_id": owner_id,
+        "store_name": store_name,
+        "transaction_date": FIRST_DATE + timedelta(days=rng.randrange(DAYS)),
+        "total_amount": sum(item["price"] for item in items),
+        "items": items,
+        "raw_text": raw_text,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def seed(db: Session, receipts: int) -> uuid.UUID:
+    """Create a user with ``receipts`` documents, each with an extraction."""
+    rng = random.Random(0)
+    user = crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=f"receipt-search-{uuid.uuid4().hex[:8]}@example.com",
+            password=uuid.uuid4().hex,
+        ),
+    )
+    now = datetime.utcnow()
+    document_ids = crud.pdf_document.create_many(
+        db,
+        documents=[
+            {
+                "filename": f"{index}.pdf",
+                "original_filename": f"{index}.pdf",
+                "file_size": 1024,
+                "content_type": "application/pdf",
+                "file_path": f"uploads/pdfs/{user.id}/{index}.pdf",
+                "processed": True,
+                "owner_id": user.id,
+                "created_at": now - timedelta(minutes=index),
+                "updated_at": now,
+            }
+            for index in range(receipts)
+        ],
+    )
+    db.execute(
+        insert(ExtractedData),
+        [
+            receipt(rng, document_id, user.id, now - timedelta(minutes=index))
+            for index, document_id in enumerate(document_ids)
+        ],
+    )
+    db.commit()
+    db.execute(text("ANALYZE pdfdocument"))
+    db.execute(text("ANALYZE extracteddata"))
+    db.commit()
+    return user.id
+
+
+def remove(db: Session, owner_id: uuid.UUID) -> None:
+    db.execute(delete(ExtractedData).where(col(ExtractedData.owner_id) == owner_id))
+    db.execute(delete(PDFDocument).where(col(PDFDocument.owner_id) == owner_id))
+    db.execute(delete(User).where(col(User.id) == owner_id))
+    db.commit()
+
+
+def explain(db: Session, run: Callable[[], Any]) -> None:
+    """Print the plan of the last statement ``run`` executes."""
+    statements: list[Any] = []
+
+    def capture(
+        _conn: Any, _cursor: Any, statement: str, parameters: Any, *_args: Any
+    ) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+    connection = db.connection().connection.driver_connection
+    assert connection is not None
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN ANALYZE {statement}", parameters)
+        for (line,) in cursor.fetchall():
+            print(f"    {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--receipts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        parser.error("the indexes being measured need Postgres")
+
+    with Session(engine) as db:
+        owner_id = seed(db, args.receipts)
+        print(f"{args.receipts} receipts for user {owner_id}")
+        search = crud.extracted_data.search
+        search_page = crud.extracted_data.search_page
+        _, second_page, _ = search_page(db, owner_id=owner_id, limit=20)
+        month: dict[str, Any] = {
+            "start_date": date(2024, 6, 1),
+            "end_date": date(2024, 6, 30),
+        }
+        cases: dict[str, Callable[[], Any]] = {
+            "one month": lambda: search(db, owner_id=owner_id, **month),
+            "store 'rewe'": lambda: search(db, owner_id=owner_id, store_name="rewe"),
+            "store 'rewe', one month": lambda: search(
+                db, owner_id=owner_id, store_name="rewe", **month
+            ),
+            "one year, offset 1000": lambda: search(
+                db,
+                owner_id=owner_id,
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 12, 31),
+                skip=1000,
+                limit=20,
+            ),
+            "store 'rewe', page 1": lambda: search_page(
+                db, owner_id=owner_id, store_name="rewe", limit=20
+            ),
+            "no filter, page 2": lambda: search_page(
+                db, owner_id=owner_id, cursor=second_page, limit=20
+            ),
+            "text 'hafermilch'": lambda: search(
+                db, owner_id=owner_id, query="hafermilch", limit=20
+            ),
+            "text 'zahnpasta', page 1": lambda: search_page(
+                db, owner_id=owner_id, query="zahnpasta", limit=20
+            ),
+            "text 'kaffee', one month": lambda: search(
+                db, owner_id=owner_id, query="kaffee", **month
+            ),
+        }
+        try:
+            for name, run in cases.items():
+                result = run()
+                timings = timeit.repeat(run, repeat=args.repeat, number=args.number)
+                per_query_ms = min(timings) / args.number * 1000
+                print(
+                    f"{name:<26} {per_query_ms:8.2f} ms  "
+                    f"{len(result[0]):>4} rows of {result[-1]}"
+                )
+                if args.explain:
+                    explain(db, run)
+        finally:
+            if not args.keep:
+                remove(db, owner_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Cold start of the API application: import time, memory and the time to
+serve the first request.
+
+Usage: python -m app.benchmarks.startup [--runs 10] [--module app.main]
+           [--path /api/v1/utils/health-check/] [--profile] [--top 25]
+
+Every run starts a fresh interpreter, so nothing is cached in
+``sys.modules``; the times are what a new uvicorn worker spends before it
+can serve requests. Run it before and after a change to compare.
+
+With ``--profile`` a single run is made under ``python -X importtime`` and
+the import cost is reported per module: third-party packages are summed
+per top-level package, app modules are listed one by one.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# The first request is sent in-process, without a server or network
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+modules = len(sys.modules)
+from fastapi.testclient import TestClient
+client = TestClient({module}.app)
+first_request_started = time.perf_counter()
+status = client.get({path!r}).status_code
+first_request = time.perf_counter() - first_request_started
+print(json.dumps({{
+    "import_seconds": imported - started,
+    "first_request_seconds": first_request,
+    "status": status,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": modules,
+}}))
+"""
+
+
+def measure(module: str, path: str) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, path=path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result: dict[str, float] = json.loads(output.splitlines()[-1])
+    return result
+
+
+def import_profile(module: str) -> dict[str, float]:
+    """Self import time in seconds per top-level package or app module."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    costs: dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        name = name.strip()
+        key = name if name.startswith("app.") else name.split(".")[0]
+        costs[key] += int(self_us) / 1_000_000
+    return costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--path", default="/api/v1/utils/health-check/")
+    parser.add_argument(
+        "--profile", action="store_true", help="Report import cost per module"
+    )
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    if args.profile:
+        costs = import_profile(args.module)
+        total = sum(costs.values())
+        print(f"import {args.module}: {total * 1000:.1f}ms")
+        ranked = sorted(costs.items(), key=lambda cost: cost[1], reverse=True)
+        for name, seconds in ranked[: args.top]:
+            print(f"  {seconds * 1000:8.1f}ms {seconds / total:6.1%}  {name}")
+        return
+
+    results = [measure(args.module, args.path) for _ in range(args.runs)]
+    imports = [result["import_seconds"] for result in results]
+    first_requests = [
+        result["import_seconds"] + result["first_request_seconds"] for result in results
+    ]
+    rss = statistics.median(result["max_rss_kb"] for result in results) / 1024
+    print(
+        f"{args.module}, {args.runs} runs, first request GET {args.path} "
+        f"({results[-1]['status']:.0f})\n"
+        f"  import median={statistics.median(imports) * 1000:8.1f}ms "
+        f"min={min(imports) * 1000:8.1f}ms\n"
+        f"  first response median={statistics.median(first_requests) * 1000:8.1f}"
+        f"ms min={min(first_requests) * 1000:8.1f}ms\n"
+        f"  max_rss={rss:6.1f}MB modules imported={results[-1]['modules']:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
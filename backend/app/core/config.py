@@ -74,6 +74,46 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Database connection pools. Each process (API server, worker) has one
+    # pool per engine, sync and async, so a process can hold up to
+    # 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Time to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Replace connections older than this, before servers or proxies drop them
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Test connections on checkout, replacing ones the server has closed
+    DB_POOL_PRE_PING: bool = True
+    # Statements running longer than this are cancelled by Postgres; 0 disables
+    # the limit. Applies to every connection, including batch commands
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # PDF extraction worker pool
+    PDF_WORKER_PROCESSES: int = 2
+    # Recycle a worker process after this many jobs to bound PyPDF2 memory growth
+    PDF_WORKER_MAX_TASKS_PER_CHILD: int = 50
+    # Jobs submitted or running at once before new uploads are rejected
+    PDF_WORKER_MAX_PENDING: int = 32
+    PDF_EXTRACTION_TIMEOUT_SECONDS: float = 60.0
+
+    # Durable processing job queue
+    PDF_JOB_MAX_ATTEMPTS: int = 5
+    # Retries back off exponentially: base * 2^(attempt - 1), capped at max
+    PDF_JOB_RETRY_BASE_SECONDS: float = 10.0
+    PDF_JOB_RETRY_MAX_SECONDS: float = 3600.0
+    # A claimed job is handed to another worker if not finished in time
+    PDF_JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    PDF_WORKER_POLL_INTERVAL_SECONDS: float = 2.0
+    # Files accepted by one batch upload, counting PDFs inside ZIP archives
+    PDF_BATCH_MAX_FILES: int = 100
+
+    # Product matcher: reload the in-process catalog index after this long,
+    # to pick up products created by other processes
+    PRODUCT_CATALOG_REFRESH_SECONDS: int = 300
+    # Entries per memoized ProductMatcher helper (normalization, units, category)
+    PRODUCT_MATCHER_CACHE_SIZE: int = 4096
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -91,7 +131,8 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
-    @computed_field
+    @computed_field  # type: ignore[prop-decorator]
+    @property
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
@@ -1,21 +1,98 @@
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Any, Concatenate, cast
+
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 from app.models import User
 from app.schemas import UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
-# Create SessionLocal class
-SessionLocal = Session
+def engine_options() -> dict[str, Any]:
+    """Pool and connection options shared by the sync and async engines."""
+    options: dict[str, Any] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **engine_options(),
+)
+
+# Used by async endpoints, which wait on the database without holding one of
+# the threadpool slots sync endpoints run in; psycopg 3 drives both engines
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    **engine_options(),
+)
 
-def get_db():
-    """Dependency to get database session."""
+
+def get_db() -> Generator[Session]:
+    """
+    Dependency to get a database session.
+
+    This is the only sync session dependency (SessionDep uses it too), so
+    FastAPI hands the same session to every dependency of a request and a
+    request never holds more than one pooled connection.
+    """
     with Session(engine) as session:
         yield session
 
 
+def async_session() -> AsyncSession:
+    """
+    A new async database session.
+
+    Objects are not expired on commit, since reloading an expired attribute
+    outside an await would need IO. Sync CRUD code can be reused through
+    ``await run_sync(session, fn, ...)``.
+    """
+    return AsyncSession(async_engine, expire_on_commit=False)
+
+
+async def run_sync[**P, T](
+    session: AsyncSession,
+    fn: Callable[Concatenate[Session, P], T],
+    /,
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """
+    ``session.run_sync(fn, ...)``, typed for functions taking sqlmodel's
+    Session, which is the session it passes at runtime.
+    """
+    return await session.run_sync(
+        lambda sync_session: fn(cast(Session, sync_session), *args, **kwargs)
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    """
+    Dependency to get an async database session.
+
+    The session is closed before a streaming response body is sent; streams
+    open their own session with async_session().
+    """
+    async with async_session() as session:
+        yield session
+
+
 # make sure all SQLModel models are imported (app.models) before initializing DB
 # otherwise, SQLModel might fail to initialize relationships properly
 # for more details: https://github.com/fastapi/full-stack-fastapi-template/issues/28
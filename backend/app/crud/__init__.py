@@ -1,7 +1,11 @@
+from .crud_analytics import analytics
 from .crud_extracted_data import extracted_data
 from .crud_item import item
 from .crud_pdf_document import pdf_document
+from .crud_processing_job import processing_job
 from .crud_product import product, product_alias, product_purchase
+from .crud_purchase_aggregate import purchase_aggregate
+from .crud_receipt_line_item import receipt_line_item
 from .crud_user import user
 
-__all__ = ["item", "user", "pdf_document", "extracted_data", "product", "product_alias", "product_purchase"]
+__all__ = ["analytics", "item", "user", "pdf_document", "processing_job", "extracted_data", "product", "product_alias", "product_purchase", "purchase_aggregate", "receipt_line_item"]
@@ -25,17 +25,35 @@ class CRUDBase[
         """
         self.model = model
 
-    def get(self, db: Session, id: Any) -> ModelType | None:
+    def get(self, db: Session, /, id: Any) -> ModelType | None:
         return db.get(self.model, id)
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, /, *, skip: int = 0, limit: int = 100
     ) -> list[ModelType]:
         from sqlmodel import select
 
         statement = select(self.model).offset(skip).limit(limit)
         return list(db.exec(statement).all())
 
+    def get_page(
+        self, db: Session, /, *, cursor: str | None = None, limit: int = 100
+    ) -> tuple[list[ModelType], str | None]:
+        """Keyset-paginated variant of get_multi, ordered by primary key."""
+        from sqlalchemy.orm import class_mapper
+        from sqlmodel import select
+
+        from app.crud.pagination import paginate
+
+        return paginate(
+            db,
+            select(self.model),
+            columns=list(class_mapper(self.model).primary_key),
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+        )
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
@@ -0,0 +1,174 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, distinct, literal_column
+from sqlalchemy import select as sa_select
+from sqlmodel import col, func, select
+
+from app.models.extracted_data import ExtractedData
+from app.models.product import Product, ProductCategory, ProductPurchase
+from app.schemas.analytics import TimeBucket
+
+
+def _period(bucket: TimeBucket, column: Any) -> ColumnElement[datetime]:
+    # A literal, not a bound parameter, so GROUP BY matches the selected
+    # period; the bucket is an enum, never user text
+    return func.date_trunc(literal_column(f"'{bucket.value}'"), column)
+
+
+# When a purchase was made: the date printed on its receipt, or when the
+# receipt was processed if it has none. Statements using it join ExtractedData.
+_PURCHASED_AT = func.coalesce(
+    col(ExtractedData.transaction_date), col(ProductPurchase.purchase_date)
+)
+
+_RECEIPT = col(ExtractedData.id) == col(ProductPurchase.extracted_data_id)
+
+
+def _purchase_filters(
+    user_id: uuid.UUID, start: date | None, end: date | None
+) -> list[ColumnElement[bool]]:
+    """A user's purchases, optionally between two dates (both included)."""
+    filters = [col(ProductPurchase.user_id) == user_id]
+    if start is not None:
+        filters.append(_PURCHASED_AT >= datetime.combine(start, time.min))
+    if end is not None:
+        filters.append(
+            _PURCHASED_AT < datetime.combine(end + timedelta(days=1), time.min)
+        )
+    return filters
+
+
+class CRUDAnalytics:
+    """
+    Spending analytics over a user's purchases, aggregated by Postgres.
+
+    Methods build the statements rather than run them, so endpoints can
+    stream the aggregated rows from a server-side cursor. Each row has the
+    fields of the matching app.schemas.analytics model.
+    """
+
+    def spending_by_store(
+        self,
+        *,
+        user_id: uuid.UUID,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Select[Any]:
+        """Receipts, items and amount spent per store, biggest spend first."""
+        total_spent = func.sum(ProductPurchase.total_price)
+        return (
+            select(
+                col(ExtractedData.store_name).label("store_name"),
+                func.count(distinct(col(ProductPurchase.extracted_data_id))).label(
+                    "receipts"
+                ),
+                func.count().label("items"),
+                total_spent.label("total_spent"),
+            )
+            .join(ExtractedData, _RECEIPT)
+            .where(*_purchase_filters(user_id, start, end))
+            .group_by(col(ExtractedData.store_name))
+            .order_by(total_spent.desc())
+        )
+
+    def spending_by_period(
+        self,
+        *,
+        user_id: uuid.UUID,
+        bucket: TimeBucket = TimeBucket.MONTH,
+        category: ProductCategory | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Select[Any]:
+        """Receipts, items and amount spent per time bucket, oldest first."""
+        period = _period(bucket, _PURCHASED_AT)
+        statement = (
+            select(
+                period.label("period"),
+                func.count(distinct(col(ProductPurchase.extracted_data_id))).label(
+                    "receipts"
+                ),
+                func.count().label("items"),
+                func.sum(ProductPurchase.total_price).label("total_spent"),
+            )
+            .join(ExtractedData, _RECEIPT)
+            .where(*_purchase_filters(user_id, start, end))
+        )
+        if category is not None:
+            statement = statement.join(
+                Product, col(Product.id) == col(ProductPurchase.product_id)
+            ).where(col(Product.category) == category)
+        return statement.group_by(period).order_by(period)
+
+    def basket_by_period(
+        self,
+        *,
+        user_id: uuid.UUID,
+        bucket: TimeBucket = TimeBucket.MONTH,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Select[Any]:
+        """Average items and amount per receipt in each time bucket."""
+        receipts = (
+            select(
+                func.min(_PURCHASED_AT).label("purchase_date"),
+                func.count().label("items"),
+                func.sum(ProductPurchase.total_price).label("total"),
+            )
+            .join(ExtractedData, _RECEIPT)
+            .where(*_purchase_filters(user_id, start, end))
+            .group_by(col(ProductPurchase.extracted_data_id))
+            .subquery()
+        )
+        period = _period(bucket, receipts.c.purchase_date)
+        return (
+            select(
+                period.label("period"),
+                func.count().label("receipts"),
+                func.avg(receipts.c["items"]).label("average_items"),
+                func.avg(receipts.c.total).label("average_total"),
+            )
+            .group_by(period)
+            .order_by(period)
+        )
+
+    def price_history(
+        self,
+        *,
+        user_id: uuid.UUID,
+        product_id: int,
+        bucket: TimeBucket = TimeBucket.MONTH,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Select[Any]:
+        """
+        Unit price a user paid for a product per time bucket, oldest first,
+        with the average of the bucket before (a window over the buckets).
+        """
+        period = _period(bucket, _PURCHASED_AT)
+        average = func.avg(ProductPurchase.unit_price)
+        # More columns than sqlmodel's select is typed for
+        return (
+            sa_select(
+                period.label("period"),
+                func.count().label("purchases"),
+                average.label("average_unit_price"),
+                func.min(ProductPurchase.unit_price).label("min_unit_price"),
+                func.max(ProductPurchase.unit_price).label("max_unit_price"),
+                func.lag(average)
+                .over(order_by=period)
+                .label("previous_average_unit_price"),
+            )
+            .join(ExtractedData, _RECEIPT)
+            .where(
+                col(ProductPurchase.product_id) == product_id,
+                *_purchase_filters(user_id, start, end),
+            )
+            .group_by(period)
+            .order_by(period)
+        )
+
+
+analytics = CRUDAnalytics()
@@ -1,15 +1,43 @@
 import uuid
+from datetime import date
+from typing import Any
 
-from sqlalchemy import text
-from sqlmodel import Session, col, select
+from sqlalchemy import ColumnElement, delete
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.elements import Label
+from sqlmodel import Session, col, func, select
+from sqlmodel.sql.expression import Select
 
 from app.crud.base import CRUDBase
+from app.crud.crud_purchase_aggregate import purchase_aggregate
+from app.crud.crud_receipt_line_item import receipt_line_item
+from app.crud.pagination import KeyColumn, paginate
 from app.models.extracted_data import (
     ExtractedData,
     ExtractedDataCreate,
     ExtractedDataUpdate,
 )
 from app.models.pdf_document import PDFDocument
+from app.models.product import ProductPurchase
+
+# Text search configuration the search_vector trigger indexes receipts with
+TEXT_SEARCH_CONFIG = "german"
+
+search_vector = ExtractedData.__table__.c.search_vector  # type: ignore[attr-defined]
+
+
+def text_search_query(query: str) -> ColumnElement[Any]:
+    """
+    Parse free text as a web search engine would: words must all appear,
+    "quoted words" in this order, ``or`` between alternatives and ``-word``
+    excludes.
+    """
+    return func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+
+
+def text_search_rank(query: str) -> Label[Any]:
+    """Relevance of a receipt to the query, store name matches count most."""
+    return func.ts_rank(search_vector, text_search_query(query)).label("rank")
 
 
 class CRUDExtractedData(CRUDBase[ExtractedData, ExtractedDataCreate, ExtractedDataUpdate]):
@@ -21,48 +49,276 @@ class CRUDExtractedData(CRUDBase[ExtractedData, ExtractedDataCreate, ExtractedDa
         return list(db.exec(statement).all())
 
     def get_latest_by_document(
-        self, db: Session, *, document_id: int
+        self, db: Session, /, *, document_id: int
     ) -> ExtractedData | None:
         """Get the latest extracted data for a document."""
         statement = (
             select(ExtractedData)
             .where(ExtractedData.document_id == document_id)
-            .order_by(text("created_at DESC"))
+            .order_by(col(ExtractedData.created_at).desc())
             .limit(1)
         )
         return db.exec(statement).first()
 
-    def search(
-        self, db: Session, *, owner_id: uuid.UUID, store_name: str | None = None,
-        start_date: str | None = None, end_date: str | None = None, skip: int = 0, limit: int = 100
-    ) -> list[ExtractedData]:
-        """Search extracted data with optional filters for a specific owner."""
+    def get_latest_by_content_hash(
+        self, db: Session, *, owner_id: uuid.UUID, content_hash: str
+    ) -> ExtractedData | None:
+        """
+        Get the latest extraction result for any of the owner's documents with
+        this content hash, so a re-uploaded file does not need to be parsed.
+        """
         statement = (
             select(ExtractedData)
             .join(PDFDocument)
-            .where(PDFDocument.owner_id == owner_id)
+            .where(
+                PDFDocument.owner_id == owner_id,
+                PDFDocument.content_hash == content_hash,
+                col(PDFDocument.processing_error).is_(None),
+            )
+            .order_by(col(ExtractedData.created_at).desc())
+            .limit(1)
         )
+        return db.exec(statement).first()
 
-        # Add optional filters
-        if store_name:
-            statement = statement.where(col(ExtractedData.store_name).ilike(f"%{store_name}%"))
-
-        if start_date and end_date:
-            # Use raw SQL for date filtering to avoid type issues
-            statement = statement.where(
-                text("transaction_date IS NOT NULL"),
-                text(f"transaction_date >= '{start_date}'"),
-                text(f"transaction_date <= '{end_date}'")
+    def get_latest_by_content_hashes(
+        self, db: Session, *, owner_id: uuid.UUID, content_hashes: list[str]
+    ) -> dict[str, ExtractedData]:
+        """Batch version of get_latest_by_content_hash, keyed by content hash."""
+        if not content_hashes:
+            return {}
+        statement = (
+            select(PDFDocument.content_hash, ExtractedData)
+            .join(PDFDocument)
+            .where(
+                PDFDocument.owner_id == owner_id,
+                col(PDFDocument.content_hash).in_(content_hashes),
+                col(PDFDocument.processing_error).is_(None),
             )
+            .order_by(col(ExtractedData.created_at))
+        )
+        # Iterating oldest first leaves the latest result per hash
+        return {
+            content_hash: data
+            for content_hash, data in db.exec(statement).all()
+            if content_hash
+        }
 
+    def create(self, db: Session, *, obj_in: ExtractedDataCreate) -> ExtractedData:
+        """Create extracted data, with its line items, for the document's owner."""
+        document = db.get(PDFDocument, obj_in.document_id)
+        if document is None:
+            raise ValueError(f"Document {obj_in.document_id} does not exist")
+        return self.create_receipt(db, obj_in=obj_in, owner_id=document.owner_id)
+
+    def remove_by_document(self, db: Session, *, document_id: int) -> None:
+        """
+        Delete the extracted data of a document with its line items and
+        purchases, and take the purchases out of the spending aggregates.
+        Does not commit.
+        """
+        extraction_ids = select(ExtractedData.id).where(
+            ExtractedData.document_id == document_id
+        )
+        user_ids = db.exec(
+            select(ProductPurchase.user_id)
+            .where(col(ProductPurchase.extracted_data_id).in_(extraction_ids))
+            .distinct()
+        ).all()
+        db.execute(
+            delete(ProductPurchase).where(
+                col(ProductPurchase.extracted_data_id).in_(extraction_ids)
+            )
+        )
+        # Line items go with their receipt through ON DELETE CASCADE
+        db.execute(
+            delete(ExtractedData).where(col(ExtractedData.document_id) == document_id)
+        )
+        purchase_aggregate.refresh_users(db, user_ids=user_ids)
+
+    def create_receipt(
+        self,
+        db: Session,
+        *,
+        obj_in: ExtractedDataCreate,
+        owner_id: uuid.UUID,
+        replace: bool = False,
+    ) -> ExtractedData:
+        """
+        Create extracted data of a document of owner_id together with a
+        ReceiptLineItem for each of its items, in one transaction.
+
+        With replace, earlier extracted data of the document is removed in
+        the same transaction, so processing a document again does not
+        duplicate its receipt, line items and purchases.
+        """
+        if replace:
+            self.remove_by_document(db, document_id=obj_in.document_id)
+        db_obj = ExtractedData.model_validate(obj_in, update={"owner_id": owner_id})
+        db.add(db_obj)
+        db.flush()
+        receipt_line_item.create_for_receipt(
+            db, extracted_data=db_obj, owner_id=owner_id
+        )
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def copy_to_document(
+        self,
+        db: Session,
+        *,
+        source: ExtractedData,
+        document_id: int,
+        commit: bool = True,
+    ) -> ExtractedData:
+        """
+        Create a copy of an extraction result, with its line items, for
+        another document of the same owner.
+        """
+        data = source.model_dump(exclude={"id", "document_id", "created_at", "updated_at"})
+        copy = ExtractedData(document_id=document_id, **data)
+        db.add(copy)
+        db.flush()
+        assert source.id is not None and copy.id is not None
+        receipt_line_item.copy_to_receipt(db, source_id=source.id, target_id=copy.id)
+        if commit:
+            db.commit()
+            db.refresh(copy)
+        return copy
+
+    def _search_filters(
+        self,
+        *,
+        owner_id: uuid.UUID,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+    ) -> list[ColumnElement[bool]]:
+        """
+        The latest extraction of an owner's documents, optionally of stores
+        whose name contains store_name, between two transaction dates (both
+        included) and matching the free text query. Served by the (owner_id,
+        transaction_date), store name trigram and search_vector indexes.
+        """
+        newer = aliased(ExtractedData)
+        latest_extraction = (
+            select(func.max(newer.id))
+            .where(newer.document_id == ExtractedData.document_id)
+            .scalar_subquery()
+        )
+        filters = [
+            col(ExtractedData.owner_id) == owner_id,
+            # Earlier extractions of a retried document are not matches
+            col(ExtractedData.id) == latest_extraction,
+        ]
+        if query:
+            filters.append(search_vector.bool_op("@@")(text_search_query(query)))
+        if store_name:
+            filters.append(col(ExtractedData.store_name).ilike(f"%{store_name}%"))
+        if start_date is not None:
+            filters.append(col(ExtractedData.transaction_date) >= start_date)
+        if end_date is not None:
+            filters.append(col(ExtractedData.transaction_date) <= end_date)
+        return filters
+
+    def _count(self, db: Session, filters: list[ColumnElement[bool]]) -> int:
+        statement = select(func.count()).select_from(ExtractedData).where(*filters)
+        return db.exec(statement).one()
+
+    def search(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[ExtractedData], int]:
+        """
+        Search an owner's extracted data, best match first when there is a
+        free text query and otherwise newest first. Returns a page and the
+        number of all matching documents, counted by a window function in the
+        same query.
+        """
+        filters = self._search_filters(
+            owner_id=owner_id,
+            store_name=store_name,
+            start_date=start_date,
+            end_date=end_date,
+            query=query,
+        )
+        total = func.count().over().label("total")
+        statement: Select[Any] = select(ExtractedData, total)
+        order_by: list[ColumnElement[Any]] = [
+            col(ExtractedData.created_at).desc(),
+            col(ExtractedData.id).desc(),
+        ]
+        if query:
+            rank = text_search_rank(query)
+            statement = select(ExtractedData, total, rank)
+            order_by.insert(0, rank.desc())
         statement = (
-            statement
-            .offset(skip)
-            .limit(limit)
-            .order_by(text("created_at DESC"))
+            statement.where(*filters).order_by(*order_by).offset(skip).limit(limit)
         )
+        rows = db.exec(statement).all()
+        if not rows:
+            # A page past the end has no row to carry the total
+            return [], self._count(db, filters) if skip else 0
+        return [row[0] for row in rows], rows[0].total
 
-        return list(db.exec(statement).all())
+    def search_page(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[ExtractedData], str | None, int]:
+        """
+        Keyset-paginated variant of search, on (rank, created_at, id) with a
+        free text query and on (created_at, id) otherwise. Returns the page,
+        the cursor of the next page and the number of all matching documents.
+        """
+        filters = self._search_filters(
+            owner_id=owner_id,
+            store_name=store_name,
+            start_date=start_date,
+            end_date=end_date,
+            query=query,
+        )
+        # Counted before the cursor condition, so every page has the full total
+        totals = (
+            select(col(ExtractedData.id), func.count().over().label("total"))
+            .where(*filters)
+            .subquery()
+        )
+        statement: Select[Any] = select(ExtractedData, totals.c.total)
+        columns: list[KeyColumn] = [
+            col(ExtractedData.created_at),
+            col(ExtractedData.id),
+        ]
+        if query:
+            rank = text_search_rank(query)
+            statement = select(ExtractedData, totals.c.total, rank)
+            columns.insert(0, rank)
+        rows, next_cursor = paginate(
+            db,
+            statement.join(totals, totals.c.id == col(ExtractedData.id)),
+            columns=columns,
+            cursor=cursor,
+            limit=limit,
+        )
+        if not rows:
+            return [], None, self._count(db, filters) if cursor else 0
+        return [row[0] for row in rows], next_cursor, rows[0].total
 
 
 extracted_data = CRUDExtractedData(ExtractedData)
@@ -1,11 +1,23 @@
 import uuid
+from collections.abc import Iterable, Sequence
+from datetime import date
+from typing import Any
 
-from sqlalchemy import text
-from sqlmodel import Session, col, select
+from sqlalchemy import ColumnElement, Row, insert, text
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, exists, func, select
+from sqlmodel.sql.expression import Select
 
 from app.crud.base import CRUDBase
+from app.crud.crud_extracted_data import (
+    search_vector,
+    text_search_query,
+    text_search_rank,
+)
+from app.crud.pagination import KeyColumn, paginate
 from app.models.extracted_data import ExtractedData
 from app.models.pdf_document import PDFDocument, PDFDocumentCreate, PDFDocumentUpdate
+from app.models.processing_job import JobStatus, ProcessingJob
 
 
 class CRUDPDFDocument(CRUDBase[PDFDocument, PDFDocumentCreate, PDFDocumentUpdate]):
@@ -23,7 +35,7 @@ class CRUDPDFDocument(CRUDBase[PDFDocument, PDFDocumentCreate, PDFDocumentUpdate
         return list(db.exec(statement).all())
 
     def get_by_owner_and_id(
-        self, db: Session, *, owner_id: uuid.UUID, document_id: int
+        self, db: Session, /, *, owner_id: uuid.UUID, document_id: int
     ) -> PDFDocument | None:
         """Get a specific PDF document by owner and document ID."""
         statement = select(PDFDocument).where(
@@ -32,13 +44,93 @@ class CRUDPDFDocument(CRUDBase[PDFDocument, PDFDocumentCreate, PDFDocumentUpdate
         )
         return db.exec(statement).first()
 
+    def get_by_owner_and_hash(
+        self, db: Session, *, owner_id: uuid.UUID, content_hash: str
+    ) -> PDFDocument | None:
+        """Get the owner's oldest document with the given content hash."""
+        statement = (
+            select(PDFDocument)
+            .where(
+                PDFDocument.owner_id == owner_id,
+                PDFDocument.content_hash == content_hash,
+            )
+            .order_by(col(PDFDocument.id))
+            .limit(1)
+        )
+        return db.exec(statement).first()
+
+    def get_by_owner_and_hashes(
+        self, db: Session, *, owner_id: uuid.UUID, content_hashes: list[str]
+    ) -> dict[str, PDFDocument]:
+        """Map each known content hash to the owner's oldest document with it."""
+        if not content_hashes:
+            return {}
+        statement = (
+            select(PDFDocument)
+            .where(
+                PDFDocument.owner_id == owner_id,
+                col(PDFDocument.content_hash).in_(content_hashes),
+            )
+            .order_by(col(PDFDocument.id).desc())
+        )
+        # Iterating newest first leaves the oldest document per hash
+        return {
+            document.content_hash: document
+            for document in db.exec(statement).all()
+            if document.content_hash
+        }
+
+    def create_many(
+        self, db: Session, *, documents: list[dict[str, Any]]
+    ) -> list[int]:
+        """
+        Insert many documents with a single INSERT ... RETURNING statement.
+
+        Returns the new ids in the order of ``documents``. Does not commit.
+        """
+        if not documents:
+            return []
+        statement = insert(PDFDocument).returning(
+            col(PDFDocument.id), sort_by_parameter_order=True
+        )
+        return list(db.execute(statement, documents).scalars().all())
+
+    def count_by_file_path(self, db: Session, *, file_path: str) -> int:
+        """Number of documents referencing a stored file."""
+        statement = select(func.count()).where(PDFDocument.file_path == file_path)
+        return db.exec(statement).one()
+
+    def lock_file_paths(self, db: Session, *, file_paths: Iterable[str]) -> None:
+        """
+        Take transaction-scoped advisory locks on stored files.
+
+        Uploads hold them from placing a file until its document is committed
+        and deletes from removing a document until its file is gone if
+        unused, so a file is never removed while a new document points at
+        it. Locks are taken in sorted order, concurrent batches never
+        deadlock.
+        """
+        for file_path in sorted(set(file_paths)):
+            db.execute(
+                select(func.pg_advisory_xact_lock(func.hashtextextended(file_path, 0)))
+            )
+
     def get_unprocessed(
         self, db: Session, *, limit: int = 10
     ) -> list[PDFDocument]:
-        """Get unprocessed PDF documents for batch processing."""
+        """
+        Get unprocessed PDF documents that have no pending or running job.
+
+        These are documents whose work was lost (e.g. queued in memory before
+        the job table existed); the worker re-enqueues them in batches.
+        """
+        active_job = exists().where(
+            col(ProcessingJob.document_id) == col(PDFDocument.id),
+            col(ProcessingJob.status).in_([JobStatus.PENDING, JobStatus.RUNNING]),
+        )
         statement = (
             select(PDFDocument)
-            .where(not PDFDocument.processed)
+            .where(col(PDFDocument.processed).is_(False), ~active_job)
             .limit(limit)
             .order_by(text("created_at ASC"))
         )
@@ -58,8 +150,270 @@ class CRUDPDFDocument(CRUDBase[PDFDocument, PDFDocumentCreate, PDFDocumentUpdate
             db.refresh(document)
         return document
 
+    def get_by_owner_with_extracted_data(
+        self, db: Session, /, *, owner_id: uuid.UUID, skip: int = 0, limit: int = 100
+    ) -> list[PDFDocument]:
+        """
+        Get PDF documents by owner with their extracted data.
+
+        Extracted data for the whole page is loaded with one extra IN query.
+        """
+        statement = (
+            select(PDFDocument)
+            .where(PDFDocument.owner_id == owner_id)
+            .options(selectinload(PDFDocument.extracted_data))  # type: ignore[arg-type]
+            .offset(skip)
+            .limit(limit)
+            .order_by(text("created_at DESC"))
+        )
+        return list(db.exec(statement).all())
+
+    def get_page_by_owner_with_extracted_data(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[PDFDocument], str | None]:
+        """
+        Keyset-paginated variant of get_by_owner_with_extracted_data.
+
+        Pages are ordered newest first on ``(created_at, id)`` and served by
+        the ``(owner_id, created_at, id)`` index. Returns the page and the
+        cursor of the next page.
+        """
+        statement = (
+            select(PDFDocument)
+            .where(PDFDocument.owner_id == owner_id)
+            .options(selectinload(PDFDocument.extracted_data))  # type: ignore[arg-type]
+        )
+        return paginate(
+            db,
+            statement,
+            columns=[col(PDFDocument.created_at), col(PDFDocument.id)],
+            cursor=cursor,
+            limit=limit,
+        )
+
+    def _summary_statement(
+        self,
+        *,
+        owner_id: uuid.UUID,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+        extra_columns: Sequence[ColumnElement[Any]] = (),
+    ) -> Select[Any]:
+        """
+        Select summary columns of an owner's documents.
+
+        Only the listed columns are read, joined to the latest extraction of
+        each document, so raw text and the items/tax JSON never leave the
+        database. With a free text query the latest extraction must match
+        it, and its relevance is selected as ``rank``. ``extra_columns`` are
+        selected last.
+        """
+        latest_extraction = (
+            select(func.max(ExtractedData.id))
+            .where(ExtractedData.document_id == PDFDocument.id)
+            .correlate(PDFDocument)
+            .scalar_subquery()
+        )
+        columns: list[Any] = [
+            col(PDFDocument.id),
+            col(PDFDocument.filename),
+            col(PDFDocument.original_filename),
+            col(PDFDocument.processed),
+            col(PDFDocument.created_at),
+            col(ExtractedData.store_name),
+            col(ExtractedData.transaction_date),
+            col(ExtractedData.total_amount),
+        ]
+        if query:
+            columns.append(text_search_rank(query))
+        columns.extend(extra_columns)
+        statement: Select[Any] = select(*columns)
+        statement = statement.outerjoin(
+            ExtractedData, col(ExtractedData.id) == latest_extraction
+        ).where(col(PDFDocument.owner_id) == owner_id)
+
+        if store_name:
+            statement = statement.where(col(ExtractedData.store_name).ilike(f"%{store_name}%"))
+
+        if start_date is not None:
+            statement = statement.where(
+                col(ExtractedData.transaction_date) >= start_date
+            )
+        if end_date is not None:
+            statement = statement.where(col(ExtractedData.transaction_date) <= end_date)
+        if query:
+            statement = statement.where(
+                search_vector.bool_op("@@")(text_search_query(query))
+            )
+        return statement
+
+    def _summary_order(
+        self, statement: Select[Any], *, query: str | None
+    ) -> list[KeyColumn]:
+        """Sort key of summaries, best match first with a free text query."""
+        columns: list[KeyColumn] = [col(PDFDocument.created_at), col(PDFDocument.id)]
+        if query:
+            columns.insert(0, statement.selected_columns.rank)
+        return columns
+
+    def get_summaries_by_owner(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+    ) -> list[Row[Any]]:
+        """
+        Summary rows of an owner's documents, best match first with a free
+        text query and otherwise newest first.
+        """
+        statement = self._summary_statement(
+            owner_id=owner_id,
+            store_name=store_name,
+            start_date=start_date,
+            end_date=end_date,
+            query=query,
+        )
+        order_by = self._summary_order(statement, query=query)
+        statement = (
+            statement.offset(skip)
+            .limit(limit)
+            .order_by(*(column.desc() for column in order_by))
+        )
+        return list(db.exec(statement).all())
+
+    def get_summary_page_by_owner(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+    ) -> tuple[list[Row[Any]], str | None]:
+        """Keyset-paginated variant of get_summaries_by_owner."""
+        statement = self._summary_statement(
+            owner_id=owner_id,
+            store_name=store_name,
+            start_date=start_date,
+            end_date=end_date,
+            query=query,
+        )
+        return paginate(
+            db,
+            statement,
+            columns=self._summary_order(statement, query=query),
+            cursor=cursor,
+            limit=limit,
+        )
+
+    def _count_summaries(self, db: Session, statement: Select[Any]) -> int:
+        count = select(func.count()).select_from(statement.subquery())
+        return db.exec(count).one()
+
+    def search_summaries(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+    ) -> tuple[list[Row[Any]], int]:
+        """
+        get_summaries_by_owner with the number of all matching documents,
+        counted by a window function in the same query.
+        """
+        filters: dict[str, Any] = {
+            "owner_id": owner_id,
+            "store_name": store_name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "query": query,
+        }
+        statement = self._summary_statement(
+            **filters, extra_columns=[func.count().over().label("total")]
+        )
+        order_by = self._summary_order(statement, query=query)
+        statement = (
+            statement.offset(skip)
+            .limit(limit)
+            .order_by(*(column.desc() for column in order_by))
+        )
+        rows = list(db.exec(statement).all())
+        if not rows:
+            # A page past the end has no row to carry the total
+            if not skip:
+                return [], 0
+            return [], self._count_summaries(db, self._summary_statement(**filters))
+        return rows, rows[0].total
+
+    def search_summary_page(
+        self,
+        db: Session, /,
+        *,
+        owner_id: uuid.UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+        store_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        query: str | None = None,
+    ) -> tuple[list[Row[Any]], str | None, int]:
+        """
+        Keyset-paginated variant of search_summaries. Returns the page, the
+        cursor of the next page and the number of all matching documents.
+        """
+        filters: dict[str, Any] = {
+            "owner_id": owner_id,
+            "store_name": store_name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "query": query,
+        }
+        # Counted before the cursor condition, so every page has the full total
+        totals = (
+            self._summary_statement(**filters)
+            .with_only_columns(col(PDFDocument.id), func.count().over().label("total"))
+            .subquery()
+        )
+        statement = self._summary_statement(
+            **filters, extra_columns=[totals.c.total]
+        )
+        rows, next_cursor = paginate(
+            db,
+            statement.join(totals, totals.c.id == col(PDFDocument.id)),
+            columns=self._summary_order(statement, query=query),
+            cursor=cursor,
+            limit=limit,
+        )
+        if not rows:
+            if not cursor:
+                return [], None, 0
+            count = self._count_summaries(db, self._summary_statement(**filters))
+            return [], None, count
+        return rows, next_cursor, rows[0].total
+
     def get_with_extracted_data(
-        self, db: Session, *, document_id: int, owner_id: uuid.UUID
+        self, db: Session, /, *, document_id: int, owner_id: uuid.UUID
     ) -> PDFDocument | None:
         """Get document with its extracted data."""
         statement = (
@@ -68,18 +422,12 @@ class CRUDPDFDocument(CRUDBase[PDFDocument, PDFDocumentCreate, PDFDocumentUpdate
                 PDFDocument.id == document_id,
                 PDFDocument.owner_id == owner_id
             )
+            .options(selectinload(PDFDocument.extracted_data))  # type: ignore[arg-type]
         )
-        document = db.exec(statement).first()
-        if document:
-            # Load extracted data
-            extracted_statement = select(ExtractedData).where(
-                ExtractedData.document_id == document_id
-            )
-            document.extracted_data = list(db.exec(extracted_statement).all())
-        return document
+        return db.exec(statement).first()
 
     def get_multiple_with_extracted_data(
-        self, db: Session, *, document_ids: list[int], owner_id: uuid.UUID
+        self, db: Session, /, *, document_ids: list[int], owner_id: uuid.UUID
     ) -> list[PDFDocument]:
         """Get multiple documents with their extracted data."""
         statement = (
@@ -88,18 +436,9 @@ class CRUDPDFDocument(CRUDBase[PDFDocument, PDFDocumentCreate, PDFDocumentUpdate
                 col(PDFDocument.id).in_(document_ids),
                 PDFDocument.owner_id == owner_id
             )
+            .options(selectinload(PDFDocument.extracted_data))  # type: ignore[arg-type]
             .order_by(text("created_at DESC"))
         )
-        documents = list(db.exec(statement).all())
-
-        # Load extracted data for all documents
-        for document in documents:
-            extracted_statement = select(ExtractedData).where(
-                ExtractedData.document_id == document.id
-            )
-            document.extracted_data = list(db.exec(extracted_statement).all())
-
-        return documents
-
+        return list(db.exec(statement).all())
 
 pdf_document = CRUDPDFDocument(PDFDocument)
@@ -0,0 +1,341 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func, or_, select
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+from app.models.pdf_document import PDFDocument
+from app.models.processing_job import (
+    JobStatus,
+    ProcessingBatch,
+    ProcessingJob,
+    ProcessingJobCreate,
+    ProcessingJobUpdate,
+)
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING)
+
+# Error recorded when every attempt of a job ended with its worker gone
+ABANDONED_ERROR = "Processing did not finish, the worker stopped in every attempt"
+
+
+def _job_values(
+    document_id: int,
+    *,
+    status: JobStatus,
+    now: datetime,
+    batch_id: int | None = None,
+) -> dict[str, Any]:
+    """Column values of a new job, for inserts that bypass the ORM."""
+    return {
+        "document_id": document_id,
+        "batch_id": batch_id,
+        "status": status,
+        "attempts": 0,
+        "max_attempts": settings.PDF_JOB_MAX_ATTEMPTS,
+        "run_after": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class CRUDProcessingJob(
+    CRUDBase[ProcessingJob, ProcessingJobCreate, ProcessingJobUpdate]
+):
+    def get_active_by_document(
+        self, db: Session, *, document_id: int
+    ) -> ProcessingJob | None:
+        """Get the pending or running job for a document, if any."""
+        statement = select(ProcessingJob).where(
+            ProcessingJob.document_id == document_id,
+            col(ProcessingJob.status).in_(ACTIVE_STATUSES),
+        )
+        return db.exec(statement).first()
+
+    def get_latest_by_document(
+        self, db: Session, /, *, document_id: int
+    ) -> ProcessingJob | None:
+        statement = (
+            select(ProcessingJob)
+            .where(ProcessingJob.document_id == document_id)
+            .order_by(col(ProcessingJob.id).desc())
+            .limit(1)
+        )
+        return db.exec(statement).first()
+
+    def enqueue(
+        self, db: Session, *, document_id: int, commit: bool = True
+    ) -> ProcessingJob:
+        """
+        Queue a document for processing.
+
+        A document has at most one active job; enqueueing it again returns the
+        existing one. The partial unique index on active jobs enforces that,
+        so concurrent enqueues of one document insert a single job.
+        """
+        statement = (
+            pg_insert(ProcessingJob)
+            .values(
+                _job_values(
+                    document_id, status=JobStatus.PENDING, now=datetime.utcnow()
+                )
+            )
+            .on_conflict_do_nothing(
+                index_elements=["document_id"],
+                index_where=col(ProcessingJob.status).in_(ACTIVE_STATUSES),
+            )
+        )
+        db.execute(statement)
+        job = self.get_active_by_document(db, document_id=document_id)
+        assert job is not None
+        if commit:
+            db.commit()
+            db.refresh(job)
+        return job
+
+    def enqueue_many(self, db: Session, *, document_ids: list[int]) -> int:
+        """
+        Queue several documents with one insert, returns the number queued.
+
+        Documents that already have an active job are skipped and not counted.
+        """
+        if not document_ids:
+            return 0
+        now = datetime.utcnow()
+        statement = (
+            pg_insert(ProcessingJob)
+            .values(
+                [
+                    _job_values(document_id, status=JobStatus.PENDING, now=now)
+                    for document_id in document_ids
+                ]
+            )
+            .on_conflict_do_nothing(
+                index_elements=["document_id"],
+                index_where=col(ProcessingJob.status).in_(ACTIVE_STATUSES),
+            )
+            .returning(col(ProcessingJob.id))
+        )
+        queued = len(db.execute(statement).all())
+        db.commit()
+        return queued
+
+    def enqueue_batch(
+        self,
+        db: Session,
+        *,
+        owner_id: uuid.UUID,
+        document_ids: list[int],
+        completed_document_ids: list[int] | None = None,
+    ) -> ProcessingBatch:
+        """
+        Create a batch and queue its documents with one bulk insert.
+
+        ``completed_document_ids`` are documents that need no processing
+        (e.g. reused extraction results); they get succeeded jobs so the batch
+        progress covers every document. Does not commit.
+        """
+        batch = ProcessingBatch(owner_id=owner_id)
+        db.add(batch)
+        db.flush()
+
+        now = datetime.utcnow()
+        rows = [
+            _job_values(document_id, status=status, now=now, batch_id=batch.id)
+            for ids, status in (
+                (document_ids, JobStatus.PENDING),
+                (completed_document_ids or [], JobStatus.SUCCEEDED),
+            )
+            for document_id in ids
+        ]
+        if rows:
+            db.execute(insert(ProcessingJob), rows)
+        return batch
+
+    def get_batch(
+        self, db: Session, /, *, batch_id: int, owner_id: uuid.UUID
+    ) -> ProcessingBatch | None:
+        statement = select(ProcessingBatch).where(
+            ProcessingBatch.id == batch_id, ProcessingBatch.owner_id == owner_id
+        )
+        return db.exec(statement).first()
+
+    def count_by_status(self, db: Session, /, *, batch_id: int) -> dict[JobStatus, int]:
+        """Number of jobs per status in a batch, aggregated in the database."""
+        statement = (
+            select(col(ProcessingJob.status), func.count())
+            .where(ProcessingJob.batch_id == batch_id)
+            .group_by(ProcessingJob.status)
+        )
+        return dict(db.exec(statement).all())
+
+    def claim(
+        self,
+        db: Session,
+        *,
+        worker_id: str,
+        limit: int = 1,
+        visibility_timeout: int | None = None,
+    ) -> list[ProcessingJob]:
+        """
+        Claim up to ``limit`` jobs for a worker.
+
+        Claimable jobs are pending jobs that are due and running jobs whose
+        visibility timeout expired (their worker died) and that have attempts
+        left. Expired jobs without attempts left are failed first, so a PDF
+        that crashes or hangs its worker is not picked up forever. Rows are
+        locked with ``FOR UPDATE SKIP LOCKED``, so concurrent workers never
+        claim the same job and never wait on each other.
+        """
+        if visibility_timeout is None:
+            visibility_timeout = settings.PDF_JOB_VISIBILITY_TIMEOUT_SECONDS
+        now = datetime.utcnow()
+        self._fail_abandoned(db, now=now)
+        statement = (
+            select(ProcessingJob)
+            .where(
+                or_(
+                    and_(
+                        col(ProcessingJob.status) == JobStatus.PENDING,
+                        col(ProcessingJob.run_after) <= now,
+                    ),
+                    and_(
+                        col(ProcessingJob.status) == JobStatus.RUNNING,
+                        col(ProcessingJob.locked_until) < now,
+                        col(ProcessingJob.attempts) < col(ProcessingJob.max_attempts),
+                    ),
+                )
+            )
+            .order_by(col(ProcessingJob.run_after))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(db.exec(statement).all())
+        for job in jobs:
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_until = now + timedelta(seconds=visibility_timeout)
+            job.updated_at = now
+            db.add(job)
+        db.commit()
+        for job in jobs:
+            db.refresh(job)
+        return jobs
+
+    def _fail_abandoned(self, db: Session, *, now: datetime) -> None:
+        """
+        Fail expired running jobs that have no attempts left, and record the
+        error on their documents so they are not queued again. Does not commit.
+        """
+        statement = (
+            select(ProcessingJob)
+            .where(
+                col(ProcessingJob.status) == JobStatus.RUNNING,
+                col(ProcessingJob.locked_until) < now,
+                col(ProcessingJob.attempts) >= col(ProcessingJob.max_attempts),
+            )
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(db.exec(statement).all())
+        if not jobs:
+            return
+        for job in jobs:
+            job.status = JobStatus.FAILED
+            job.locked_until = None
+            job.last_error = ABANDONED_ERROR
+            job.updated_at = now
+            db.add(job)
+        db.execute(
+            update(PDFDocument)
+            .where(col(PDFDocument.id).in_([job.document_id for job in jobs]))
+            .values(processed=True, processing_error=ABANDONED_ERROR)
+        )
+        logger.warning(
+            "Gave up on jobs %s, their worker stopped in every attempt",
+            [job.id for job in jobs],
+        )
+
+    def _finish(
+        self,
+        db: Session,
+        *,
+        job: ProcessingJob,
+        worker_id: str,
+        values: dict[str, Any],
+    ) -> ProcessingJob | None:
+        """
+        Update a running job only while worker_id still holds the claim it
+        was given. When the lock expired and the job was claimed again, the
+        new claim's result wins; returns None then.
+        """
+        statement = (
+            update(ProcessingJob)
+            .where(
+                col(ProcessingJob.id) == job.id,
+                col(ProcessingJob.status) == JobStatus.RUNNING,
+                col(ProcessingJob.locked_by) == worker_id,
+                # Reclaiming counts an attempt, also when the same worker does it
+                col(ProcessingJob.attempts) == job.attempts,
+            )
+            .values(locked_until=None, updated_at=datetime.utcnow(), **values)
+            .returning(col(ProcessingJob.id))
+        )
+        updated = db.execute(statement).first()
+        db.commit()
+        if updated is None:
+            logger.warning(
+                "Job %s was claimed again after worker %s lost it, "
+                "its result is discarded",
+                job.id,
+                worker_id,
+            )
+            return None
+        db.refresh(job)
+        return job
+
+    def complete(
+        self, db: Session, *, job: ProcessingJob, worker_id: str
+    ) -> ProcessingJob | None:
+        return self._finish(
+            db,
+            job=job,
+            worker_id=worker_id,
+            values={"status": JobStatus.SUCCEEDED, "last_error": None},
+        )
+
+    def fail(
+        self, db: Session, *, job: ProcessingJob, worker_id: str, error: str
+    ) -> ProcessingJob | None:
+        """
+        Record a failed attempt.
+
+        The job is retried with exponential backoff until it has used up
+        ``max_attempts``, after which it is marked as failed for good.
+        Returns None when worker_id no longer holds the job.
+        """
+        values: dict[str, Any] = {"last_error": error}
+        if job.attempts >= job.max_attempts:
+            values["status"] = JobStatus.FAILED
+        else:
+            values["status"] = JobStatus.PENDING
+            values["run_after"] = datetime.utcnow() + timedelta(
+                seconds=retry_delay(job.attempts)
+            )
+        return self._finish(db, job=job, worker_id=worker_id, values=values)
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff in seconds before the next attempt, after ``attempts`` tries."""
+    delay = settings.PDF_JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return float(min(delay, settings.PDF_JOB_RETRY_MAX_SECONDS))
+
+
+processing_job = CRUDProcessingJob(ProcessingJob)
@@ -1,9 +1,15 @@
 import uuid
+from datetime import datetime
+from typing import Any
 
-from sqlalchemy import text
-from sqlmodel import Session, col, select
+from sqlalchemy import bindparam, delete, insert, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func, select
 
 from app.crud.base import CRUDBase
+from app.crud.crud_purchase_aggregate import purchase_aggregate
+from app.crud.pagination import paginate
+from app.models.extracted_data import ReceiptLineItem
 from app.models.product import (
     Product,
     ProductAlias,
@@ -12,9 +18,73 @@ from app.models.product import (
     ProductPurchase,
     ProductUpdate,
 )
+from app.services.product_catalog import product_catalog
 
 
 class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
+    """
+    Product CRUD. Every write also updates the in-process catalog index used
+    by the product matcher, so products must not be written around it. The
+    exception is get_or_create_many, which does not commit; its caller adds
+    the created products to the index after committing. Writes that change
+    which category or product purchases count towards also refresh the
+    spending aggregates of the users concerned.
+    """
+
+    def add(self, db: Session, *, db_obj: Product) -> Product:
+        """Insert an already built product."""
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        product_catalog.add_product(db_obj)
+        return db_obj
+
+    def create(self, db: Session, *, obj_in: ProductCreate) -> Product:
+        db_obj = super().create(db, obj_in=obj_in)
+        product_catalog.add_product(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Product,
+        obj_in: ProductUpdate | dict[str, Any],
+    ) -> Product:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        category = db_obj.category
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        if db_obj.category != category:
+            # The aggregates change in the same transaction as the category
+            db.flush()
+            purchase_aggregate.refresh_users(
+                db, user_ids=self._purchaser_ids(db, product_ids=[db_obj.id])
+            )
+        db.commit()
+        db.refresh(db_obj)
+        product_catalog.add_product(db_obj)
+        return db_obj
+
+    def _purchaser_ids(self, db: Session, *, product_ids: list[int]) -> list[uuid.UUID]:
+        """Users who bought any of the products."""
+        statement = (
+            select(ProductPurchase.user_id)
+            .where(col(ProductPurchase.product_id).in_(product_ids))
+            .distinct()
+        )
+        return list(db.exec(statement).all())
+
+    def remove(self, db: Session, *, id: Any) -> Product | None:
+        obj = super().remove(db, id=id)
+        if obj is not None:
+            product_catalog.remove_product(id)
+        return obj
+
     def get_by_name(self, db: Session, *, name: str) -> Product | None:
         """Get product by exact name match."""
         statement = select(Product).where(Product.name == name)
@@ -27,13 +97,110 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         statement = select(Product).where(Product.normalized_name == normalized_name)
         return db.exec(statement).first()
 
+    def get_or_create_many(
+        self, db: Session, *, products: list[Product]
+    ) -> tuple[dict[str, Product], list[Product]]:
+        """
+        Insert the products whose normalized name does not exist yet.
+
+        New products are inserted with a single INSERT ... ON CONFLICT
+        (normalized_name) DO NOTHING, so a product created concurrently by
+        another receipt is not an error, and existing ones are read with one
+        SELECT. Does not commit.
+
+        Returns every product by normalized name, and the products that were
+        created. Created products are not attached to the session.
+        """
+        by_name = {product.normalized_name: product for product in products}
+        if not by_name:
+            return {}, []
+
+        table = Product.__table__  # type: ignore[attr-defined]
+        statement = (
+            pg_insert(table)
+            .values(
+                [product.model_dump(exclude={"id"}) for product in by_name.values()]
+            )
+            .on_conflict_do_nothing(index_elements=["normalized_name"])
+            .returning(*table.columns)
+        )
+        created = [Product(**row._mapping) for row in db.execute(statement)]
+
+        result = {product.normalized_name: product for product in created}
+        missing = [name for name in by_name if name not in result]
+        if missing:
+            existing = db.exec(
+                select(Product).where(col(Product.normalized_name).in_(missing))
+            )
+            result.update((product.normalized_name, product) for product in existing)
+        return result, created
+
+    def merge_many(self, db: Session, *, merges: dict[int, int]) -> int:
+        """
+        Merge products into others, given as ``{source_id: target_id}``.
+
+        Purchases, aliases and receipt lines of each source move to its
+        target, the source names are kept as aliases of the target so receipts
+        spelling them the same way still match, and the sources are deleted.
+        Targets must not be sources themselves. The spending aggregates of the
+        users who bought a source are recomputed. Runs in one transaction;
+        returns the number of products removed.
+        """
+        if not merges:
+            return 0
+        sources = db.exec(
+            select(Product).where(col(Product.id).in_(list(merges)))
+        ).all()
+        moves = [
+            {"source_id": source.id, "target_id": merges[source.id]}
+            for source in sources
+        ]
+        if not moves:
+            return 0
+        source_ids = [source.id for source in sources]
+        purchaser_ids = self._purchaser_ids(db, product_ids=source_ids)
+
+        connection = db.connection()
+        for table in (ProductPurchase, ProductAlias, ReceiptLineItem):
+            connection.execute(
+                update(table)
+                .where(col(table.product_id) == bindparam("source_id"))
+                .values(product_id=bindparam("target_id")),
+                moves,
+            )
+        alias_table = ProductAlias.__table__  # type: ignore[attr-defined]
+        aliases = [
+            ProductAlias(**row._mapping)
+            for row in db.execute(
+                insert(alias_table).returning(*alias_table.columns),
+                [
+                    {
+                        "product_id": merges[source.id],
+                        "alias_name": source.name,
+                        "normalized_alias": source.normalized_name,
+                        "created_at": datetime.utcnow(),
+                    }
+                    for source in sources
+                ],
+            )
+        ]
+        purchase_aggregate.refresh_users(db, user_ids=purchaser_ids)
+        db.execute(delete(Product).where(col(Product.id).in_(source_ids)))
+        db.commit()
+
+        for source_id in source_ids:
+            product_catalog.remove_product(source_id)
+        for alias in aliases:
+            product_catalog.add_alias(alias)
+        return len(sources)
+
     def get_by_barcode(self, db: Session, *, barcode: str) -> Product | None:
         """Get product by barcode."""
         statement = select(Product).where(Product.barcode == barcode)
         return db.exec(statement).first()
 
     def search_by_name(
-        self, db: Session, *, query: str, limit: int = 10
+        self, db: Session, /, *, query: str, limit: int = 10
     ) -> list[Product]:
         """Search products by name with fuzzy matching."""
         # Use ILIKE for case-insensitive partial matching
@@ -48,7 +215,7 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         return list(db.exec(statement).all())
 
     def get_by_category(
-        self, db: Session, *, category: ProductCategory, skip: int = 0, limit: int = 100
+        self, db: Session, /, *, category: ProductCategory, skip: int = 0, limit: int = 100
     ) -> list[Product]:
         """Get products by category."""
         statement = (
@@ -60,8 +227,27 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         )
         return list(db.exec(statement).all())
 
+    def get_page_by_category(
+        self,
+        db: Session, /,
+        *,
+        category: ProductCategory,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[Product], str | None]:
+        """Keyset-paginated variant of get_by_category, ordered by name."""
+        statement = select(Product).where(Product.category == category)
+        return paginate(
+            db,
+            statement,
+            columns=[col(Product.name), col(Product.id)],
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+        )
+
     def get_popular_products(
-        self, db: Session, *, user_id: uuid.UUID | None = None, limit: int = 20
+        self, db: Session, /, *, user_id: uuid.UUID | None = None, limit: int = 20
     ) -> list[Product]:
         """Get most frequently purchased products."""
         statement = select(Product).join(ProductPurchase)
@@ -77,40 +263,38 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         return list(db.exec(statement).all())
 
     def find_similar_products(
-        self, db: Session, *, product_name: str, category: ProductCategory | None = None
+        self,
+        db: Session,
+        *,
+        product_name: str,
+        category: ProductCategory | None = None,
+        limit: int = 10,
     ) -> list[Product]:
-        """Find products with similar names for matching suggestions."""
-        # Simple similarity search - can be enhanced with more sophisticated algorithms
-        words = product_name.lower().split()
-        conditions = []
-
-        for word in words:
-            if len(word) > 2:  # Skip very short words
-                conditions.append(col(Product.normalized_name).ilike(f"%{word}%"))
-
-        if not conditions:
-            return []
-
-        statement = select(Product)
-
-        # Combine conditions with OR
-        if len(conditions) == 1:
-            statement = statement.where(conditions[0])
-        else:
-            statement = statement.where(conditions[0])
-            for condition in conditions[1:]:
-                statement = statement.where(condition)
+        """
+        Find products with similar names for matching suggestions, most
+        similar first.
+
+        Uses pg_trgm: the % operator is served by the trigram GIN index on
+        normalized_name and keeps names above pg_trgm.similarity_threshold
+        (0.3 by default).
+        """
+        normalized_name = product_name.lower().strip()
+        statement = select(Product).where(
+            col(Product.normalized_name).op("%")(normalized_name)
+        )
 
         if category:
             statement = statement.where(Product.category == category)
 
-        statement = statement.limit(10)
+        statement = statement.order_by(
+            func.similarity(Product.normalized_name, normalized_name).desc()
+        ).limit(limit)
         return list(db.exec(statement).all())
 
 
 class CRUDProductPurchase(CRUDBase[ProductPurchase, dict, dict]):
     def get_by_user(
-        self, db: Session, *, user_id: uuid.UUID, skip: int = 0, limit: int = 100
+        self, db: Session, /, *, user_id: uuid.UUID, skip: int = 0, limit: int = 100
     ) -> list[ProductPurchase]:
         """Get user's product purchases."""
         from sqlalchemy.orm import selectinload
@@ -130,8 +314,44 @@ class CRUDProductPurchase(CRUDBase[ProductPurchase, dict, dict]):
         )
         return list(db.exec(statement).all())
 
+    def get_page_by_user(
+        self,
+        db: Session, /,
+        *,
+        user_id: uuid.UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[ProductPurchase], str | None]:
+        """
+        Keyset-paginated variant of get_by_user.
+
+        Pages are ordered newest first on ``(purchase_date, id)``. Returns
+        the page and the cursor of the next page.
+        """
+        from sqlalchemy.orm import selectinload
+
+        from app.models.extracted_data import ExtractedData
+
+        statement = (
+            select(ProductPurchase)
+            .where(ProductPurchase.user_id == user_id)
+            .options(
+                selectinload(
+                    ProductPurchase.extracted_data  # type: ignore[arg-type]
+                ).selectinload(ExtractedData.document),  # type: ignore[arg-type]
+                selectinload(ProductPurchase.product),  # type: ignore[arg-type]
+            )
+        )
+        return paginate(
+            db,
+            statement,
+            columns=[col(ProductPurchase.purchase_date), col(ProductPurchase.id)],
+            cursor=cursor,
+            limit=limit,
+        )
+
     def get_by_product(
-        self, db: Session, *, product_id: int, user_id: uuid.UUID | None = None
+        self, db: Session, /, *, product_id: int, user_id: uuid.UUID | None = None
     ) -> list[ProductPurchase]:
         """Get purchases for a specific product."""
         statement = select(ProductPurchase).where(
@@ -152,10 +372,33 @@ class CRUDProductPurchase(CRUDBase[ProductPurchase, dict, dict]):
         # For now, return empty list
         return []
 
+    def create_many(
+        self, db: Session, *, purchases: list[dict[str, Any]]
+    ) -> list[ProductPurchase]:
+        """
+        Insert many purchases with a single INSERT ... RETURNING statement,
+        and add them to the spending aggregates.
+
+        Returns the new purchases in the order of ``purchases``. Does not
+        commit.
+        """
+        if not purchases:
+            return []
+        statement = insert(ProductPurchase).returning(
+            ProductPurchase, sort_by_parameter_order=True
+        )
+        created = list(db.scalars(statement, purchases).all())
+        purchase_aggregate.add_purchases(
+            db, purchase_ids=[purchase.id for purchase in created]
+        )
+        return created
+
     def create_purchase(self, db: Session, *, purchase_data: dict) -> ProductPurchase:
         """Create a new product purchase record."""
         purchase = ProductPurchase(**purchase_data)
         db.add(purchase)
+        db.flush()
+        purchase_aggregate.add_purchases(db, purchase_ids=[purchase.id])
         db.commit()
         db.refresh(purchase)
         return purchase
@@ -195,8 +438,15 @@ class CRUDProductAlias(CRUDBase[ProductAlias, dict, dict]):
         db.add(alias)
         db.commit()
         db.refresh(alias)
+        product_catalog.add_alias(alias)
         return alias
 
+    def remove(self, db: Session, *, id: Any) -> ProductAlias | None:
+        obj = super().remove(db, id=id)
+        if obj is not None:
+            product_catalog.remove_alias(id)
+        return obj
+
 
 # Create instances
 product = CRUDProduct(Product)
@@ -0,0 +1,186 @@
+import uuid
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, delete, insert, literal_column
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func, select
+
+from app.models.product import (
+    Product,
+    ProductCategory,
+    ProductPurchase,
+    UserCategorySpending,
+    UserProductSpending,
+)
+
+# A literal, not a bound parameter, so GROUP BY matches the selected month
+_MONTH = func.date_trunc(literal_column("'month'"), ProductPurchase.purchase_date)
+
+_CATEGORY_COLUMNS = ["user_id", "category", "month", "purchase_count", "total_spent"]
+_PRODUCT_COLUMNS = [
+    "user_id",
+    "product_id",
+    "purchase_count",
+    "total_spent",
+    "last_purchase_date",
+]
+
+
+# Core selects: they feed INSERT ... SELECT and have more columns than
+# sqlmodel's select is typed for
+def _category_totals(where: ColumnElement[bool] | None) -> Select[Any]:
+    statement = (
+        sa_select(
+            col(ProductPurchase.user_id),
+            col(Product.category),
+            _MONTH,
+            func.count(),
+            func.sum(ProductPurchase.total_price),
+        )
+        .join(Product, col(Product.id) == col(ProductPurchase.product_id))
+        .group_by(col(ProductPurchase.user_id), col(Product.category), _MONTH)
+        # Rows are locked in key order, so concurrent upserts cannot deadlock
+        .order_by(col(ProductPurchase.user_id), col(Product.category), _MONTH)
+    )
+    return statement if where is None else statement.where(where)
+
+
+def _product_totals(where: ColumnElement[bool] | None) -> Select[Any]:
+    statement = (
+        sa_select(
+            col(ProductPurchase.user_id),
+            col(ProductPurchase.product_id),
+            func.count(),
+            func.sum(ProductPurchase.total_price),
+            func.max(ProductPurchase.purchase_date),
+        )
+        .group_by(col(ProductPurchase.user_id), col(ProductPurchase.product_id))
+        .order_by(col(ProductPurchase.user_id), col(ProductPurchase.product_id))
+    )
+    return statement if where is None else statement.where(where)
+
+
+class CRUDPurchaseAggregate:
+    """
+    Spending aggregates of product purchases, per user x category x month
+    and per user x product, so insights never scan a user's purchases.
+
+    The aggregates are derived data and every write of purchases must keep
+    them in step, in the same transaction: add_purchases after inserting
+    purchases, refresh_users after purchases move to another product or a
+    product changes category. rebuild recomputes them from scratch. None of
+    the writes commit.
+    """
+
+    def add_purchases(self, db: Session, *, purchase_ids: Sequence[int]) -> None:
+        """Add newly inserted purchases to the aggregates of their users."""
+        if not purchase_ids:
+            return
+        where = col(ProductPurchase.id).in_(purchase_ids)
+
+        category_table = UserCategorySpending.__table__  # type: ignore[attr-defined]
+        statement = pg_insert(category_table).from_select(
+            _CATEGORY_COLUMNS, _category_totals(where)
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "category", "month"],
+                set_={
+                    "purchase_count": category_table.c.purchase_count
+                    + statement.excluded.purchase_count,
+                    "total_spent": category_table.c.total_spent
+                    + statement.excluded.total_spent,
+                },
+            )
+        )
+
+        product_table = UserProductSpending.__table__  # type: ignore[attr-defined]
+        statement = pg_insert(product_table).from_select(
+            _PRODUCT_COLUMNS, _product_totals(where)
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "product_id"],
+                set_={
+                    "purchase_count": product_table.c.purchase_count
+                    + statement.excluded.purchase_count,
+                    "total_spent": product_table.c.total_spent
+                    + statement.excluded.total_spent,
+                    "last_purchase_date": func.greatest(
+                        product_table.c.last_purchase_date,
+                        statement.excluded.last_purchase_date,
+                    ),
+                },
+            )
+        )
+
+    def refresh_users(self, db: Session, *, user_ids: Iterable[uuid.UUID]) -> None:
+        """Recompute the aggregates of some users from their purchases."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        for table in (UserCategorySpending, UserProductSpending):
+            db.execute(delete(table).where(col(table.user_id).in_(user_ids)))
+        self._insert(db, col(ProductPurchase.user_id).in_(user_ids))
+
+    def rebuild(self, db: Session) -> None:
+        """Recompute the aggregates of all users from their purchases."""
+        for table in (UserCategorySpending, UserProductSpending):
+            db.execute(delete(table))
+        self._insert(db, None)
+
+    def _insert(self, db: Session, where: ColumnElement[bool] | None) -> None:
+        db.execute(
+            insert(UserCategorySpending).from_select(
+                _CATEGORY_COLUMNS, _category_totals(where)
+            )
+        )
+        db.execute(
+            insert(UserProductSpending).from_select(
+                _PRODUCT_COLUMNS, _product_totals(where)
+            )
+        )
+
+    def get_category_spending(
+        self, db: Session, *, user_id: uuid.UUID
+    ) -> list[tuple[ProductCategory, int, float]]:
+        """Purchase count and amount spent per category, biggest spend first."""
+        spent = func.sum(UserCategorySpending.total_spent)
+        statement = (
+            select(
+                col(UserCategorySpending.category),
+                func.sum(UserCategorySpending.purchase_count),
+                spent,
+            )
+            .where(UserCategorySpending.user_id == user_id)
+            .group_by(col(UserCategorySpending.category))
+            .order_by(spent.desc())
+        )
+        return [
+            (category, int(count), float(total))
+            for category, count, total in db.exec(statement)
+        ]
+
+    def get_frequent_products(
+        self, db: Session, *, user_id: uuid.UUID, limit: int = 10
+    ) -> list[tuple[Product, UserProductSpending]]:
+        """The products a user bought most often, with their totals."""
+        statement = (
+            select(Product, UserProductSpending)
+            .join(
+                UserProductSpending,
+                col(UserProductSpending.product_id) == col(Product.id),
+            )
+            .where(UserProductSpending.user_id == user_id)
+            .order_by(
+                col(UserProductSpending.purchase_count).desc(),
+                col(UserProductSpending.product_id),
+            )
+            .limit(limit)
+        )
+        return list(db.exec(statement).all())
+
+
+purchase_aggregate = CRUDPurchaseAggregate()
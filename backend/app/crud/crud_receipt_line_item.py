@@ -0,0 +1,173 @@
+import logging
+import uuid
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from sqlalchemy import case, insert, literal, update
+from sqlmodel import Session, col, select
+
+from app.models.extracted_data import ExtractedData, ReceiptLineItem
+
+logger = logging.getLogger(__name__)
+
+# Columns copied as they are when an extraction is reused for another document
+_COPIED_COLUMNS = [
+    "line_index",
+    "owner_id",
+    "transaction_date",
+    "product_id",
+    "name",
+    "quantity",
+    "price",
+    "original_price",
+    "discount_amount",
+    "tax_code",
+    "unit_type",
+    "is_discount",
+]
+
+
+def _amount(value: Any) -> Decimal | None:
+    if value is None:
+        return None
+    # Through str, so 0.1 is stored as 0.1 and not its binary approximation
+    return Decimal(str(value))
+
+
+def _text(value: Any, max_length: int) -> str | None:
+    # Cut to the column length, as left() does in the backfill migration
+    return None if value is None else str(value)[:max_length]
+
+
+def line_item_values(
+    extracted_data: ExtractedData, owner_id: uuid.UUID
+) -> list[dict[str, Any]]:
+    """
+    Column values of the line items of a receipt, one per entry of its items
+    that has a name and a price. line_index is the position in items either
+    way, so it can be matched against per-item results.
+    """
+    rows: list[dict[str, Any]] = []
+    for line_index, item in enumerate(extracted_data.items or []):
+        if not isinstance(item, dict) or not item.get("name"):
+            continue
+        try:
+            price = _amount(item.get("price"))
+            original_price = _amount(item.get("original_price"))
+            discount_amount = _amount(item.get("discount_amount"))
+        except (InvalidOperation, TypeError, ValueError):
+            logger.warning(
+                "Skipping item %s of extracted data %s with an invalid price",
+                line_index,
+                extracted_data.id,
+            )
+            continue
+        if price is None:
+            continue
+        rows.append(
+            {
+                "extracted_data_id": extracted_data.id,
+                "line_index": line_index,
+                "owner_id": owner_id,
+                "transaction_date": extracted_data.transaction_date,
+                "name": str(item["name"])[:255],
+                "quantity": float(item.get("quantity") or 1.0),
+                "price": price,
+                "original_price": original_price,
+                "discount_amount": discount_amount,
+                "tax_code": _text(item.get("tax_code"), 8),
+                "unit_type": _text(item.get("unit_type"), 20),
+                "is_discount": bool(item.get("is_discount", False)),
+            }
+        )
+    return rows
+
+
+class CRUDReceiptLineItem:
+    """
+    Receipt items as rows, written from ExtractedData.items together with
+    the receipt. None of the writes commit.
+    """
+
+    def create_for_receipt(
+        self, db: Session, *, extracted_data: ExtractedData, owner_id: uuid.UUID
+    ) -> int:
+        """Insert the line items of a flushed receipt; returns how many."""
+        rows = line_item_values(extracted_data, owner_id)
+        if rows:
+            db.execute(insert(ReceiptLineItem), rows)
+        return len(rows)
+
+    def copy_to_receipt(self, db: Session, *, source_id: int, target_id: int) -> None:
+        """Copy the line items of one receipt to another, inside the database."""
+        columns = [getattr(ReceiptLineItem, name) for name in _COPIED_COLUMNS]
+        db.execute(
+            insert(ReceiptLineItem).from_select(
+                ["extracted_data_id", *_COPIED_COLUMNS],
+                select(literal(target_id), *columns).where(
+                    col(ReceiptLineItem.extracted_data_id) == source_id
+                ),
+            )
+        )
+
+    def link_products(
+        self, db: Session, *, extracted_data_id: int, product_ids: dict[int, int]
+    ) -> None:
+        """Set the products of a receipt's lines, given as {line_index: id}."""
+        if not product_ids:
+            return
+        db.execute(
+            update(ReceiptLineItem)
+            .where(
+                col(ReceiptLineItem.extracted_data_id) == extracted_data_id,
+                col(ReceiptLineItem.line_index).in_(list(product_ids)),
+            )
+            .values(product_id=case(product_ids, value=ReceiptLineItem.line_index))
+        )
+
+    def get_by_receipt(
+        self, db: Session, *, extracted_data_id: int
+    ) -> list[ReceiptLineItem]:
+        """The line items of a receipt, in receipt order."""
+        statement = (
+            select(ReceiptLineItem)
+            .where(ReceiptLineItem.extracted_data_id == extracted_data_id)
+            .order_by(col(ReceiptLineItem.line_index))
+        )
+        return list(db.exec(statement).all())
+
+    def get_by_name(
+        self,
+        db: Session,
+        *,
+        owner_id: uuid.UUID,
+        name: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[ReceiptLineItem]:
+        """
+        An owner's lines with exactly this name, optionally between two
+        transaction dates (both included), oldest first.
+        """
+        statement = select(ReceiptLineItem).where(
+            ReceiptLineItem.owner_id == owner_id, ReceiptLineItem.name == name
+        )
+        if start_date is not None:
+            statement = statement.where(
+                col(ReceiptLineItem.transaction_date) >= start_date
+            )
+        if end_date is not None:
+            statement = statement.where(
+                col(ReceiptLineItem.transaction_date) <= end_date
+            )
+        return list(
+            db.exec(
+                statement.order_by(
+                    col(ReceiptLineItem.transaction_date), col(ReceiptLineItem.id)
+                )
+            ).all()
+        )
+
+
+receipt_line_item = CRUDReceiptLineItem()
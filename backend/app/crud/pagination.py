@@ -0,0 +1,113 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, Row, tuple_
+from sqlalchemy.orm import Mapped, QueryableAttribute
+from sqlmodel import Session
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+# Response header carrying the cursor of the next page for list endpoints
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# A column of the model (as returned by col()), or a labelled expression that
+# is also selected
+KeyColumn = Mapped[Any] | ColumnElement[Any]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, date) else value for value in values]
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[KeyColumn]) -> tuple[Any, ...]:
+    """Decode a cursor back into typed values for the given key columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursorError("Invalid cursor")
+        decoded = []
+        for value, column in zip(values, columns, strict=True):
+            try:
+                python_type = _expression(column).type.python_type
+            except NotImplementedError:
+                # Types such as sqlmodel's AutoString; the JSON value is used
+                python_type = None
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return tuple(decoded)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def paginate[T](
+    db: Session,
+    statement: SelectOfScalar[T] | Select[T],
+    *,
+    columns: Sequence[KeyColumn],
+    cursor: str | None = None,
+    limit: int = 100,
+    descending: bool = True,
+) -> tuple[list[T], str | None]:
+    """
+    Keyset pagination over ``statement``, ordered by ``columns``.
+
+    ``statement`` may select entities or columns, as long as each key column
+    can be read by name from the rows or from the entity selected first, so
+    a key may start with a labelled expression such as a rank. The last
+    column must make the key unique (usually the primary key). Rows
+    after the cursor are found with a row-value comparison, so with a
+    matching composite index every page costs the same regardless of how
+    deep it is. Returns the page and the
+    cursor of the next page, or None on the last page.
+    """
+    expressions = [_expression(column) for column in columns]
+    if cursor:
+        key = tuple_(*expressions)
+        boundary = tuple_(*decode_cursor(cursor, expressions))
+        statement = statement.where(key < boundary if descending else key > boundary)
+    order_by = [
+        expression.desc() if descending else expression.asc()
+        for expression in expressions
+    ]
+    rows = list(db.exec(statement.order_by(*order_by).limit(limit + 1)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [_key_value(last, expression) for expression in expressions]
+        )
+    return rows, next_cursor
+
+
+def _expression(column: KeyColumn) -> ColumnElement[Any]:
+    if isinstance(column, ColumnElement):
+        return column
+    # col() types model attributes as Mapped, they wrap the table column
+    assert isinstance(column, QueryableAttribute)
+    return column.expression
+
+
+def _key_value(row: Any, column: ColumnElement[Any]) -> Any:
+    key = column.key
+    assert key is not None
+    if isinstance(row, Row) and not hasattr(row, key):
+        # An entity selected with extra columns, the key is on the entity
+        row = row[0]
+    return getattr(row, key)
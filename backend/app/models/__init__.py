@@ -3,6 +3,7 @@ from .extracted_data import (
     ExtractedDataCreate,
     ExtractedDataRead,
     ExtractedDataUpdate,
+    ReceiptLineItem,
 )
 from .item import Item
 from .pdf_document import (
@@ -11,21 +12,32 @@ from .pdf_document import (
     PDFDocumentRead,
     PDFDocumentUpdate,
 )
+from .processing_job import (
+    JobStatus,
+    ProcessingBatch,
+    ProcessingJob,
+    ProcessingJobCreate,
+    ProcessingJobUpdate,
+)
 from .product import (
     Product,
     ProductAlias,
     ProductCategory,
     ProductCreate,
+    ProductInsightsRead,
     ProductPurchase,
     ProductPurchaseRead,
     ProductRead,
     ProductUpdate,
+    UserCategorySpending,
+    UserProductSpending,
 )
-from .user import User
+from .user import DuplicateUploadPolicy, User
 
 __all__ = [
     "Item",
     "User",
+    "DuplicateUploadPolicy",
     "PDFDocument",
     "PDFDocumentCreate",
     "PDFDocumentRead",
@@ -34,12 +46,21 @@ __all__ = [
     "ExtractedDataCreate",
     "ExtractedDataRead",
     "ExtractedDataUpdate",
+    "ReceiptLineItem",
+    "JobStatus",
+    "ProcessingBatch",
+    "ProcessingJob",
+    "ProcessingJobCreate",
+    "ProcessingJobUpdate",
     "Product",
     "ProductAlias",
     "ProductCategory",
     "ProductCreate",
+    "ProductInsightsRead",
     "ProductPurchase",
     "ProductPurchaseRead",
     "ProductRead",
     "ProductUpdate",
+    "UserCategorySpending",
+    "UserProductSpending",
 ]
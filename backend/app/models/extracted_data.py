@@ -1,7 +1,10 @@
+import uuid
 from datetime import date, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any
 
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import JSON, Column, Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -46,13 +49,100 @@ class ExtractedDataBase(SQLModel):
 
 
 class ExtractedData(ExtractedDataBase, table=True):
+    __table_args__ = (
+        # An owner's receipts within a date range
+        Index(
+            "ix_extracteddata_owner_id_transaction_date",
+            "owner_id",
+            "transaction_date",
+        ),
+        # Trigram index for the substring (ILIKE) store search
+        Index(
+            "ix_extracteddata_store_name_trgm",
+            "store_name",
+            postgresql_using="gin",
+            postgresql_ops={"store_name": "gin_trgm_ops"},
+        ),
+        # Full-text document of the store name, item names and raw text, set
+        # by a trigger (see the add_extracted_data_full_text_search migration).
+        # Not mapped, so loading a receipt does not load it
+        Column("search_vector", TSVECTOR),
+        Index(
+            "ix_extracteddata_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: int | None = Field(default=None, primary_key=True)
     document_id: int = Field(foreign_key="pdfdocument.id", nullable=False, index=True)
+    # Owner of the document, copied so searches need no join
+    owner_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
     document: "PDFDocument" = Relationship(back_populates="extracted_data")
+    line_items: list["ReceiptLineItem"] = Relationship(
+        back_populates="extracted_data", cascade_delete=True
+    )
+
+
+class ReceiptLineItem(SQLModel, table=True):
+    """
+    One entry of ExtractedData.items as a row, so item level queries are
+    index lookups instead of scans of every receipt's JSON
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_receiptlineitem_extracted_data_id_line_index",
+            "extracted_data_id",
+            "line_index",
+            unique=True,
+        ),
+        # An owner's lines of one item, and an owner's lines over time
+        Index("ix_receiptlineitem_owner_id_name", "owner_id", "name"),
+        Index(
+            "ix_receiptlineitem_owner_id_transaction_date",
+            "owner_id",
+            "transaction_date",
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    extracted_data_id: int = Field(
+        foreign_key="extracteddata.id", nullable=False, ondelete="CASCADE"
+    )
+    # Position in ExtractedData.items
+    line_index: int
+
+    # Copied from the receipt and its document, so queries need no joins
+    owner_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    transaction_date: date | None = None
+
+    # Set once the item is matched to a product
+    product_id: int | None = Field(
+        default=None, foreign_key="product.id", index=True, ondelete="SET NULL"
+    )
+
+    name: str = Field(max_length=255)
+    quantity: float = Field(default=1.0)
+    # Price of the line, after its discount if it had one
+    price: Decimal
+    original_price: Decimal | None = None
+    discount_amount: Decimal | None = None
+    tax_code: str | None = Field(default=None, max_length=8)
+    unit_type: str | None = Field(default=None, max_length=20)  # "pieces", "deposit"
+    is_discount: bool = Field(default=False)
+
+    # Relationships
+    extracted_data: ExtractedData = Relationship(back_populates="line_items")
 
 
 class ExtractedDataCreate(ExtractedDataBase):
@@ -2,10 +2,12 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from .extracted_data import ExtractedData
+    from .processing_job import ProcessingJob
     from .user import User
 
 
@@ -15,11 +17,20 @@ class PDFDocumentBase(SQLModel):
     file_size: int
     content_type: str
     file_path: str
+    # SHA-256 of the file content, files are stored under this name
+    content_hash: str | None = Field(default=None, max_length=64)
     processed: bool = Field(default=False)
     processing_error: str | None = None
 
 
 class PDFDocument(PDFDocumentBase, table=True):
+    __table_args__ = (
+        # Duplicate upload lookup
+        Index("ix_pdfdocument_owner_id_content_hash", "owner_id", "content_hash"),
+        # Keyset pagination of an owner's documents, newest first
+        Index("ix_pdfdocument_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     owner_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -28,6 +39,7 @@ class PDFDocument(PDFDocumentBase, table=True):
     # Relationships
     owner: "User" = Relationship(back_populates="pdf_documents")
     extracted_data: list["ExtractedData"] = Relationship(back_populates="document", cascade_delete=True)
+    processing_jobs: list["ProcessingJob"] = Relationship(back_populates="document", cascade_delete=True)
 
 
 class PDFDocumentCreate(PDFDocumentBase):
@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Index, text
+from sqlmodel import Field, Relationship, SQLModel
+
+if TYPE_CHECKING:
+    from .pdf_document import PDFDocument
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a document processing job"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ProcessingBatch(SQLModel, table=True):
+    """A group of jobs created by one batch upload, polled for progress"""
+
+    id: int | None = Field(default=None, primary_key=True)
+    owner_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, index=True, ondelete="CASCADE"
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # Relationships
+    jobs: list["ProcessingJob"] = Relationship(back_populates="batch")
+
+
+class ProcessingJob(SQLModel, table=True):
+    """Durable queue entry for extracting data from an uploaded PDF"""
+
+    __table_args__ = (
+        # Dequeue scans pending jobs that are due and expired running jobs
+        Index("ix_processingjob_status_run_after", "status", "run_after"),
+        # At most one pending or running job per document
+        Index(
+            "ix_processingjob_document_id_active",
+            "document_id",
+            unique=True,
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')"),
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    document_id: int = Field(
+        foreign_key="pdfdocument.id", nullable=False, index=True, ondelete="CASCADE"
+    )
+    batch_id: int | None = Field(
+        default=None, foreign_key="processingbatch.id", index=True, ondelete="SET NULL"
+    )
+    status: JobStatus = Field(default=JobStatus.PENDING)
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=5)
+    # Earliest time the job may be claimed, pushed back on retry
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    # Visibility timeout: a running job whose lock expired is claimable again
+    locked_until: datetime | None = None
+    locked_by: str | None = Field(default=None, max_length=255)
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # Relationships
+    document: "PDFDocument" = Relationship(back_populates="processing_jobs")
+    batch: ProcessingBatch | None = Relationship(back_populates="jobs")
+
+
+class ProcessingJobCreate(SQLModel):
+    document_id: int
+    max_attempts: int = 5
+
+
+class ProcessingJobUpdate(SQLModel):
+    status: JobStatus | None = None
+    run_after: datetime | None = None
+    last_error: str | None = None
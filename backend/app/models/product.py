@@ -3,6 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -29,7 +30,7 @@ class ProductCategory(str, Enum):
 
 class ProductBase(SQLModel):
     name: str = Field(index=True)
-    normalized_name: str = Field(index=True)  # For matching variations
+    normalized_name: str = Field(index=True, unique=True)  # For matching variations
     category: ProductCategory
     brand: str | None = None
     barcode: str | None = Field(default=None, index=True)
@@ -61,6 +62,18 @@ class ProductBase(SQLModel):
 
 
 class Product(ProductBase, table=True):
+    __table_args__ = (
+        # Keyset pagination of a category, ordered by name
+        Index("ix_product_category_name_id", "category", "name", "id"),
+        # Trigram index for similarity (%) and ILIKE lookups
+        Index(
+            "ix_product_normalized_name_trgm",
+            "normalized_name",
+            postgresql_using="gin",
+            postgresql_ops={"normalized_name": "gin_trgm_ops"},
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -72,6 +85,16 @@ class Product(ProductBase, table=True):
 class ProductPurchase(SQLModel, table=True):
     """Links extracted receipt items to products"""
 
+    __table_args__ = (
+        # Keyset pagination of a user's purchases, newest first
+        Index(
+            "ix_productpurchase_user_id_purchase_date_id",
+            "user_id",
+            "purchase_date",
+            "id",
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
 
     # Foreign keys
@@ -104,6 +127,16 @@ class ProductPurchase(SQLModel, table=True):
 class ProductAlias(SQLModel, table=True):
     """Alternative names for products to improve matching"""
 
+    __table_args__ = (
+        # Trigram index for the substring (ILIKE) alias lookup
+        Index(
+            "ix_productalias_normalized_alias_trgm",
+            "normalized_alias",
+            postgresql_using="gin",
+            postgresql_ops={"normalized_alias": "gin_trgm_ops"},
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
     product_id: int = Field(foreign_key="product.id", index=True)
     alias_name: str = Field(index=True)
@@ -112,6 +145,48 @@ class ProductAlias(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class UserCategorySpending(SQLModel, table=True):
+    """
+    Purchases of a user per product category and month, maintained by
+    crud.purchase_aggregate as purchases are inserted
+    """
+
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    category: ProductCategory = Field(primary_key=True)
+    # First instant of the month, in the time zone of purchase_date
+    month: datetime = Field(primary_key=True)
+    purchase_count: int = Field(default=0)
+    total_spent: float = Field(default=0.0)
+
+
+class UserProductSpending(SQLModel, table=True):
+    """
+    Purchases of a user per product, maintained by crud.purchase_aggregate
+    as purchases are inserted
+    """
+
+    __table_args__ = (
+        # A user's most frequently bought products
+        Index(
+            "ix_userproductspending_user_id_purchase_count",
+            "user_id",
+            "purchase_count",
+        ),
+    )
+
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    product_id: int = Field(
+        foreign_key="product.id", primary_key=True, index=True, ondelete="CASCADE"
+    )
+    purchase_count: int = Field(default=0)
+    total_spent: float = Field(default=0.0)
+    last_purchase_date: datetime
+
+
 # Pydantic models for API
 class ProductCreate(ProductBase):
     pass
@@ -192,3 +267,24 @@ class ProductPurchaseWithBillRead(SQLModel):
     created_at: datetime
     product: ProductRead
     extracted_data: ExtractedDataSummary | None = None
+
+
+class CategorySpendingRead(SQLModel):
+    category: ProductCategory
+    spent: float
+
+
+class FrequentProductRead(SQLModel):
+    product: ProductRead
+    purchase_count: int
+    total_spent: float
+
+
+class ProductInsightsRead(SQLModel):
+    """Spending summary of a user, read from the spending aggregates"""
+
+    total_purchases: int
+    total_spent: float
+    top_categories: list[CategorySpendingRead]
+    frequent_products: list[FrequentProductRead]
+    recent_purchases: list[ProductPurchaseRead]
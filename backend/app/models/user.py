@@ -1,4 +1,5 @@
 import uuid
+from enum import Enum
 from typing import TYPE_CHECKING
 
 from pydantic import EmailStr
@@ -9,6 +10,15 @@ if TYPE_CHECKING:
     from .pdf_document import PDFDocument
 
 
+class DuplicateUploadPolicy(str, Enum):
+    """What to do when a user uploads a PDF they have uploaded before"""
+
+    # Return the existing document instead of creating a new one
+    LINK_EXISTING = "link_existing"
+    # Create a new document that reuses the stored file and extraction result
+    CREATE_DOCUMENT = "create_document"
+
+
 # Shared properties
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
@@ -21,5 +31,8 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
+    duplicate_upload_policy: DuplicateUploadPolicy = Field(
+        default=DuplicateUploadPolicy.LINK_EXISTING
+    )
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
     pdf_documents: list["PDFDocument"] = Relationship(back_populates="owner", cascade_delete=True)
@@ -0,0 +1,44 @@
+"""
+Recompute the per-user spending aggregates from all product purchases.
+
+Usage: python -m app.rebuild_purchase_aggregates
+
+The aggregates are kept up to date as purchases are written; run this after
+changing purchases outside the application, or if they are suspected to be
+out of step. The rebuild runs in one transaction, so readers see either the
+old or the new aggregates.
+"""
+
+import argparse
+import logging
+import time
+
+from sqlmodel import Session, func, select
+
+from app import crud
+from app.core.db import engine
+from app.models import UserCategorySpending, UserProductSpending
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__).parse_args()
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        crud.purchase_aggregate.rebuild(db)
+        db.commit()
+        categories = db.exec(select(func.count()).select_from(UserCategorySpending))
+        products = db.exec(select(func.count()).select_from(UserProductSpending))
+        logger.info(
+            "Rebuilt %s category and %s product aggregates in %.1fs",
+            categories.one(),
+            products.one(),
+            time.perf_counter() - started,
+        )
+
+
+if __name__ == "__main__":
+    main()
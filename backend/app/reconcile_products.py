@@ -0,0 +1,47 @@
+"""
+Find auto-created products that duplicate other products, and merge them.
+
+Usage: python -m app.reconcile_products [--min-similarity 0.8] [--apply]
+
+Without --apply the merge candidates are only listed.
+"""
+
+import argparse
+import logging
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.services.product_reconciliation import product_reconciliation
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-similarity", type=float, default=0.8)
+    parser.add_argument(
+        "--neighbors", type=int, default=5, help="Neighbors compared per product"
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Merge the candidates found"
+    )
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        candidates = product_reconciliation.find_merge_candidates(
+            db, min_similarity=args.min_similarity, k=args.neighbors
+        )
+        for candidate in candidates:
+            print(
+                f"{candidate.source_id}\t{candidate.target_id}\t"
+                f"{candidate.similarity:.3f}"
+            )
+        if args.apply:
+            removed = product_reconciliation.merge(db, candidates)
+            logger.info("Merged %s products", removed)
+
+
+if __name__ == "__main__":
+    main()
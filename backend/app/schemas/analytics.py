@@ -0,0 +1,48 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class TimeBucket(str, Enum):
+    """Width of the time buckets analytics are grouped by"""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+
+class StoreSpending(BaseModel):
+    store_name: str | None
+    receipts: int
+    items: int
+    total_spent: float
+
+
+class PeriodSpending(BaseModel):
+    period: datetime
+    receipts: int
+    items: int
+    total_spent: float
+
+
+class PeriodBasket(BaseModel):
+    """Average receipt of a period"""
+
+    period: datetime
+    receipts: int
+    average_items: float
+    average_total: float
+
+
+class PeriodPrice(BaseModel):
+    """Unit price of a product over one period, and its change since the last"""
+
+    period: datetime
+    purchases: int
+    average_unit_price: float
+    min_unit_price: float
+    max_unit_price: float
+    previous_average_unit_price: float | None
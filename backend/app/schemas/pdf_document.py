@@ -1,6 +1,7 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
+from enum import Enum
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -22,6 +23,7 @@ class PDFDocumentResponse(PDFDocumentBase):
     owner_id: uuid.UUID
     processed: bool
     processing_error: str | None = None
+    content_hash: str | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -59,11 +61,62 @@ class PDFDocumentWithDataResponse(PDFDocumentResponse):
     extracted_data: list[ExtractedDataResponse] = []
 
 
+class DocumentView(str, Enum):
+    """How much of each document the listing endpoints return"""
+
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class PDFDocumentSummary(BaseModel):
+    """Dashboard row: the document plus totals of its latest extraction"""
+
+    id: int
+    filename: str
+    original_filename: str
+    processed: bool
+    created_at: datetime
+    store_name: str | None = None
+    transaction_date: date | None = None
+    total_amount: Decimal | None = None
+
+
 class PDFUploadResponse(BaseModel):
     message: str
     document_id: int
     filename: str
     processing_status: str = "queued"
+    # Set when the upload matched a document the user uploaded before
+    duplicate_of: int | None = None
+
+
+class PDFBatchUploadItem(BaseModel):
+    filename: str
+    document_id: int | None = None
+    duplicate_of: int | None = None
+    processing_status: str | None = None
+    error: str | None = None
+
+
+class PDFBatchUploadResponse(BaseModel):
+    message: str
+    batch_id: int | None = None
+    queued: int = 0
+    reused: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    items: list[PDFBatchUploadItem] = []
+
+
+class ProcessingBatchStatus(BaseModel):
+    batch_id: int
+    created_at: datetime
+    total: int
+    pending: int
+    running: int
+    succeeded: int
+    failed: int
+    finished: bool
 
 
 class PDFProcessingStatus(BaseModel):
@@ -71,18 +124,32 @@ class PDFProcessingStatus(BaseModel):
     processed: bool
     processing_error: str | None = None
     extraction_confidence: float | None = None
+    job_status: str | None = None
+    job_attempts: int | None = None
 
 
 class PDFSearchRequest(BaseModel):
+    query: str | None = Field(
+        None,
+        max_length=200,
+        description=(
+            "Words to find in the store name, item names and text of receipts,"
+            " in German. Results are ranked by relevance"
+        ),
+    )
     store_name: str | None = None
-    start_date: str | None = Field(None, description="Date in YYYY-MM-DD format")
-    end_date: str | None = Field(None, description="Date in YYYY-MM-DD format")
+    # Transaction dates, both included
+    start_date: date | None = None
+    end_date: date | None = None
     skip: int = Field(0, ge=0)
     limit: int = Field(100, ge=1, le=1000)
+    cursor: str | None = Field(None, description="next_cursor of the previous page")
+    view: DocumentView = DocumentView.FULL
 
 
 class PDFSearchResponse(BaseModel):
-    documents: list[PDFDocumentWithDataResponse]
+    documents: list[PDFDocumentWithDataResponse] | list[PDFDocumentSummary]
     total: int
     skip: int
     limit: int
+    next_cursor: str | None = None
@@ -2,6 +2,8 @@ import uuid
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
+from app.models.user import DuplicateUploadPolicy
+
 
 class UserBase(BaseModel):
     email: EmailStr | None = None
@@ -44,6 +46,7 @@ class UserRegister(BaseModel):
 class UserUpdateMe(BaseModel):
     full_name: str | None = None
     email: EmailStr | None = None
+    duplicate_upload_policy: DuplicateUploadPolicy | None = None
 
 
 class UpdatePassword(BaseModel):
@@ -53,6 +56,7 @@ class UpdatePassword(BaseModel):
 
 class UserPublic(UserBase):
     id: uuid.UUID
+    duplicate_upload_policy: DuplicateUploadPolicy = DuplicateUploadPolicy.LINK_EXISTING
 
 
 class UsersPublic(BaseModel):
@@ -0,0 +1,168 @@
+from collections.abc import Iterable, Mapping
+
+from app.models.product import ProductCategory
+
+# Keywords per category; extend these lists to teach the classifier new terms
+CATEGORY_KEYWORDS: dict[ProductCategory, list[str]] = {
+    ProductCategory.FRUITS: [
+        "apfel", "äpfel", "banane", "orange", "birne", "traube", "erdbeere",
+        "kirsche", "pfirsich", "pflaume", "avocado", "mango", "ananas", "kiwi",
+        "melone", "beere", "himbeere", "blaubeere",
+    ],
+    ProductCategory.VEGETABLES: [
+        "tomate", "gurke", "karotte", "möhre", "zwiebel", "kartoffel", "paprika",
+        "salat", "brokkoli", "blumenkohl", "spinat", "zucchini", "aubergine",
+        "radieschen",
+    ],
+    ProductCategory.DAIRY: [
+        "milch", "käse", "joghurt", "quark", "butter", "sahne", "frischkäse",
+        "mozzarella", "gouda", "camembert", "feta", "ricotta",
+    ],
+    ProductCategory.MEAT_FISH: [
+        "fleisch", "wurst", "schinken", "salami", "hähnchen", "rind", "schwein",
+        "lamm", "fisch", "lachs", "thunfisch", "forelle", "garnele", "muschel",
+    ],
+    ProductCategory.BAKERY: [
+        "brot", "brötchen", "croissant", "kuchen", "torte", "keks", "zwieback",
+        "vollkorn", "weizen", "roggen", "dinkel", "semmel",
+    ],
+    ProductCategory.PANTRY: [
+        "pasta", "nudel", "reis", "mehl", "zucker", "salz", "öl", "essig",
+        "gewürz", "dose", "konserve", "sauce", "ketchup", "senf", "marmelade",
+        "honig",
+    ],
+    ProductCategory.BEVERAGES: [
+        "wasser", "saft", "limonade", "cola", "bier", "wein", "kaffee", "tee",
+        "mineralwasser", "apfelsaft", "orangensaft", "sprite", "fanta",
+    ],
+    ProductCategory.SNACKS: [
+        "chips", "schokolade", "bonbon", "gummibär", "nuss", "mandel", "keks",
+        "cracker", "popcorn", "pretzel", "riegel",
+    ],
+    ProductCategory.HOUSEHOLD: [
+        "reiniger", "waschmittel", "spülmittel", "toilettenpapier", "küchentuch",
+        "seife", "shampoo", "zahnpasta", "deo", "creme",
+    ],
+}  # fmt: skip
+
+# Weight of a keyword match depending on where it sits in a word. German
+# compounds are named after their last part ("Vollmilch" is a milk), so a
+# keyword ending a word counts almost as much as a whole word, one starting
+# it only half. Keywords inside a word are ignored.
+WORD_WEIGHT = 1.0
+HEAD_WEIGHT = 0.8
+MODIFIER_WEIGHT = 0.5
+
+
+def _is_word_character(character: str) -> bool:
+    return character.isalnum() or character == "_"
+
+
+class CategoryClassifier:
+    """
+    Keyword classifier for product names based on an Aho-Corasick automaton.
+
+    All keywords are compiled into one automaton, so a name is scanned once
+    and every category is scored in the same pass; the cost depends on the
+    length of the name, not on the number of keywords.
+    """
+
+    def __init__(
+        self, keywords: Mapping[ProductCategory, Iterable[str]] | None = None
+    ) -> None:
+        # Category order breaks ties between equal scores
+        self._order: dict[ProductCategory, int] = {}
+        # Trie nodes: transitions, failure link, the (keyword length,
+        # category, weight) of keywords ending at the node and, once built,
+        # also those of keywords ending at nodes along its failure links
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._keywords: list[dict[tuple[int, ProductCategory], float]] = [{}]
+        self._outputs: list[list[tuple[int, ProductCategory, float]]] = [[]]
+        self._built = True
+        for category, category_keywords in (keywords or {}).items():
+            for keyword in category_keywords:
+                self.add_keyword(keyword, category)
+        self._build()
+
+    def add_keyword(
+        self, keyword: str, category: ProductCategory, weight: float = 1.0
+    ) -> None:
+        """Add a keyword; the automaton is rebuilt on the next classification."""
+        keyword = keyword.lower().strip()
+        if not keyword:
+            return
+        self._order.setdefault(category, len(self._order))
+        node = 0
+        for character in keyword:
+            next_node = self._goto[node].get(character)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][character] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._keywords.append({})
+                self._outputs.append([])
+            node = next_node
+        self._keywords[node][len(keyword), category] = weight
+        self._built = False
+
+    def classify(self, text: str) -> list[tuple[ProductCategory, float]]:
+        """
+        Categories whose keywords occur in ``text`` with their summed
+        weights, best first.
+        """
+        if not self._built:
+            self._build()
+
+        text = text.lower()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        scores: dict[ProductCategory, float] = {}
+        node = 0
+        for end, character in enumerate(text, start=1):
+            while node and character not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(character, 0)
+            if not outputs[node]:
+                continue
+
+            ends_word = end == len(text) or not _is_word_character(text[end])
+            for length, category, weight in outputs[node]:
+                start = end - length
+                starts_word = start == 0 or not _is_word_character(text[start - 1])
+                if starts_word and ends_word:
+                    factor = WORD_WEIGHT
+                elif ends_word:
+                    factor = HEAD_WEIGHT
+                elif starts_word:
+                    factor = MODIFIER_WEIGHT
+                else:
+                    continue
+                scores[category] = scores.get(category, 0.0) + weight * factor
+
+        return sorted(
+            scores.items(), key=lambda score: (-score[1], self._order[score[0]])
+        )
+
+    def predict(self, text: str) -> ProductCategory:
+        """Best scoring category of ``text``, or OTHER if no keyword occurs."""
+        ranked = self.classify(text)
+        return ranked[0][0] if ranked else ProductCategory.OTHER
+
+    def _build(self) -> None:
+        """Compute failure links breadth first and merge their outputs."""
+        self._fail[0] = 0
+        queue = [0]
+        for node in queue:
+            self._outputs[node] = [
+                (length, category, weight)
+                for (length, category), weight in self._keywords[node].items()
+            ] + (self._outputs[self._fail[node]] if node else [])
+            for character, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(character, 0) if node else 0
+                self._fail[child] = target
+        self._built = True
@@ -0,0 +1,90 @@
+import logging
+from typing import Any
+
+from sqlmodel import Session
+
+from app import crud
+from app.models.extracted_data import ExtractedData, ExtractedDataCreate
+from app.services.extraction_engine import extraction_engine
+from app.services.file_storage import file_storage
+from app.services.product_integration import product_integration
+
+logger = logging.getLogger(__name__)
+
+
+def _prepare_extracted_info(extracted_info: dict[str, Any]) -> dict[str, Any]:
+    """Convert processor output into values the ExtractedData columns accept."""
+    # Convert date objects to strings for database storage
+    if extracted_info.get("transaction_date") and hasattr(
+        extracted_info["transaction_date"], "isoformat"
+    ):
+        extracted_info["transaction_date"] = extracted_info[
+            "transaction_date"
+        ].isoformat()
+
+    # Convert Decimal objects to float for JSON serialization
+    for key in ["subtotal", "tax_amount", "total_amount"]:
+        if extracted_info.get(key) is not None:
+            try:
+                extracted_info[key] = float(extracted_info[key])
+            except (TypeError, ValueError):
+                extracted_info[key] = None
+
+    if extracted_info.get("items") is None:
+        extracted_info["items"] = []
+    if extracted_info.get("tax_breakdown") is None:
+        extracted_info["tax_breakdown"] = {}
+    return extracted_info
+
+
+class DocumentProcessingService:
+    """
+    Extracts receipt data from a stored PDF and links its items to products.
+
+    Called by the job worker for every claimed job. Errors propagate so the
+    worker can decide whether to retry the job or give up.
+    """
+
+    async def process_document(
+        self, db: Session, document_id: int
+    ) -> ExtractedData | None:
+        document = crud.pdf_document.get(db, id=document_id)
+        if not document:
+            logger.warning("Document %s no longer exists, skipping", document_id)
+            return None
+
+        pdf_content = file_storage.read_file(document.file_path)
+
+        # Extraction runs in a worker process, off the event loop
+        extracted_info = await extraction_engine.process_receipt(pdf_content)
+
+        # A retried job replaces what an earlier, interrupted attempt stored
+        extracted_data_record = crud.extracted_data.create_receipt(
+            db,
+            obj_in=ExtractedDataCreate(
+                document_id=document_id, **_prepare_extracted_info(extracted_info)
+            ),
+            owner_id=document.owner_id,
+            replace=True,
+        )
+
+        # Continue processing even if product matching fails
+        try:
+            product_integration.process_receipt_items(
+                db, extracted_data_record, document.owner_id, auto_create_products=True
+            )
+        except Exception:
+            logger.exception("Product matching failed for document %s", document_id)
+            db.rollback()
+
+        crud.pdf_document.mark_as_processed(db, document_id=document_id)
+        return extracted_data_record
+
+    def mark_failed(self, db: Session, document_id: int, error: str) -> None:
+        """Mark a document as processed with an error after its final attempt."""
+        db.rollback()
+        crud.pdf_document.mark_as_processed(db, document_id=document_id, error=error)
+
+
+# Global instance
+document_processing = DocumentProcessingService()
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionQueueFullError(Exception):
+    """Raised when the engine already has the maximum number of pending jobs."""
+
+
+class ExtractionTimeoutError(Exception):
+    """Raised when a job does not finish within the configured timeout."""
+
+
+def _process_receipt(pdf_content: bytes) -> dict[str, Any]:
+    # Runs inside a worker process
+    from app.services.pdf_processor import pdf_processor
+
+    return pdf_processor.process_receipt(pdf_content)
+
+
+@dataclass(slots=True)
+class _Job:
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    # Result of the job, for the caller
+    future: Future[Any] = field(default_factory=Future)
+    # Resolved when the job is handed to an idle worker
+    started: Future[None] = field(default_factory=Future)
+    executor: ProcessPoolExecutor | None = None
+
+
+class ExtractionEngine:
+    """
+    Runs CPU-heavy PDF extraction in a pool of worker processes.
+
+    Keeps PyPDF2 and the receipt regexes off the event loop. The number of
+    jobs that are queued or running is bounded, and worker processes are
+    replaced after a fixed number of jobs so memory that PyPDF2 leaks is
+    returned to the OS. Jobs wait in the engine until a worker is idle, so
+    the timeout of a job counts from when it starts running; a job that
+    times out has its worker killed. When a worker dies (a crash, the OOM
+    killer or a timeout) the pool is broken; it is dropped and the next job
+    starts a new one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_tasks_per_child: int,
+        max_pending: int,
+        timeout: float,
+    ):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._executor: ProcessPoolExecutor | None = None
+        # Reentrant: a job finishing right away runs its callback while
+        # the job is being dispatched
+        self._lock = threading.RLock()
+        self._queue: deque[_Job] = deque()
+        self._pending = 0
+        self._running = 0
+
+    @property
+    def pending(self) -> int:
+        """Jobs submitted to the engine that have not finished yet."""
+        return self._pending
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.max_pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app does not spawn processes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._executor
+
+    def _drop(self, executor: ProcessPoolExecutor) -> bool:
+        # Only the broken pool is dropped, another job may have replaced it
+        with self._lock:
+            if self._executor is not executor:
+                return False
+            self._executor = None
+            return True
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        if self._drop(executor):
+            logger.error("A PDF extraction worker died, replacing the worker pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _kill(self, executor: ProcessPoolExecutor) -> None:
+        # A running job cannot be cancelled, only its process can be stopped.
+        # Jobs running on the other workers fail with BrokenProcessPool.
+        if self._drop(executor):
+            logger.error("A PDF extraction job timed out, replacing the worker pool")
+        executor.terminate_workers()
+
+    def _dispatch(self) -> None:
+        """Hand queued jobs to the pool while it has idle workers."""
+        with self._lock:
+            while self._queue and self._running < self.max_workers:
+                job = self._queue.popleft()
+                if not job.future.set_running_or_notify_cancel():
+                    # The caller gave up on the job while it was queued
+                    job.started.cancel()
+                    self._pending -= 1
+                    continue
+                self._running += 1
+                try:
+                    executor = self._get_executor()
+                    try:
+                        pool_future = executor.submit(job.fn, *job.args)
+                    except BrokenProcessPool:
+                        # A worker died since the last job, start over with a
+                        # new pool
+                        self._executor = None
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = self._get_executor()
+                        pool_future = executor.submit(job.fn, *job.args)
+                except BaseException as e:
+                    self._running -= 1
+                    self._pending -= 1
+                    job.future.set_exception(e)
+                    continue
+                job.executor = executor
+                if job.started.set_running_or_notify_cancel():
+                    job.started.set_result(None)
+                pool_future.add_done_callback(partial(self._finish, job))
+
+    def _finish(self, job: _Job, pool_future: Future[Any]) -> None:
+        with self._lock:
+            self._running -= 1
+            self._pending -= 1
+        if pool_future.cancelled():
+            job.future.set_exception(BrokenProcessPool("The worker pool was shut down"))
+        elif (error := pool_future.exception()) is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(pool_future.result())
+        self._dispatch()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> _Job:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExtractionQueueFullError(
+                    f"Extraction queue is full ({self.max_pending} pending jobs)"
+                )
+            self._pending += 1
+            job = _Job(fn, args)
+            self._queue.append(job)
+            self._dispatch()
+        return job
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future[Any]:
+        """
+        Submit a picklable callable to the engine.
+
+        Raises ExtractionQueueFullError instead of queueing without bound.
+        """
+        return self._submit(fn, *args).future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a callable in the pool and await its result with the job timeout.
+
+        Raises BrokenProcessPool when the worker running the job died; the
+        pool is replaced for the next job, and the caller's job can fail or
+        be retried.
+        """
+        job = self._submit(fn, *args)
+        try:
+            await asyncio.wrap_future(job.started)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        assert job.executor is not None
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job.future), self.timeout)
+        except TimeoutError:
+            self._kill(job.executor)
+            raise ExtractionTimeoutError(
+                f"Extraction did not finish within {self.timeout:g} seconds"
+            )
+        except BrokenProcessPool:
+            self._discard(job.executor)
+            raise
+
+    async def process_receipt(self, pdf_content: bytes) -> dict[str, Any]:
+        """Extract receipt data from PDF content in a worker process."""
+        result: dict[str, Any] = await self.run(_process_receipt, pdf_content)
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            while self._queue:
+                job = self._queue.popleft()
+                job.future.cancel()
+                job.started.cancel()
+                self._pending -= 1
+        if executor is not None:
+            logger.info("Shutting down PDF extraction workers")
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global instance
+extraction_engine = ExtractionEngine(
+    max_workers=settings.PDF_WORKER_PROCESSES,
+    max_tasks_per_child=settings.PDF_WORKER_MAX_TASKS_PER_CHILD,
+    max_pending=settings.PDF_WORKER_MAX_PENDING,
+    timeout=settings.PDF_EXTRACTION_TIMEOUT_SECONDS,
+)
@@ -1,8 +1,30 @@
+import hashlib
+import os
 import uuid
+import zipfile
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import IO
 
+import anyio
 from fastapi import HTTPException, UploadFile
 
+ZIP_MIME_TYPES = {
+    "application/zip",
+    "application/x-zip-compressed",
+}
+
+
+@dataclass
+class StoredFile:
+    filename: str
+    file_path: str
+    file_size: int
+    content_hash: str
+    # Upload waiting to be moved to file_path by FileStorageService.place
+    temp_path: Path | None = None
+
 
 class FileStorageService:
     """
@@ -15,31 +37,29 @@ class FileStorageService:
     }
 
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    CHUNK_SIZE = 64 * 1024
 
     def __init__(self, upload_dir: str = "uploads"):
+        # Directories are created by the first upload, not at import time
         self.upload_dir = Path(upload_dir)
-        self.upload_dir.mkdir(exist_ok=True)
-
         self.pdf_dir = self.upload_dir / "pdfs"
-        self.pdf_dir.mkdir(exist_ok=True)
 
-    async def validate_file(self, file: UploadFile) -> None:
-        """Validate uploaded file for security and format requirements."""
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {self.MAX_FILE_SIZE // (1024*1024)}MB",
+        )
 
-        if file.size and file.size > self.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Maximum size is {self.MAX_FILE_SIZE // (1024*1024)}MB",
-            )
+    async def validate_file(self, file: UploadFile) -> None:
+        """
+        Validate upload metadata for security and format requirements.
 
-        content = await file.read()
-        await file.seek(0)
+        Content checks (PDF magic bytes, actual size) happen while the file
+        is streamed to disk in save_file, so the upload is never read whole.
+        """
 
-        if len(content) > self.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Maximum size is {self.MAX_FILE_SIZE // (1024*1024)}MB",
-            )
+        if file.size and file.size > self.MAX_FILE_SIZE:
+            raise self._too_large()
 
         if file.content_type and file.content_type not in self.ALLOWED_MIME_TYPES:
             raise HTTPException(
@@ -55,15 +75,70 @@ class FileStorageService:
                     detail="Invalid file extension. Only .pdf files are allowed.",
                 )
 
-        if not content.startswith(b"%PDF-"):
-            raise HTTPException(status_code=400, detail="Invalid PDF file format")
+    def content_path(self, content_hash: str, extension: str = ".pdf") -> Path:
+        """Content-addressed location, sharded by the first two hex digits."""
+        return self.pdf_dir / content_hash[:2] / f"{content_hash}{extension}"
+
+    async def _iter_upload(self, file: UploadFile) -> AsyncIterator[bytes]:
+        while chunk := await file.read(self.CHUNK_SIZE):
+            yield chunk
 
-    async def save_file(self, file: UploadFile, user_id: str) -> tuple[str, str, int]:
+    async def _store_stream(
+        self, chunks: AsyncIterator[bytes], file_extension: str = ".pdf"
+    ) -> StoredFile:
         """
-        Save uploaded file to storage.
+        Write a stream of chunks to content-addressed storage.
 
-        Returns:
-            Tuple of (filename, file_path, file_size)
+        The first chunk must start with the PDF magic bytes and the size limit
+        is enforced as chunks arrive. The SHA-256 computed along the way names
+        the stored file. The data stays in a temp file until place() renames
+        it into position; identical content shares one file.
+        """
+        self.pdf_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.pdf_dir / f".upload-{uuid.uuid4()}"
+        digest = hashlib.sha256()
+        file_size = 0
+
+        try:
+            async with await anyio.open_file(temp_path, "wb") as f:
+                async for chunk in chunks:
+                    if file_size == 0 and not chunk.startswith(b"%PDF-"):
+                        raise HTTPException(
+                            status_code=400, detail="Invalid PDF file format"
+                        )
+                    file_size += len(chunk)
+                    if file_size > self.MAX_FILE_SIZE:
+                        raise self._too_large()
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            if file_size == 0:
+                raise HTTPException(status_code=400, detail="Invalid PDF file format")
+
+            content_hash = digest.hexdigest()
+            file_path = self.content_path(content_hash, file_extension)
+            return StoredFile(
+                filename=file_path.name,
+                file_path=str(file_path),
+                file_size=file_size,
+                content_hash=content_hash,
+                temp_path=temp_path,
+            )
+
+        except HTTPException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=500, detail="Error saving file")
+
+    async def save_file(self, file: UploadFile) -> StoredFile:
+        """
+        Stream an upload to content-addressed storage.
+
+        The upload is read in CHUNK_SIZE pieces, so memory use does not depend
+        on the file size. Call place() to move the file into position, or
+        discard() to drop it.
         """
 
         await self.validate_file(file)
@@ -72,24 +147,87 @@ class FileStorageService:
         if not file_extension:
             file_extension = ".pdf"
 
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        return await self._store_stream(self._iter_upload(file), file_extension)
 
-        user_dir = self.pdf_dir / str(user_id)
-        user_dir.mkdir(exist_ok=True)
+    @staticmethod
+    def is_zip(file: UploadFile) -> bool:
+        return (
+            file.content_type in ZIP_MIME_TYPES
+            or Path(file.filename or "").suffix.lower() == ".zip"
+        )
 
-        file_path = user_dir / unique_filename
+    async def save_zip(
+        self, file: UploadFile, max_entries: int
+    ) -> list[tuple[str, StoredFile | HTTPException]]:
+        """
+        Stream every PDF inside a ZIP upload to storage.
 
+        Returns ``(entry name, stored file or error)`` per PDF entry, so one
+        bad entry does not fail the whole archive. Entries are decompressed
+        chunk by chunk and each is subject to MAX_FILE_SIZE.
+        """
         try:
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            archive = await anyio.to_thread.run_sync(zipfile.ZipFile, file.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Invalid ZIP archive")
+
+        with archive:
+            entries = [
+                info
+                for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith(".pdf")
+                and not info.filename.startswith("__MACOSX/")
+            ]
+            if len(entries) > max_entries:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Too many files in archive. Maximum is {max_entries}",
+                )
 
-            return unique_filename, str(file_path), len(content)
+            results: list[tuple[str, StoredFile | HTTPException]] = []
+            for info in entries:
+                name = Path(info.filename).name
+                if info.file_size > self.MAX_FILE_SIZE:
+                    results.append((name, self._too_large()))
+                    continue
+                try:
+                    with archive.open(info) as entry:
+                        stored = await self._store_stream(self._iter_entry(entry))
+                    results.append((name, stored))
+                except HTTPException as e:
+                    results.append((name, e))
+            return results
+
+    async def _iter_entry(self, entry: IO[bytes]) -> AsyncIterator[bytes]:
+        while chunk := await anyio.to_thread.run_sync(entry.read, self.CHUNK_SIZE):
+            yield chunk
+
+    def place(self, stored: StoredFile) -> None:
+        """
+        Atomically move a saved upload to its content-addressed path.
 
-        except Exception:
-            if file_path.exists():
-                file_path.unlink()
-            raise HTTPException(status_code=500, detail="Error saving file")
+        Files are shared by content, so callers hold the lock on the path
+        (crud.pdf_document.lock_file_paths) until the document referencing
+        it is committed. Otherwise deleting the last other document with the
+        same content could remove the file in between.
+        """
+        if stored.temp_path is None:
+            return
+        file_path = Path(stored.file_path)
+        if file_path.exists():
+            # Same content already stored
+            stored.temp_path.unlink(missing_ok=True)
+        else:
+            file_path.parent.mkdir(exist_ok=True)
+            os.replace(stored.temp_path, file_path)
+        stored.temp_path = None
+
+    def discard(self, stored: StoredFile) -> None:
+        """Remove a saved upload that was not placed."""
+        if stored.temp_path is not None:
+            stored.temp_path.unlink(missing_ok=True)
+            stored.temp_path = None
 
     def read_file(self, file_path: str) -> bytes:
         """Read file content from storage."""
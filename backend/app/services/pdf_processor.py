@@ -7,6 +7,14 @@ from typing import Any
 
 from PyPDF2 import PdfReader
 
+from app.services.receipt_lexer import (
+    LineKind,
+    ReceiptLine,
+    TokenizedReceipt,
+    tokenize_receipt,
+)
+from app.services.receipt_patterns import GERMAN_STORES, receipt_patterns
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,43 +24,7 @@ class GermanReceiptProcessor:
     Handles common German supermarket chains and receipt formats.
     """
 
-    # Common German supermarket chains
-    GERMAN_STORES = [
-        "REWE",
-        "EDEKA",
-        "ALDI",
-        "LIDL",
-        "PENNY",
-        "NETTO",
-        "KAUFLAND",
-        "REAL",
-        "GLOBUS",
-        "TEGUT",
-        "FAMILA",
-        "MARKTKAUF",
-        "HIT",
-        "COMBI",
-    ]
-
-    # German currency patterns
-    CURRENCY_PATTERNS = [
-        r"(\d+[,\.]\d{2})\s*€",
-        r"€\s*(\d+[,\.]\d{2})",
-        r"EUR\s*(\d+[,\.]\d{2})",
-        r"(\d+[,\.]\d{2})\s*EUR",
-    ]
-
-    # Date patterns (German format)
-    DATE_PATTERNS = [
-        r"(\d{1,2})[\.\/](\d{1,2})[\.\/](\d{2,4})",  # DD.MM.YYYY or DD/MM/YYYY
-        r"(\d{2,4})[\.\/](\d{1,2})[\.\/](\d{1,2})",  # YYYY.MM.DD or YYYY/MM/DD
-    ]
-
-    # Time patterns
-    TIME_PATTERNS = [
-        r"(\d{1,2}):(\d{2}):(\d{2})",  # HH:MM:SS
-        r"(\d{1,2}):(\d{2})",  # HH:MM
-    ]
+    GERMAN_STORES = GERMAN_STORES
 
     def __init__(self):
         pass
@@ -77,87 +49,110 @@ class GermanReceiptProcessor:
         """Process a German grocery receipt and extract structured data."""
         try:
             raw_text = self.extract_text_from_pdf(pdf_content)
-
-            extracted_data = {
-                "raw_text": raw_text,
-                "store_name": self._extract_store_name(raw_text),
-                "store_address": self._extract_store_address(raw_text),
-                "store_phone": self._extract_phone_number(raw_text),
-                "receipt_number": self._extract_receipt_number(raw_text),
-                "cashier_id": self._extract_cashier_id(raw_text),
-                "register_number": self._extract_register_number(raw_text),
-                "transaction_date": self._extract_date(raw_text),
-                "transaction_time": self._extract_time(raw_text),
-                "subtotal": self._extract_subtotal(raw_text),
-                "tax_amount": self._extract_tax_amount(raw_text),
-                "total_amount": self._extract_total_amount(raw_text),
-                "payment_method": self._extract_payment_method(raw_text),
-                "items": self._extract_items(raw_text),
-                "tax_breakdown": self._extract_tax_breakdown(raw_text),
-                "extraction_confidence": self._calculate_confidence(raw_text),
-                "extra_metadata": {
-                    "processing_timestamp": datetime.utcnow().isoformat(),
-                    "processor_version": "1.0.0",
-                    "language": "de",
-                    "store_chain": "REWE" if "REWE" in raw_text else "unknown",
-                },
-            }
-
-            return extracted_data
+            return self.process_text(raw_text)
 
         except Exception as e:
             logger.error(f"Error processing receipt: {e}")
             raise
 
-    def _extract_store_name(self, text: str) -> str | None:
+    def process_text(self, raw_text: str) -> dict[str, Any]:
+        """Extract structured data from already extracted receipt text."""
+        receipt = tokenize_receipt(raw_text)
+
+        extracted_data = {
+            "raw_text": raw_text,
+            "store_name": self._extract_store_name(receipt),
+            "store_address": self._extract_store_address(receipt),
+            "store_phone": self._extract_phone_number(receipt),
+            "receipt_number": self._extract_receipt_number(receipt),
+            "cashier_id": self._extract_cashier_id(receipt),
+            "register_number": self._extract_register_number(receipt),
+            "transaction_date": self._extract_date(receipt),
+            "transaction_time": self._extract_time(receipt),
+            "subtotal": self._extract_subtotal(receipt),
+            "tax_amount": self._extract_tax_amount(receipt),
+            "total_amount": self._extract_total_amount(receipt),
+            "payment_method": self._extract_payment_method(receipt),
+            "items": self._extract_items(receipt),
+            "tax_breakdown": self._extract_tax_breakdown(receipt),
+            "extraction_confidence": self._calculate_confidence(receipt),
+            "extra_metadata": {
+                "processing_timestamp": datetime.utcnow().isoformat(),
+                "processor_version": "1.0.0",
+                "language": "de",
+                "store_chain": "REWE" if "REWE" in raw_text else "unknown",
+            },
+        }
+
+        return extracted_data
+
+    def _search_lines(
+        self, pattern: str, lines: list[ReceiptLine]
+    ) -> re.Match[str] | None:
+        """Search lines in order, skipping those missing the pattern's literal."""
+        literal = receipt_patterns.literal(pattern)
+        for line in lines:
+            if literal and literal not in line.upper:
+                continue
+            match = receipt_patterns.search(pattern, line.text)
+            if match:
+                return match
+        return None
+
+    def _search_group_lines(
+        self, group: str, lines: list[ReceiptLine]
+    ) -> re.Match[str] | None:
+        """Return the first match of a pattern group, honouring pattern order."""
+        for pattern in receipt_patterns.group(group):
+            match = self._search_lines(pattern, lines)
+            if match:
+                return match
+        return None
+
+    def _extract_store_name(self, receipt: TokenizedReceipt) -> str | None:
         """Extract store name from receipt text."""
-        lines = text.split("\n")[:15]  # Check first 15 lines
+        lines = receipt.lines[:15]  # Check first 15 lines
 
         for line in lines:
-            line_upper = line.strip().upper()
+            line_upper = line.upper
             for store in self.GERMAN_STORES:
                 if store in line_upper:
                     # Return just the store name, not the whole line
                     # Handle cases like "REWE MARKT GMBH" or "REWE Markt"
                     if "MARKT" in line_upper:
                         # Extract "REWE Markt" or similar
-                        match = re.search(rf"({store}[\s\w]*MARKT[\s\w]*)", line_upper)
+                        match = receipt_patterns.search(
+                            f"store_markt.{store}", line_upper
+                        )
                         if match:
                             return match.group(1).title()
                     return store
 
         # Fallback: look for common patterns
         for line in lines:
-            line_clean = line.strip()
             if any(
-                word in line.upper() for word in ["MARKT", "SUPERMARKT", "LEBENSMITTEL"]
+                word in line.upper for word in ["MARKT", "SUPERMARKT", "LEBENSMITTEL"]
             ):
                 # Try to extract just the store name part
-                if len(line_clean) < 50:  # Likely a store name line
-                    return line_clean
+                if len(line.text) < 50:  # Likely a store name line
+                    return line.text
 
         return None
 
-    def _extract_store_address(self, text: str) -> str | None:
+    def _extract_store_address(self, receipt: TokenizedReceipt) -> str | None:
         """Extract store address from receipt text."""
-        lines = text.split("\n")
+        lines = receipt.lines
         address_lines = []
 
         # Look for address patterns (German postal codes, street names)
-        postal_code_pattern = r"\b\d{5}\b"
-        street_pattern = (
-            r"[A-Za-zäöüÄÖÜß\s]+(?:str\.|straße|platz|weg|gasse|allee)\s*\d*"
-        )
-
         for i, line in enumerate(lines[:15]):  # Check first 15 lines
-            line = line.strip()
-            if re.search(postal_code_pattern, line) or re.search(
-                street_pattern, line, re.IGNORECASE
-            ):
+            if receipt_patterns.search(
+                "address.postal_code", line.text
+            ) or receipt_patterns.search("address.street", line.text):
                 # Include this line and potentially the next one
-                address_lines.append(line)
-                if i + 1 < len(lines) and len(lines[i + 1].strip()) > 0:
-                    next_line = lines[i + 1].strip()
+                address_lines.append(line.text)
+                if i + 1 < len(lines) and lines[i + 1].text:
+                    next_line = lines[i + 1].text
                     if not any(
                         char.isdigit() for char in next_line[:3]
                     ):  # Not a price line
@@ -166,74 +161,47 @@ class GermanReceiptProcessor:
 
         return " ".join(address_lines) if address_lines else None
 
-    def _extract_phone_number(self, text: str) -> str | None:
+    def _extract_phone_number(self, receipt: TokenizedReceipt) -> str | None:
         """Extract phone number from receipt text."""
-        phone_patterns = [
-            r"Tel\.?\s*:?\s*(\+49\s*\d+[\s\-\d]+)",
-            r"Telefon\s*:?\s*(\+49\s*\d+[\s\-\d]+)",
-            r"(\+49\s*\d+[\s\-\d]+)",
-            r"(\d{4,5}[\s\-]\d+[\s\-\d]*)",
-        ]
-
-        for pattern in phone_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        match = self._search_group_lines("phone", receipt.digit_lines)
+        if match:
+            return match.group(1).strip()
 
         return None
 
-    def _extract_receipt_number(self, text: str) -> str | None:
+    def _extract_receipt_number(self, receipt: TokenizedReceipt) -> str | None:
         """Extract receipt/transaction number."""
-        patterns = [
-            r"Beleg[:\s]*(\d+)",
-            r"Bon[:\s]*(\d+)",
-            r"Quittung[:\s]*(\d+)",
-            r"Trans[:\s]*(\d+)",
-            r"Nr[:\s]*(\d+)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        match = self._search_group_lines("receipt_number", receipt.digit_lines)
+        if match:
+            return match.group(1)
 
         return None
 
-    def _extract_cashier_id(self, text: str) -> str | None:
+    def _extract_cashier_id(self, receipt: TokenizedReceipt) -> str | None:
         """Extract cashier ID."""
-        patterns = [
-            r"Kasse[:\s]*(\d+)",
-            r"Kassier[:\s]*(\d+)",
-            r"Bed[:\s]*(\d+)",
-            r"Bedienung[:\s]*(\d+)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        match = self._search_group_lines("cashier", receipt.digit_lines)
+        if match:
+            return match.group(1)
 
         return None
 
-    def _extract_register_number(self, text: str) -> str | None:
+    def _extract_register_number(self, receipt: TokenizedReceipt) -> str | None:
         """Extract register/terminal number."""
-        patterns = [
-            r"Terminal[:\s]*(\d+)",
-            r"Kasse[:\s]*(\d+)",
-            r"Reg[:\s]*(\d+)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        match = self._search_group_lines("register", receipt.digit_lines)
+        if match:
+            return match.group(1)
 
         return None
 
-    def _extract_date(self, text: str) -> date | None:
+    def _extract_date(self, receipt: TokenizedReceipt) -> date | None:
         """Extract transaction date."""
-        for pattern in self.DATE_PATTERNS:
-            matches = re.findall(pattern, text)
+        lines = receipt.digit_lines
+        for pattern in receipt_patterns.group("date"):
+            matches = (
+                match
+                for line in lines
+                for match in receipt_patterns.findall(pattern, line.text)
+            )
             for match in matches:
                 try:
                     if len(match[2]) == 2:  # Two-digit year
@@ -253,23 +221,21 @@ class GermanReceiptProcessor:
 
         return None
 
-    def _extract_time(self, text: str) -> str | None:
+    def _extract_time(self, receipt: TokenizedReceipt) -> str | None:
         """Extract transaction time."""
-        for pattern in self.TIME_PATTERNS:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0)
+        match = self._search_group_lines("time", receipt.digit_lines)
+        if match:
+            return match.group(0)
 
         return None
 
     def _extract_currency_amount(
-        self, text: str, keywords: list[str]
+        self, lines: list[ReceiptLine], group: str
     ) -> Decimal | None:
-        """Extract currency amount near specific keywords."""
-        for keyword in keywords:
+        """Extract currency amount following one of a group's keywords."""
+        for pattern in receipt_patterns.group(group):
             # Look for keyword followed by amount
-            pattern = rf"{keyword}[:\s]*([0-9]+[,\.]\d{{2}})"
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = self._search_lines(pattern, lines)
             if match:
                 amount_str = match.group(1).replace(",", ".")
                 try:
@@ -279,16 +245,14 @@ class GermanReceiptProcessor:
 
         return None
 
-    def _extract_subtotal(self, text: str) -> Decimal | None:
+    def _extract_subtotal(self, receipt: TokenizedReceipt) -> Decimal | None:
         """Extract subtotal amount."""
-        keywords = ["Zwischensumme", "Netto", "Subtotal", "Summe"]
-        return self._extract_currency_amount(text, keywords)
+        return self._extract_currency_amount(receipt.digit_lines, "subtotal")
 
-    def _extract_tax_amount(self, text: str) -> Decimal | None:
+    def _extract_tax_amount(self, receipt: TokenizedReceipt) -> Decimal | None:
         """Extract tax amount."""
         # Look for REWE tax summary pattern
-        tax_pattern = r"Gesamtbetrag\s+[\d,\.]+\s+(\d+[,\.]\d{2})\s+[\d,\.]+$"
-        match = re.search(tax_pattern, text, re.MULTILINE)
+        match = self._search_lines("tax.summary", receipt.of_kind(LineKind.TAX))
         if match:
             try:
                 return Decimal(match.group(1).replace(",", "."))
@@ -296,19 +260,16 @@ class GermanReceiptProcessor:
                 pass
 
         # Fallback to general patterns
-        keywords = ["MwSt", "USt", "Steuer", "Tax", "VAT"]
-        return self._extract_currency_amount(text, keywords)
+        return self._extract_currency_amount(receipt.digit_lines, "tax_keyword")
 
-    def _extract_tax_breakdown(self, text: str) -> dict[str, Any]:
+    def _extract_tax_breakdown(self, receipt: TokenizedReceipt) -> dict[str, Any]:
         """Extract detailed tax breakdown from REWE receipt."""
         tax_info = {}
 
-        # Pattern for tax lines: "A= 19,0% 0,84 0,16 1,00"
-        tax_pattern = (
-            r"([AB])=\s*(\d+[,\.]\d+)%\s+(\d+[,\.]\d+)\s+(\d+[,\.]\d+)\s+(\d+[,\.]\d+)"
-        )
-
-        matches = re.findall(tax_pattern, text)
+        # Tax lines look like "A= 19,0% 0,84 0,16 1,00", matched by the lexer
+        matches = [
+            match for line in receipt.of_kind(LineKind.TAX) for match in line.tax
+        ]
         for match in matches:
             tax_code = match[0]
             tax_rate = float(match[1].replace(",", "."))
@@ -326,17 +287,13 @@ class GermanReceiptProcessor:
 
         return tax_info
 
-    def _extract_total_amount(self, text: str) -> Decimal | None:
+    def _extract_total_amount(self, receipt: TokenizedReceipt) -> Decimal | None:
         """Extract total amount."""
-        # Look for REWE specific patterns first
-        rewe_patterns = [
-            r"SUMME EUR\s+(\d+[,\.]\d{2})",
-            r"Gesamtbetrag\s+[\d,\.]+\s+[\d,\.]+\s+(\d+[,\.]\d{2})",
-            r"Betrag EUR\s+(\d+[,\.]\d{2})",
-        ]
+        lines = receipt.digit_lines
 
-        for pattern in rewe_patterns:
-            match = re.search(pattern, text)
+        # Look for REWE specific patterns first
+        for pattern in receipt_patterns.group("total"):
+            match = self._search_lines(pattern, lines)
             if match:
                 try:
                     return Decimal(match.group(1).replace(",", "."))
@@ -344,11 +301,13 @@ class GermanReceiptProcessor:
                     continue
 
         # Fallback to general patterns
-        keywords = ["Summe", "Total", "Gesamt", "Betrag"]
-        return self._extract_currency_amount(text, keywords)
+        return self._extract_currency_amount(lines, "total_keyword")
 
-    def _extract_payment_method(self, text: str) -> str | None:
+    def _extract_payment_method(self, receipt: TokenizedReceipt) -> str | None:
         """Extract payment method."""
+        text = receipt.text
+        text_upper = receipt.upper
+
         # Check for specific REWE payment patterns from your receipt
         if "Contactless" in text and "DEBIT MASTERCARD" in text:
             return "Contactless Debit Mastercard"
@@ -358,13 +317,14 @@ class GermanReceiptProcessor:
             return "Mastercard"
 
         # Look for card number patterns
-        card_pattern = r"Nr\.############(\d{4})"
-        card_match = re.search(card_pattern, text)
+        card_match = self._search_lines(
+            "payment.card_number", receipt.of_kind(LineKind.PAYMENT)
+        )
         if card_match:
             last_four = card_match.group(1)
-            if "MASTERCARD" in text.upper():
+            if "MASTERCARD" in text_upper:
                 return f"Mastercard ending in {last_four}"
-            elif "VISA" in text.upper():
+            elif "VISA" in text_upper:
                 return f"Visa ending in {last_four}"
 
         payment_methods = {
@@ -374,7 +334,6 @@ class GermanReceiptProcessor:
             "Kontaktlos": ["Kontaktlos", "NFC", "Tap", "Contactless"],
         }
 
-        text_upper = text.upper()
         for method, keywords in payment_methods.items():
             for keyword in keywords:
                 if keyword.upper() in text_upper:
@@ -382,50 +341,34 @@ class GermanReceiptProcessor:
 
         return None
 
-    def _extract_items(self, text: str) -> list[dict[str, object]] | None:
+    def _extract_items(
+        self, receipt: TokenizedReceipt
+    ) -> list[dict[str, object]] | None:
         """Extract individual items from receipt using modern Python typing."""
 
         items: list[dict[str, object]] = []
-        lines = text.split("\n")
-
-        # Detect item section boundaries
-        start_idx = 0
-        end_idx = len(lines)
-
-        for i, line in enumerate(lines):
-            if "EUR" in line and any(c.isdigit() for c in line):
-                start_idx = max(0, i - 5)
-                break
-
-        for i, line in enumerate(lines):
-            if any(
-                k in line.upper() for k in ["SUMME", "======", "------", "GESAMTBETRAG"]
-            ):
-                end_idx = i
-                break
+        lines = receipt.lines
 
-        # Parse items
-        for i in range(start_idx, end_idx):
-            line = lines[i].strip()
-            if not line:
+        # Parse items within the section boundaries found by the lexer
+        for i in range(receipt.item_start, receipt.item_end):
+            line = lines[i]
+            if line.kind is LineKind.BLANK:
                 continue
 
             if any(
-                k in line.upper()
+                k in line.upper
                 for k in ["HOCHZOLLER", "AUGSBURG", "UID NR", "REWE MARKT"]
             ):
                 continue
 
             # REWE-style item
-            m = re.match(
-                r"^([A-ZÄÖÜ][A-ZÄÖÜ\s\.\!\-\/]+?)(\d+[,\.]\d{2})\s*([AB])$", line
-            )
+            m = line.item
             if m:
                 name = m.group(1).strip()
                 price_s = m.group(2).replace(",", ".")
                 tax = m.group(3)
 
-                name = re.sub(r"[\.\s]+$", "", name)
+                name = receipt_patterns.get("item.trailing_punctuation").sub("", name)
 
                 try:
                     price = float(Decimal(price_s))
@@ -434,21 +377,19 @@ class GermanReceiptProcessor:
 
                 # detect discount on next line
                 if i + 1 < len(lines):
-                    nxt = lines[i + 1].strip().lower()
-                    if "rabatt" in nxt and "-" in nxt:
-                        dm = re.search(r"-(\d+[,\.]\d{2})", nxt)
-                        if dm:
-                            d = float(dm.group(1).replace(",", "."))
-                            items.append(
-                                {
-                                    "name": f"{name} - Rabatt",
-                                    "price": -d,
-                                    "quantity": 1,
-                                    "tax_code": tax,
-                                    "unit_type": "discount",
-                                    "is_discount": True,
-                                }
-                            )
+                    dm = lines[i + 1].discount
+                    if dm:
+                        d = float(dm.group(1).replace(",", "."))
+                        items.append(
+                            {
+                                "name": f"{name} - Rabatt",
+                                "price": -d,
+                                "quantity": 1,
+                                "tax_code": tax,
+                                "unit_type": "discount",
+                                "is_discount": True,
+                            }
+                        )
 
                 items.append(
                     {
@@ -464,24 +405,23 @@ class GermanReceiptProcessor:
                 continue
 
             # PFAND
-            if "PFAND" in line.upper():
-                pm = re.search(r"PFAND.*?(\d+[,\.]\d{2})\s*([AB])", line)
-                if pm:
-                    try:
-                        price = float(Decimal(pm.group(1).replace(",", ".")))
-                    except Exception:
-                        continue
+            pm = line.pfand
+            if pm:
+                try:
+                    price = float(Decimal(pm.group(1).replace(",", ".")))
+                except Exception:
+                    continue
 
-                    items.append(
-                        {
-                            "name": "Pfand",
-                            "price": price,
-                            "quantity": 1,
-                            "tax_code": pm.group(2),
-                            "unit_type": "deposit",
-                            "is_discount": False,
-                        }
-                    )
+                items.append(
+                    {
+                        "name": "Pfand",
+                        "price": price,
+                        "quantity": 1,
+                        "tax_code": pm.group(2),
+                        "unit_type": "deposit",
+                        "is_discount": False,
+                    }
+                )
 
         # Combine discounts into their parent items
         combined: list[dict[str, object]] = []
@@ -515,20 +455,22 @@ class GermanReceiptProcessor:
 
         return combined
 
-    def _calculate_confidence(self, text: str) -> float:
+    def _calculate_confidence(self, receipt: TokenizedReceipt) -> float:
         """Calculate extraction confidence based on found elements."""
+        text = receipt.text
+        digit_lines = receipt.digit_lines
         confidence_factors = []
 
         # Check if we found a known store
-        if any(store in text.upper() for store in self.GERMAN_STORES):
+        if any(store in receipt.upper for store in self.GERMAN_STORES):
             confidence_factors.append(0.3)
 
         # Check if we found currency symbols
-        if any(re.search(pattern, text) for pattern in self.CURRENCY_PATTERNS):
+        if self._search_group_lines("currency", digit_lines):
             confidence_factors.append(0.2)
 
         # Check if we found date patterns
-        if any(re.search(pattern, text) for pattern in self.DATE_PATTERNS):
+        if self._search_group_lines("date", digit_lines):
             confidence_factors.append(0.2)
 
         # Check if text contains German words
@@ -545,7 +487,8 @@ class GermanReceiptProcessor:
             "ist",
             "sind",
         ]
-        if any(word in text.lower() for word in german_words):
+        text_lower = text.lower()
+        if any(word in text_lower for word in german_words):
             confidence_factors.append(0.1)
 
         # Check text length (longer text usually means better extraction)
@@ -555,7 +498,7 @@ class GermanReceiptProcessor:
             confidence_factors.append(0.05)
 
         # Check if we found structured data
-        if re.search(r"\d+[,\.]\d{2}", text):  # Found prices
+        if self._search_lines("price", digit_lines):  # Found prices
             confidence_factors.append(0.1)
 
         return min(sum(confidence_factors), 1.0)
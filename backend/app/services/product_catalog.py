@@ -0,0 +1,288 @@
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.product import Product, ProductAlias, ProductCategory
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# Default similarity cut-off, the same as pg_trgm.similarity_threshold
+DEFAULT_MIN_SIMILARITY = 0.3
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """
+    Character trigrams of a name, computed like pg_trgm: each word is
+    lower-cased and padded with two spaces in front and one at the end.
+    """
+    grams: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def trigram_similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """Share of trigrams two names have in common, as pg_trgm's similarity()"""
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def _snapshot(product: Product) -> Product:
+    """
+    Detached copy of a product that belongs to no session.
+
+    Sessions merge it back with ``merge(load=False)``, which needs no query,
+    and it is never expired by a commit in the session it was loaded from.
+    """
+    columns = Product.__table__.columns  # type: ignore[attr-defined]
+    values = {column.key: getattr(product, column.key) for column in columns}
+    snapshot = Product(**values)
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+class ProductCatalogIndex:
+    """
+    In-process index of the product catalog used by the product matcher.
+
+    Holds a normalized-name map, an alias map and an inverted index from
+    name trigrams to products, so matching receipt items needs no queries.
+    CRUDProduct and CRUDProductAlias keep it current after their commits;
+    changes made by other processes are picked up by reloading the whole
+    catalog every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._loaded_at: float | None = None
+        self._products: dict[int, Product] = {}
+        self._by_normalized_name: dict[str, set[int]] = {}
+        self._trigrams: dict[str, set[int]] = {}
+        self._product_trigrams: dict[int, frozenset[str]] = {}
+        # alias id -> (product id, normalized alias)
+        self._aliases: dict[int, tuple[int, str]] = {}
+        self._by_alias: dict[str, set[int]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def load(self, db: Session) -> None:
+        """Rebuild the index from the database."""
+        products = db.exec(select(Product)).all()
+        aliases = db.exec(select(ProductAlias)).all()
+        with self._lock:
+            self._clear()
+            for product in products:
+                self._add_product(product)
+            for alias in aliases:
+                self._add_alias(alias)
+            self._loaded_at = time.monotonic()
+        logger.info(
+            "Loaded product catalog index: %s products, %s aliases",
+            len(self._products),
+            len(self._aliases),
+        )
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load the index on first use and reload it once it is too old."""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.refresh_interval:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        """Drop the index; the next ensure_loaded reloads it."""
+        with self._lock:
+            self._clear()
+            self._loaded_at = None
+
+    # Hooks called by the CRUD layer after commits
+
+    def add_product(self, product: Product) -> None:
+        if not self.loaded or product.id is None:
+            return
+        with self._lock:
+            self._remove_product(product.id)
+            self._add_product(product)
+
+    def remove_product(self, product_id: int) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            self._remove_product(product_id)
+            for alias_id, (alias_product_id, _) in list(self._aliases.items()):
+                if alias_product_id == product_id:
+                    self._remove_alias(alias_id)
+
+    def add_alias(self, alias: ProductAlias) -> None:
+        if not self.loaded or alias.id is None:
+            return
+        with self._lock:
+            self._remove_alias(alias.id)
+            self._add_alias(alias)
+
+    def remove_alias(self, alias_id: int) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            self._remove_alias(alias_id)
+
+    # Lookups; products are returned as detached snapshots
+
+    def get_by_normalized_name(self, normalized_name: str) -> Product | None:
+        return self._first(self._by_normalized_name.get(normalized_name))
+
+    def find_by_alias(self, normalized_name: str) -> Product | None:
+        """Product with an alias containing the name, like the ILIKE lookup."""
+        exact = self._first(self._by_alias.get(normalized_name))
+        if exact is not None:
+            return exact
+        with self._lock:
+            product_ids = {
+                product_id
+                for alias, ids in self._by_alias.items()
+                if normalized_name in alias
+                for product_id in ids
+            }
+        return self._first(product_ids)
+
+    def top_k(
+        self,
+        product_name: str,
+        k: int = 10,
+        category: ProductCategory | None = None,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> list[tuple[Product, float]]:
+        """
+        The ``k`` products whose names are most similar to ``product_name``,
+        by trigram similarity, best first. Products below ``min_similarity``
+        are left out.
+
+        A name can only reach ``min_similarity`` if it shares one of the
+        query's rarest trigrams (prefix filtering), so the long postings of
+        common trigrams such as "  m" are never read. Candidates are then
+        verified in order of how many of those trigrams they share, stopping
+        once no remaining candidate can beat the current top ``k``.
+        """
+        query = trigrams(product_name)
+        if not query:
+            return []
+
+        # Similarity >= t requires at least ceil(t * |query|) common trigrams,
+        # so a match must contain one of the |query| - that + 1 rarest ones
+        min_common = max(1, math.ceil(min_similarity * len(query) - 1e-9))
+        prefix_length = len(query) - min_common + 1
+        skipped = len(query) - prefix_length
+
+        best: list[tuple[float, int]] = []  # min-heap of (similarity, -id)
+        with self._lock:
+            postings = self._trigrams
+            by_rarity = sorted(query, key=lambda gram: len(postings.get(gram, ())))
+            shared = Counter[int]()
+            for gram in by_rarity[:prefix_length]:
+                shared.update(postings.get(gram, ()))
+
+            for product_id, count in shared.most_common():
+                # Upper bound: every skipped trigram is shared as well
+                if len(best) == k and (count + skipped) / len(query) < best[0][0]:
+                    break
+                if category and self._products[product_id].category != category:
+                    continue
+                similarity = trigram_similarity(
+                    query, self._product_trigrams[product_id]
+                )
+                if similarity < min_similarity:
+                    continue
+                entry = (similarity, -product_id)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+            return [
+                (self._products[-negative_id], similarity)
+                for similarity, negative_id in sorted(best, reverse=True)
+            ]
+
+    def _first(self, product_ids: set[int] | None) -> Product | None:
+        # Lowest id wins, so the result does not depend on insertion order
+        known = [
+            product_id
+            for product_id in product_ids or ()
+            if product_id in self._products
+        ]
+        return self._products[min(known)] if known else None
+
+    def _clear(self) -> None:
+        self._products = {}
+        self._by_normalized_name = {}
+        self._trigrams = {}
+        self._product_trigrams = {}
+        self._aliases = {}
+        self._by_alias = {}
+
+    def _add_product(self, product: Product) -> None:
+        snapshot = _snapshot(product)
+        product_id = snapshot.id
+        self._products[product_id] = snapshot
+        self._by_normalized_name.setdefault(snapshot.normalized_name, set()).add(
+            product_id
+        )
+        grams = trigrams(snapshot.normalized_name)
+        self._product_trigrams[product_id] = grams
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(product_id)
+
+    def _remove_product(self, product_id: int) -> None:
+        snapshot = self._products.pop(product_id, None)
+        if snapshot is None:
+            return
+        self._discard(self._by_normalized_name, snapshot.normalized_name, product_id)
+        for gram in self._product_trigrams.pop(product_id, frozenset()):
+            self._discard(self._trigrams, gram, product_id)
+
+    def _add_alias(self, alias: ProductAlias) -> None:
+        self._aliases[alias.id] = (alias.product_id, alias.normalized_alias)
+        self._by_alias.setdefault(alias.normalized_alias, set()).add(alias.product_id)
+
+    def _remove_alias(self, alias_id: int) -> None:
+        entry = self._aliases.pop(alias_id, None)
+        if entry is None:
+            return
+        product_id, normalized_alias = entry
+        # Another alias of the same product may share the normalized text
+        if (product_id, normalized_alias) not in self._aliases.values():
+            self._discard(self._by_alias, normalized_alias, product_id)
+
+    @staticmethod
+    def _discard(index: dict[str, set[int]], key: str, product_id: int) -> None:
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.discard(product_id)
+        if not ids:
+            del index[key]
+
+
+# Global instance
+product_catalog = ProductCatalogIndex(
+    refresh_interval=settings.PRODUCT_CATALOG_REFRESH_SECONDS
+)
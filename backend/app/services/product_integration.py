@@ -8,7 +8,8 @@ from sqlmodel import Session
 
 from app import crud
 from app.models.extracted_data import ExtractedData
-from app.models.product import ProductPurchase
+from app.models.product import Product, ProductPurchase
+from app.services.product_catalog import product_catalog
 from app.services.product_matcher import product_matcher
 
 logger = logging.getLogger(__name__)
@@ -56,33 +57,47 @@ class ProductIntegrationService:
 
         results["total_items"] = len(extracted_data.items)
 
-        for item in extracted_data.items:
-            try:
-                logger.info(
-                    f"Processing item: {item.get('name', 'unknown')} - Price: {item.get('price', 0.0)} - Quantity: {item.get('quantity', 1.0)}"
-                )
-                item_result = self._process_single_item(
+        try:
+            item_results = self._process_items_in_batch(
+                db, extracted_data.items, extracted_data, user_id, auto_create_products
+            )
+        except Exception:
+            logger.exception(
+                f"Batch product matching failed for extracted data "
+                f"{extracted_data.id}, retrying item by item"
+            )
+            db.rollback()
+            item_results = [
+                self._process_item_safely(
                     db, item, extracted_data, user_id, auto_create_products
                 )
+                for item in extracted_data.items
+            ]
 
-                if item_result["matched"]:
-                    matched_items.append(item_result)
-                    if item_result.get("purchase"):
-                        created_purchases.append(item_result["purchase"])
-                else:
-                    unmatched_items.append(item_result)
+        # One result per item, so result positions are the line indexes
+        assert extracted_data.id is not None
+        crud.receipt_line_item.link_products(
+            db,
+            extracted_data_id=extracted_data.id,
+            product_ids={
+                line_index: item_result["product"].id
+                for line_index, item_result in enumerate(item_results)
+                if item_result.get("purchase")
+            },
+        )
+        db.commit()
 
-                if item_result.get("created_product"):
-                    created_products.append(item_result["created_product"])
+        for item_result in item_results:
+            if item_result["matched"]:
+                matched_items.append(item_result)
+                if item_result.get("purchase"):
+                    created_purchases.append(item_result["purchase"])
+            else:
+                unmatched_items.append(item_result)
+
+            if item_result.get("created_product"):
+                created_products.append(item_result["created_product"])
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing item {item.get('name', 'unknown')}: {e}"
-                )
-                logger.error(f"Item processing traceback: {traceback.format_exc()}")
-                unmatched_items.append(
-                    {"item": item, "error": str(e), "matched": False}
-                )
         # Calculate match rate
         if results["total_items"] > 0:
             results["match_rate"] = len(matched_items) / results["total_items"]
@@ -94,6 +109,123 @@ class ProductIntegrationService:
 
         return results
 
+    def _process_items_in_batch(
+        self,
+        db: Session,
+        items: list[dict[str, Any]],
+        extracted_data: ExtractedData,
+        user_id: uuid.UUID,
+        auto_create_products: bool,
+    ) -> list[dict[str, Any]]:
+        """
+        Match and store all items of a receipt in one transaction.
+
+        Items are matched against the in-process catalog, missing products are
+        inserted with one statement and all purchases with another, then
+        everything is committed once. Problems with a single item are reported
+        on that item; a failing statement raises so the caller can fall back
+        to processing items one by one.
+        """
+        item_results: list[dict[str, Any]] = []
+        # Item results waiting for a purchase, with the purchase values
+        pending: list[tuple[dict[str, Any], dict[str, Any]]] = []
+        new_products: dict[str, Product] = {}
+
+        for item in items:
+            item_name = item.get("name", "")
+            if not item_name:
+                item_results.append(
+                    {"item": item, "matched": False, "error": "Missing item name"}
+                )
+                continue
+
+            try:
+                # Higher threshold to create more new products
+                matched_product, confidence = product_matcher.find_best_match(
+                    db, item_name=item_name, confidence_threshold=0.8
+                )
+                result: dict[str, Any] = {
+                    "item": item,
+                    "item_name": item_name,
+                    "confidence": confidence,
+                    "matched": matched_product is not None,
+                }
+                purchase_values = self._purchase_values(item, extracted_data, user_id)
+            except Exception as e:
+                logger.error(f"Error processing item {item_name}: {e}")
+                item_results.append({"item": item, "error": str(e), "matched": False})
+                continue
+
+            if matched_product:
+                result["product"] = matched_product
+                pending.append((result, purchase_values))
+            elif auto_create_products:
+                new_product = product_matcher.build_product_from_item(
+                    item_name,
+                    price=item.get("price", 0.0),
+                    quantity=item.get("quantity", 1.0),
+                )
+                new_products.setdefault(new_product.normalized_name, new_product)
+                result["normalized_name"] = new_product.normalized_name
+                pending.append((result, purchase_values))
+            item_results.append(result)
+
+        products_by_name, created = crud.product.get_or_create_many(
+            db, products=list(new_products.values())
+        )
+        created_names = {product.normalized_name for product in created}
+
+        for result, purchase_values in pending:
+            normalized_name = result.pop("normalized_name", None)
+            if normalized_name is not None:
+                product = products_by_name[normalized_name]
+                result.update({"product": product, "matched": True})
+                if normalized_name in created_names:
+                    # Reported once, on the first item that needed it
+                    created_names.discard(normalized_name)
+                    result.update({"created_product": product, "confidence": 0.6})
+                else:
+                    # Created meanwhile by another receipt
+                    result["confidence"] = 1.0
+            purchase_values["product_id"] = result["product"].id
+
+        purchases = crud.product_purchase.create_many(
+            db, purchases=[purchase_values for _, purchase_values in pending]
+        )
+        for (result, _), purchase in zip(pending, purchases, strict=True):
+            result["purchase"] = purchase
+
+        db.commit()
+        for product in created:
+            product_catalog.add_product(product)
+
+        logger.info(
+            f"Stored {len(purchases)} purchases and {len(created)} new products "
+            f"for extracted data {extracted_data.id}"
+        )
+        return item_results
+
+    def _process_item_safely(
+        self,
+        db: Session,
+        item: dict[str, Any],
+        extracted_data: ExtractedData,
+        user_id: uuid.UUID,
+        auto_create_products: bool,
+    ) -> dict[str, Any]:
+        """Process a single item, reporting any error on the item."""
+        try:
+            logger.info(
+                f"Processing item: {item.get('name', 'unknown')} - Price: {item.get('price', 0.0)} - Quantity: {item.get('quantity', 1.0)}"
+            )
+            return self._process_single_item(
+                db, item, extracted_data, user_id, auto_create_products
+            )
+        except Exception as e:
+            logger.error(f"Error processing item {item.get('name', 'unknown')}: {e}")
+            logger.error(f"Item processing traceback: {traceback.format_exc()}")
+            return {"item": item, "error": str(e), "matched": False}
+
     def _process_single_item(
         self,
         db: Session,
@@ -188,8 +320,23 @@ class ProductIntegrationService:
     ) -> ProductPurchase:
         """Create a purchase record linking the product to the receipt."""
 
-        purchase_data = {
-            "product_id": product_id,
+        purchase_data = self._purchase_values(item, extracted_data, user_id)
+        purchase_data["product_id"] = product_id
+
+        purchase = crud.product_purchase.create_purchase(
+            db, purchase_data=purchase_data
+        )
+
+        return purchase
+
+    def _purchase_values(
+        self,
+        item: dict[str, Any],
+        extracted_data: ExtractedData,
+        user_id: uuid.UUID,
+    ) -> dict[str, Any]:
+        """Purchase column values for a receipt item, without the product."""
+        return {
             "extracted_data_id": extracted_data.id,
             "user_id": user_id,
             "receipt_item_name": item.get("name", ""),
@@ -205,20 +352,19 @@ class ProductIntegrationService:
             else datetime.utcnow(),
         }
 
-        purchase = crud.product_purchase.create_purchase(
-            db, purchase_data=purchase_data
-        )
-
-        return purchase
-
     def get_user_product_insights(
-        self, db: Session, user_id: uuid.UUID
+        self, db: Session, /, user_id: uuid.UUID
     ) -> dict[str, Any]:
-        """Get insights about user's product purchases."""
-
-        purchases = crud.product_purchase.get_by_user(db, user_id=user_id, limit=1000)
+        """
+        Get insights about user's product purchases.
 
-        if not purchases:
+        Totals come from the spending aggregates, so they cover every
+        purchase of the user at a cost that does not grow with their number.
+        """
+        category_spending = crud.purchase_aggregate.get_category_spending(
+            db, user_id=user_id
+        )
+        if not category_spending:
             return {
                 "total_purchases": 0,
                 "total_spent": 0.0,
@@ -227,47 +373,27 @@ class ProductIntegrationService:
                 "recent_purchases": [],
             }
 
-        # Calculate insights
-        total_spent = sum(p.total_price for p in purchases)
-
-        # Category analysis
-        category_spending: dict[str, float] = {}
-        for purchase in purchases:
-            if hasattr(purchase, "product") and purchase.product:
-                category = purchase.product.category.value
-                category_spending[category] = (
-                    category_spending.get(category, 0) + purchase.total_price
-                )
-
-        top_categories = sorted(
-            category_spending.items(), key=lambda x: x[1], reverse=True
-        )[:5]
-
-        # Product frequency
-        product_counts: dict[int, int] = {}
-        for purchase in purchases:
-            product_counts[purchase.product_id] = (
-                product_counts.get(purchase.product_id, 0) + 1
-            )
-
-        frequent_product_ids = sorted(
-            product_counts.items(), key=lambda x: x[1], reverse=True
-        )[:10]
-
-        frequent_products: list[dict[str, Any]] = []
-        for product_id, count in frequent_product_ids:
-            product = crud.product.get(db, id=product_id)
-            if product:
-                frequent_products.append({"product": product, "purchase_count": count})
-
+        frequent_products = crud.purchase_aggregate.get_frequent_products(
+            db, user_id=user_id, limit=10
+        )
         return {
-            "total_purchases": len(purchases),
-            "total_spent": total_spent,
+            "total_purchases": sum(count for _, count, _ in category_spending),
+            "total_spent": sum(spent for _, _, spent in category_spending),
             "top_categories": [
-                {"category": cat, "spent": amount} for cat, amount in top_categories
+                {"category": category, "spent": spent}
+                for category, _, spent in category_spending[:5]
+            ],
+            "frequent_products": [
+                {
+                    "product": product,
+                    "purchase_count": spending.purchase_count,
+                    "total_spent": spending.total_spent,
+                }
+                for product, spending in frequent_products
             ],
-            "frequent_products": frequent_products,
-            "recent_purchases": purchases[:10],  # Last 10 purchases
+            "recent_purchases": crud.product_purchase.get_by_user(
+                db, user_id=user_id, limit=10
+            ),
         }
 
 
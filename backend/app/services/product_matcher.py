@@ -1,55 +1,34 @@
 import re
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 from sqlmodel import Session
 
-from app.crud.crud_product import product, product_alias
+from app.core.config import settings
+from app.crud.crud_product import product
 from app.models.product import Product, ProductCategory
+from app.services.category_classifier import CATEGORY_KEYWORDS, CategoryClassifier
+from app.services.product_catalog import product_catalog
+
+# data_source of products created automatically from receipt items
+RECEIPT_AUTO_SOURCE = "receipt_auto"
+
+# Trigram candidates compared in detail for fuzzy matches
+SIMILAR_CANDIDATES = 10
+
+# Common German articles and prepositions dropped during normalization
+ARTICLES = frozenset(["der", "die", "das", "ein", "eine", "einen", "vom", "zur", "mit"])
+
+_SPECIAL_CHARACTERS = re.compile(r"[^\w\säöüß]")
+_WHITESPACE = re.compile(r"\s+")
 
 
 class ProductMatcher:
     """Service for matching receipt items to products in the database."""
 
     def __init__(self) -> None:
-        # Common German product name patterns and their categories
-        self.category_patterns = {
-            ProductCategory.FRUITS: [
-                r"\b(apfel|äpfel|banane|orange|birne|traube|erdbeere|kirsche|pfirsich|pflaume)\b",
-                r"\b(avocado|mango|ananas|kiwi|melone|beere|himbeere|blaubeere)\b",
-            ],
-            ProductCategory.VEGETABLES: [
-                r"\b(tomate|gurke|karotte|möhre|zwiebel|kartoffel|paprika|salat)\b",
-                r"\b(brokkoli|blumenkohl|spinat|zucchini|aubergine|radieschen)\b",
-            ],
-            ProductCategory.DAIRY: [
-                r"\b(milch|käse|joghurt|quark|butter|sahne|frischkäse)\b",
-                r"\b(mozzarella|gouda|camembert|feta|ricotta)\b",
-            ],
-            ProductCategory.MEAT_FISH: [
-                r"\b(fleisch|wurst|schinken|salami|hähnchen|rind|schwein|lamm)\b",
-                r"\b(fisch|lachs|thunfisch|forelle|garnele|muschel)\b",
-            ],
-            ProductCategory.BAKERY: [
-                r"\b(brot|brötchen|croissant|kuchen|torte|keks|zwieback)\b",
-                r"\b(vollkorn|weizen|roggen|dinkel|semmel)\b",
-            ],
-            ProductCategory.PANTRY: [
-                r"\b(pasta|nudel|reis|mehl|zucker|salz|öl|essig|gewürz)\b",
-                r"\b(dose|konserve|sauce|ketchup|senf|marmelade|honig)\b",
-            ],
-            ProductCategory.BEVERAGES: [
-                r"\b(wasser|saft|limonade|cola|bier|wein|kaffee|tee)\b",
-                r"\b(mineralwasser|apfelsaft|orangensaft|sprite|fanta)\b",
-            ],
-            ProductCategory.SNACKS: [
-                r"\b(chips|schokolade|bonbon|gummibär|nuss|mandel)\b",
-                r"\b(keks|cracker|popcorn|pretzel|riegel)\b",
-            ],
-            ProductCategory.HOUSEHOLD: [
-                r"\b(reiniger|waschmittel|spülmittel|toilettenpapier|küchentuch)\b",
-                r"\b(seife|shampoo|zahnpasta|deo|creme)\b",
-            ],
-        }
+        # Keyword automaton scoring all categories in one pass over a name
+        self.category_classifier = CategoryClassifier(CATEGORY_KEYWORDS)
 
         # Common German measurement units
         self.unit_patterns = {
@@ -61,31 +40,71 @@ class ProductMatcher:
             "pack": r"(\d+)\s*pack",
         }
 
+        self._unit_regexes = {
+            unit: re.compile(pattern) for unit, pattern in self.unit_patterns.items()
+        }
+
+        # Item names repeat heavily across receipts and users, so the pure
+        # helpers below are memoized with bounded LRU caches
+        cache_size = settings.PRODUCT_MATCHER_CACHE_SIZE
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+        self._units_cached = lru_cache(maxsize=cache_size)(
+            self._extract_quantity_and_unit
+        )
+        self._category_cached = lru_cache(maxsize=cache_size)(self._predict_category)
+        self._caches = {
+            "normalize_product_name": self._normalize_cached,
+            "extract_quantity_and_unit": self._units_cached,
+            "predict_category": self._category_cached,
+        }
+
+    def cache_stats(self) -> dict[str, dict[str, float | int]]:
+        """Hit counts and hit rate of each memoized helper."""
+        stats: dict[str, dict[str, float | int]] = {}
+        for name, cached in self._caches.items():
+            info = cached.cache_info()
+            calls = info.hits + info.misses
+            stats[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "size": info.currsize,
+                "hit_rate": info.hits / calls if calls else 0.0,
+            }
+        return stats
+
+    def clear_caches(self) -> None:
+        for cached in self._caches.values():
+            cached.cache_clear()
+
     def normalize_product_name(self, name: str) -> str:
         """Normalize product name for better matching."""
+        return self._normalize_cached(name)
+
+    def _normalize(self, name: str) -> str:
         # Convert to lowercase
         normalized = name.lower().strip()
 
         # Remove common German articles and prepositions
-        articles = ["der", "die", "das", "ein", "eine", "einen", "vom", "zur", "mit"]
-        words = normalized.split()
-        words = [word for word in words if word not in articles]
+        words = [word for word in normalized.split() if word not in ARTICLES]
 
         # Remove special characters but keep umlauts
-        normalized = " ".join(words)
-        normalized = re.sub(r"[^\w\säöüß]", " ", normalized)
+        normalized = _SPECIAL_CHARACTERS.sub(" ", " ".join(words))
 
         # Remove extra whitespace
-        normalized = re.sub(r"\s+", " ", normalized).strip()
-
-        return normalized
+        return _WHITESPACE.sub(" ", normalized).strip()
 
     def extract_quantity_and_unit(
         self, item_name: str
     ) -> tuple[float | None, str | None]:
         """Extract quantity and unit from item name."""
-        for unit, pattern in self.unit_patterns.items():
-            match = re.search(pattern, item_name.lower())
+        return self._units_cached(item_name)
+
+    def _extract_quantity_and_unit(
+        self, item_name: str
+    ) -> tuple[float | None, str | None]:
+        lowered = item_name.lower()
+        for unit, regex in self._unit_regexes.items():
+            match = regex.search(lowered)
             if match:
                 try:
                     quantity = float(match.group(1).replace(",", "."))
@@ -96,14 +115,14 @@ class ProductMatcher:
 
     def predict_category(self, item_name: str) -> ProductCategory:
         """Predict product category based on name patterns."""
-        normalized_name = self.normalize_product_name(item_name)
+        return self._category_cached(item_name)
 
-        for category, patterns in self.category_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_name, re.IGNORECASE):
-                    return category
+    def _predict_category(self, item_name: str) -> ProductCategory:
+        return self.category_classifier.predict(self.normalize_product_name(item_name))
 
-        return ProductCategory.OTHER
+    def rank_categories(self, item_name: str) -> list[tuple[ProductCategory, float]]:
+        """Categories matching an item name with their keyword scores, best first."""
+        return self.category_classifier.classify(self.normalize_product_name(item_name))
 
     def calculate_similarity(self, name1: str, name2: str) -> float:
         """Calculate similarity between two product names."""
@@ -124,50 +143,57 @@ class ProductMatcher:
         return similarity
 
     def find_best_match(
-        self, db: Session, item_name: str, confidence_threshold: float = 0.7
+        self, db: Session, /, item_name: str, confidence_threshold: float = 0.7
     ) -> tuple[Product | None, float]:
-        """Find the best matching product for a receipt item."""
+        """
+        Find the best matching product for a receipt item.
+
+        Lookups go to the in-process catalog index, so once it is loaded
+        matching does not query the database.
+        """
+        product_catalog.ensure_loaded(db)
 
         # First, try exact normalized name match
         normalized_name = self.normalize_product_name(item_name)
-        exact_match = product.get_by_normalized_name(
-            db, normalized_name=normalized_name
-        )
+        exact_match = product_catalog.get_by_normalized_name(normalized_name)
         if exact_match:
-            return exact_match, 1.0
+            return self._attach(db, exact_match), 1.0
 
         # Try alias matching
-        alias_match = product_alias.find_product_by_alias(
-            db, alias_name=normalized_name
-        )
+        alias_match = product_catalog.find_by_alias(normalized_name)
         if alias_match:
-            return alias_match, 0.95
+            return self._attach(db, alias_match), 0.95
 
         # Search for similar products
         predicted_category = self.predict_category(item_name)
-        similar_products = product.find_similar_products(
-            db, product_name=item_name, category=predicted_category
+        candidates = product_catalog.top_k(
+            normalized_name, k=SIMILAR_CANDIDATES, category=predicted_category
         )
 
         best_match = None
         best_similarity = 0.0
 
-        for prod in similar_products:
+        # Re-rank the few trigram candidates with the finer similarity measure
+        for prod, _ in candidates:
             similarity = self.calculate_similarity(item_name, prod.name)
             if similarity > best_similarity:
                 best_similarity = similarity
                 best_match = prod
 
         # Only return match if above threshold
-        if best_similarity >= confidence_threshold:
-            return best_match, best_similarity
+        if best_match is not None and best_similarity >= confidence_threshold:
+            return self._attach(db, best_match), best_similarity
 
         return None, 0.0
 
-    def create_product_from_item(
-        self, db: Session, item_name: str, price: float, quantity: float = 1.0
+    def _attach(self, db: Session, snapshot: Product) -> Product:
+        # Copies the cached state into the session without a SELECT
+        return db.merge(snapshot, load=False)
+
+    def build_product_from_item(
+        self, item_name: str, price: float, quantity: float = 1.0
     ) -> Product:
-        """Create a new product from a receipt item."""
+        """Build (but do not save) a new product from a receipt item."""
         normalized_name = self.normalize_product_name(item_name)
         category = self.predict_category(item_name)
 
@@ -177,22 +203,31 @@ class ProductMatcher:
         # Estimate typical weight based on category and price
         typical_weight = self._estimate_weight(category, price, extracted_qty, unit)
 
-        from app.models.product import Product
-
-        new_product = Product(
+        return Product(
             name=item_name.title(),
             normalized_name=normalized_name,
             category=category,
             typical_unit=unit or "piece",
             typical_weight_g=typical_weight,
-            data_source="receipt_auto",
+            data_source=RECEIPT_AUTO_SOURCE,
             confidence_score=0.6,  # Medium confidence for auto-created products
         )
 
-        db.add(new_product)
-        db.commit()
-        db.refresh(new_product)
-        return new_product
+    def create_product_from_item(
+        self, db: Session, item_name: str, price: float, quantity: float = 1.0
+    ) -> Product:
+        """Create a new product from a receipt item."""
+        normalized_name = self.normalize_product_name(item_name)
+
+        # The catalog index may not have seen a product that another process
+        # created since its last reload, so check before creating a duplicate
+        existing = product.get_by_normalized_name(db, normalized_name=normalized_name)
+        if existing:
+            product_catalog.add_product(existing)
+            return existing
+
+        new_product = self.build_product_from_item(item_name, price, quantity)
+        return product.add(db, db_obj=new_product)
 
     def _estimate_weight(
         self,
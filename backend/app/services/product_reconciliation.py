@@ -0,0 +1,196 @@
+import logging
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+from scipy import sparse
+from sqlmodel import Session, col, select
+
+from app import crud
+from app.models.product import Product
+from app.services.product_catalog import trigrams
+from app.services.product_matcher import RECEIPT_AUTO_SOURCE
+
+logger = logging.getLogger(__name__)
+
+# Rows of the similarity matrix computed at once; bounds the memory used by
+# one block to roughly block size x neighbors above the threshold
+DEFAULT_BLOCK_SIZE = 2048
+
+
+@dataclass(slots=True, frozen=True)
+class MergeCandidate:
+    """An auto-created product that looks like a duplicate of another one."""
+
+    source_id: int
+    target_id: int
+    similarity: float
+
+
+def encode_names(names: Sequence[str]) -> sparse.csr_matrix:
+    """
+    Encode names as L2-normalized, IDF-weighted trigram vectors.
+
+    The trigrams are the ones pg_trgm and the product catalog index use, so
+    the dot product of two rows is the cosine similarity of two names, with
+    rare trigrams counting more than common ones such as "  b".
+    """
+    vocabulary: dict[str, int] = {}
+    indices: list[int] = []
+    indptr = [0]
+    for name in names:
+        indices.extend(
+            vocabulary.setdefault(gram, len(vocabulary)) for gram in trigrams(name)
+        )
+        indptr.append(len(indices))
+
+    columns = np.asarray(indices, dtype=np.int32)
+    document_frequency = np.bincount(columns, minlength=len(vocabulary))
+    idf = np.log((1 + len(names)) / (1 + document_frequency)) + 1
+    matrix = sparse.csr_matrix(
+        (idf[columns].astype(np.float32), columns, np.asarray(indptr)),
+        shape=(len(names), len(vocabulary)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags((1 / norms).astype(np.float32)) @ matrix)
+
+
+def top_k_neighbors(
+    vectors: sparse.csr_matrix,
+    *,
+    rows: Sequence[int] | npt.NDArray[np.intp] | None = None,
+    k: int = 5,
+    min_similarity: float = 0.8,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[tuple[int, int, float]]:
+    """
+    The ``k`` rows of ``vectors`` most similar to each of ``rows`` (all rows
+    by default), as ``(row, neighbor, cosine similarity)``, best first.
+
+    The query rows are multiplied against the whole matrix one block at a
+    time with a sparse matrix product, and only similarities of at least
+    ``min_similarity`` are kept from each block. A row is never its own
+    neighbor.
+    """
+    query_rows = np.arange(vectors.shape[0]) if rows is None else np.asarray(rows)
+    transposed = vectors.T.tocsr()
+    for start in range(0, len(query_rows), block_size):
+        block = query_rows[start : start + block_size]
+        scores = (vectors[block] @ transposed).tocsr()
+        for offset, row in enumerate(block.tolist()):
+            begin, end = scores.indptr[offset], scores.indptr[offset + 1]
+            neighbors = scores.indices[begin:end]
+            values = scores.data[begin:end]
+            keep = (values >= min_similarity) & (neighbors != row)
+            neighbors, values = neighbors[keep], values[keep]
+            if len(values) > k:
+                best = np.argpartition(-values, k)[:k]
+                neighbors, values = neighbors[best], values[best]
+            for order in np.argsort(-values, kind="stable"):
+                yield row, int(neighbors[order]), float(values[order])
+
+
+class ProductReconciliationService:
+    """
+    Finds auto-created products that duplicate other products and merges
+    them, for the periodic catalog clean-up run by app.reconcile_products.
+    """
+
+    def find_merge_candidates(
+        self,
+        db: Session,
+        *,
+        min_similarity: float = 0.8,
+        k: int = 5,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> list[MergeCandidate]:
+        """
+        Pair every auto-created product with the product it should be merged
+        into.
+
+        Only auto-created products are ever merged away. Products entered by
+        hand are preferred as targets, otherwise the older product is kept.
+        Pairs are applied best first, so chains of near-duplicates end up in
+        one product; a source's target is never a source itself.
+        """
+        started = time.perf_counter()
+        rows = db.exec(
+            select(Product.id, Product.normalized_name, Product.data_source).order_by(
+                col(Product.id)
+            )
+        ).all()
+        ids = [product_id for product_id, _, _ in rows]
+        auto = np.array([source == RECEIPT_AUTO_SOURCE for _, _, source in rows])
+        if not auto.any():
+            return []
+
+        vectors = encode_names([name for _, name, _ in rows])
+        auto_rows = np.flatnonzero(auto)
+        pairs = [
+            (similarity, row, neighbor)
+            for row, neighbor, similarity in top_k_neighbors(
+                vectors,
+                rows=auto_rows,
+                k=k,
+                min_similarity=min_similarity,
+                block_size=block_size,
+            )
+        ]
+        pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+
+        parent: dict[int, int] = {}
+
+        def find(row: int) -> int:
+            while row in parent:
+                row = parent[row]
+            return row
+
+        merged: list[tuple[int, int, float]] = []
+        for similarity, first, second in pairs:
+            first, second = find(first), find(second)
+            if first == second or not (auto[first] or auto[second]):
+                continue
+            # Keep the manual product, or the older one if both are automatic
+            if auto[first] and (not auto[second] or second < first):
+                source, target = first, second
+            else:
+                source, target = second, first
+            parent[source] = target
+            merged.append((source, target, similarity))
+
+        candidates = [
+            MergeCandidate(
+                source_id=ids[source],
+                target_id=ids[find(target)],
+                similarity=similarity,
+            )
+            for source, target, similarity in merged
+        ]
+        logger.info(
+            "Compared %s auto-created products against %s products in %.1fs: "
+            "%s merge candidates",
+            len(auto_rows),
+            len(rows),
+            time.perf_counter() - started,
+            len(candidates),
+        )
+        return candidates
+
+    def merge(
+        self, db: Session, candidates: Sequence[MergeCandidate], batch_size: int = 1000
+    ) -> int:
+        """Merge candidates into their targets, committing every batch."""
+        removed = 0
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start : start + batch_size]
+            removed += crud.product.merge_many(
+                db, merges={c.source_id: c.target_id for c in batch}
+            )
+        return removed
+
+
+# Global instance
+product_reconciliation = ProductReconciliationService()
@@ -0,0 +1,175 @@
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+
+from app.services.receipt_patterns import receipt_patterns
+
+_DIGIT = re.compile(r"\d")
+
+# Markers used to classify lines, checked against the upper-cased line
+SECTION_END_MARKERS = ("SUMME", "======", "------", "GESAMTBETRAG")
+TAX_MARKERS = ("GESAMTBETRAG", "STEUER", "MWST", "UST", "NETTO", "BRUTTO")
+TOTAL_MARKERS = ("SUMME", "TOTAL", "GESAMT", "BETRAG")
+PAYMENT_MARKERS = (
+    "MASTERCARD",
+    "VISA",
+    "AMEX",
+    "EC-KARTE",
+    "GIROCARD",
+    "DEBITKARTE",
+    "KREDITKARTE",
+    "KARTENZAHLUNG",
+    "CONTACTLESS",
+    "KONTAKTLOS",
+    "BARGELD",
+    "GEGEBEN",
+    "GEG.",
+    "NR.####",
+)
+
+
+def _any_marker(markers: tuple[str, ...]) -> re.Pattern[str]:
+    return re.compile("|".join(re.escape(marker) for marker in markers))
+
+
+_SECTION_END = _any_marker(SECTION_END_MARKERS)
+_TAX = _any_marker(TAX_MARKERS)
+_TOTAL = _any_marker(TOTAL_MARKERS)
+_PAYMENT = _any_marker(PAYMENT_MARKERS)
+
+
+class LineKind(str, Enum):
+    """Classification of a single receipt line"""
+
+    BLANK = "blank"
+    HEADER = "header"
+    ITEM = "item"
+    DISCOUNT = "discount"
+    PFAND = "pfand"
+    TAX = "tax"
+    TOTAL = "total"
+    PAYMENT = "payment"
+    FOOTER = "footer"
+
+
+ITEM_KINDS = frozenset({LineKind.ITEM, LineKind.PFAND, LineKind.DISCOUNT})
+
+
+@dataclass(slots=True)
+class ReceiptLine:
+    index: int
+    text: str  # Stripped line
+    upper: str
+    kind: LineKind
+    has_digit: bool
+    # Pre-matched regexes, so extractors never re-run them
+    item: re.Match[str] | None = None
+    discount: re.Match[str] | None = None
+    pfand: re.Match[str] | None = None
+    tax: list[tuple[str, ...]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class TokenizedReceipt:
+    text: str
+    upper: str
+    lines: list[ReceiptLine]
+    # Lines with at least one digit that are not item, Pfand or discount
+    # lines. Numbers, dates and totals are only ever searched for here.
+    digit_lines: list[ReceiptLine]
+    # Boundaries of the item section, [item_start, item_end)
+    item_start: int
+    item_end: int
+
+    def of_kind(self, *kinds: LineKind) -> list[ReceiptLine]:
+        return [line for line in self.lines if line.kind in kinds]
+
+
+def _classify(line: ReceiptLine, seen_body: bool) -> LineKind:
+    upper = line.upper
+    if line.pfand:
+        return LineKind.PFAND
+    if "RABATT" in upper and "-" in upper:
+        return LineKind.DISCOUNT
+    if line.tax or _TAX.search(upper):
+        return LineKind.TAX
+    if line.has_digit and _TOTAL.search(upper):
+        return LineKind.TOTAL
+    if _PAYMENT.search(upper):
+        return LineKind.PAYMENT
+    return LineKind.FOOTER if seen_body else LineKind.HEADER
+
+
+def tokenize_receipt(text: str) -> TokenizedReceipt:
+    """
+    Split receipt text into classified line records in a single pass.
+
+    Every line is stripped, upper-cased and matched against the item, discount,
+    Pfand and tax-line patterns exactly once. Field extractors then work on
+    these records instead of rescanning the raw text.
+    """
+    raw_lines = text.split("\n")
+    lines: list[ReceiptLine] = []
+    digit_lines: list[ReceiptLine] = []
+    first_amount_line: int | None = None
+    item_end = len(raw_lines)
+    section_end_found = False
+    seen_body = False
+
+    for index, raw in enumerate(raw_lines):
+        stripped = raw.strip()
+        upper = stripped.upper()
+        has_digit = _DIGIT.search(stripped) is not None
+        line = ReceiptLine(
+            index=index,
+            text=stripped,
+            upper=upper,
+            kind=LineKind.BLANK,
+            has_digit=has_digit,
+        )
+
+        if not stripped:
+            lines.append(line)
+            continue
+
+        # Items never follow the end of the item section, so skip the
+        # (comparatively expensive) item pattern for footer lines
+        if has_digit and not section_end_found:
+            line.item = receipt_patterns.match("item.rewe", stripped)
+        if has_digit and first_amount_line is None and "EUR" in stripped:
+            first_amount_line = index
+        if not section_end_found and _SECTION_END.search(upper):
+            item_end = index
+            section_end_found = True
+
+        if line.item:
+            line.kind = LineKind.ITEM
+            seen_body = True
+            lines.append(line)
+            continue
+
+        if has_digit:
+            if "PFAND" in upper:
+                line.pfand = receipt_patterns.search("item.pfand", stripped)
+            if "RABATT" in upper and "-" in stripped:
+                line.discount = receipt_patterns.search("item.discount", stripped)
+            if "=" in stripped and "%" in stripped:
+                line.tax = receipt_patterns.findall("tax.line", stripped)
+
+        line.kind = _classify(line, seen_body)
+        if has_digit and line.kind not in ITEM_KINDS:
+            digit_lines.append(line)
+        if line.kind not in (LineKind.HEADER, LineKind.BLANK):
+            seen_body = True
+        lines.append(line)
+
+    item_start = max(0, first_amount_line - 5) if first_amount_line is not None else 0
+
+    return TokenizedReceipt(
+        text=text,
+        upper=text.upper(),
+        lines=lines,
+        digit_lines=digit_lines,
+        item_start=item_start,
+        item_end=item_end,
+    )
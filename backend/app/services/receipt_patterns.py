@@ -0,0 +1,327 @@
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
+
+# Common German supermarket chains
+GERMAN_STORES = [
+    "REWE",
+    "EDEKA",
+    "ALDI",
+    "LIDL",
+    "PENNY",
+    "NETTO",
+    "KAUFLAND",
+    "REAL",
+    "GLOBUS",
+    "TEGUT",
+    "FAMILA",
+    "MARKTKAUF",
+    "HIT",
+    "COMBI",
+]
+
+# Keywords that precede an amount, per financial field
+SUBTOTAL_KEYWORDS = ["Zwischensumme", "Netto", "Subtotal", "Summe"]
+TAX_KEYWORDS = ["MwSt", "USt", "Steuer", "Tax", "VAT"]
+TOTAL_KEYWORDS = ["Summe", "Total", "Gesamt", "Betrag"]
+
+
+@dataclass(slots=True)
+class PatternStats:
+    calls: int = 0
+    hits: int = 0
+    total_time: float = 0.0
+
+
+class PatternRegistry:
+    """
+    Registry of precompiled regex patterns used by the receipt extractors.
+
+    Patterns are compiled once and grouped by field so extractors can try a
+    group in order. Every lookup records call count, hit count and time spent,
+    which makes it easy to see which extractors dominate parse time.
+    """
+
+    def __init__(self) -> None:
+        self._patterns: dict[str, re.Pattern[str]] = {}
+        self._literals: dict[str, str] = {}
+        self._groups: dict[str, list[str]] = {}
+        self._stats: dict[str, PatternStats] = {}
+
+    def register(
+        self, name: str, pattern: str, flags: int = 0, literal: str | None = None
+    ) -> re.Pattern[str]:
+        """
+        Compile and register a single named pattern.
+
+        ``literal`` is an upper-case substring that every match contains, so
+        callers can skip lines that cannot match without running the regex.
+        """
+        compiled = re.compile(pattern, flags)
+        self._patterns[name] = compiled
+        if literal:
+            self._literals[name] = literal
+        self._stats[name] = PatternStats()
+        return compiled
+
+    def register_group(
+        self,
+        group: str,
+        patterns: dict[str, str],
+        flags: int = 0,
+        literals: dict[str, str] | None = None,
+    ) -> None:
+        """Register an ordered group of patterns named ``<group>.<key>``."""
+        names = []
+        for key, pattern in patterns.items():
+            name = f"{group}.{key}"
+            literal = literals.get(key) if literals else None
+            self.register(name, pattern, flags, literal=literal)
+            names.append(name)
+        self._groups[group] = names
+
+    def get(self, name: str) -> re.Pattern[str]:
+        return self._patterns[name]
+
+    def literal(self, name: str) -> str | None:
+        return self._literals.get(name)
+
+    def group(self, group: str) -> list[str]:
+        return self._groups[group]
+
+    def search(self, name: str, text: str) -> re.Match[str] | None:
+        started = time.perf_counter()
+        result = self._patterns[name].search(text)
+        stats = self._stats[name]
+        stats.total_time += time.perf_counter() - started
+        stats.calls += 1
+        if result is not None:
+            stats.hits += 1
+        return result
+
+    def match(self, name: str, text: str) -> re.Match[str] | None:
+        started = time.perf_counter()
+        result = self._patterns[name].match(text)
+        stats = self._stats[name]
+        stats.total_time += time.perf_counter() - started
+        stats.calls += 1
+        if result is not None:
+            stats.hits += 1
+        return result
+
+    def findall(self, name: str, text: str) -> list[Any]:
+        started = time.perf_counter()
+        result = self._patterns[name].findall(text)
+        stats = self._stats[name]
+        stats.total_time += time.perf_counter() - started
+        stats.calls += 1
+        if result:
+            stats.hits += 1
+        return result
+
+    def search_group(self, group: str, text: str) -> re.Match[str] | None:
+        """Return the first match from a pattern group, trying patterns in order."""
+        for name in self._groups[group]:
+            match = self.search(name, text)
+            if match:
+                return match
+        return None
+
+    def stats(self) -> dict[str, dict[str, float | int]]:
+        """Per-pattern counters, sorted by total time spent (slowest first)."""
+        ordered = sorted(
+            self._stats.items(), key=lambda item: item[1].total_time, reverse=True
+        )
+        return {
+            name: {
+                "calls": stats.calls,
+                "hits": stats.hits,
+                "total_time_ms": stats.total_time * 1000,
+            }
+            for name, stats in ordered
+        }
+
+    def reset_stats(self) -> None:
+        for name in self._stats:
+            self._stats[name] = PatternStats()
+
+
+def _amount_after(keyword: str) -> str:
+    return rf"{keyword}[:\s]*([0-9]+[,\.]\d{{2}})"
+
+
+def _keyword_literals(patterns: dict[str, str]) -> dict[str, str]:
+    return {key: key.upper() for key in patterns}
+
+
+def build_receipt_patterns() -> PatternRegistry:
+    """Build the registry with every pattern the German receipt parser needs."""
+    registry = PatternRegistry()
+
+    # Store names, e.g. "REWE Markt GmbH"
+    registry.register_group(
+        "store_markt",
+        {store: rf"({store}[\s\w]*MARKT[\s\w]*)" for store in GERMAN_STORES},
+    )
+
+    # Address
+    registry.register("address.postal_code", r"\b\d{5}\b")
+    registry.register(
+        "address.street",
+        r"[A-Za-zäöüÄÖÜß\s]+(?:str\.|straße|platz|weg|gasse|allee)\s*\d*",
+        re.IGNORECASE,
+    )
+
+    # Phone
+    registry.register_group(
+        "phone",
+        {
+            "tel": r"Tel\.?\s*:?\s*(\+49\s*\d+[\s\-\d]+)",
+            "telefon": r"Telefon\s*:?\s*(\+49\s*\d+[\s\-\d]+)",
+            "international": r"(\+49\s*\d+[\s\-\d]+)",
+            "national": r"(\d{4,5}[\s\-]\d+[\s\-\d]*)",
+        },
+        re.IGNORECASE,
+        literals={"tel": "TEL", "telefon": "TELEFON", "international": "+49"},
+    )
+
+    # Receipt metadata
+    receipt_number_patterns = {
+        "beleg": r"Beleg[:\s]*(\d+)",
+        "bon": r"Bon[:\s]*(\d+)",
+        "quittung": r"Quittung[:\s]*(\d+)",
+        "trans": r"Trans[:\s]*(\d+)",
+        "nr": r"Nr[:\s]*(\d+)",
+    }
+    registry.register_group(
+        "receipt_number",
+        receipt_number_patterns,
+        re.IGNORECASE,
+        literals=_keyword_literals(receipt_number_patterns),
+    )
+    cashier_patterns = {
+        "kasse": r"Kasse[:\s]*(\d+)",
+        "kassier": r"Kassier[:\s]*(\d+)",
+        "bed": r"Bed[:\s]*(\d+)",
+        "bedienung": r"Bedienung[:\s]*(\d+)",
+    }
+    registry.register_group(
+        "cashier",
+        cashier_patterns,
+        re.IGNORECASE,
+        literals=_keyword_literals(cashier_patterns),
+    )
+    register_patterns = {
+        "terminal": r"Terminal[:\s]*(\d+)",
+        "kasse": r"Kasse[:\s]*(\d+)",
+        "reg": r"Reg[:\s]*(\d+)",
+    }
+    registry.register_group(
+        "register",
+        register_patterns,
+        re.IGNORECASE,
+        literals=_keyword_literals(register_patterns),
+    )
+
+    # Date and time (German formats)
+    registry.register_group(
+        "date",
+        {
+            "dmy": r"(\d{1,2})[\.\/](\d{1,2})[\.\/](\d{2,4})",  # DD.MM.YYYY
+            "ymd": r"(\d{2,4})[\.\/](\d{1,2})[\.\/](\d{1,2})",  # YYYY.MM.DD
+        },
+    )
+    registry.register_group(
+        "time",
+        {
+            "hms": r"(\d{1,2}):(\d{2}):(\d{2})",  # HH:MM:SS
+            "hm": r"(\d{1,2}):(\d{2})",  # HH:MM
+        },
+        literals={"hms": ":", "hm": ":"},
+    )
+
+    # Currency
+    registry.register_group(
+        "currency",
+        {
+            "euro_suffix": r"(\d+[,\.]\d{2})\s*€",
+            "euro_prefix": r"€\s*(\d+[,\.]\d{2})",
+            "eur_prefix": r"EUR\s*(\d+[,\.]\d{2})",
+            "eur_suffix": r"(\d+[,\.]\d{2})\s*EUR",
+        },
+        literals={
+            "euro_suffix": "€",
+            "euro_prefix": "€",
+            "eur_prefix": "EUR",
+            "eur_suffix": "EUR",
+        },
+    )
+    registry.register("price", r"\d+[,\.]\d{2}")
+
+    # Keyword followed by an amount
+    registry.register_group(
+        "subtotal",
+        {kw.lower(): _amount_after(kw) for kw in SUBTOTAL_KEYWORDS},
+        re.IGNORECASE,
+        literals={kw.lower(): kw.upper() for kw in SUBTOTAL_KEYWORDS},
+    )
+    registry.register_group(
+        "tax_keyword",
+        {kw.lower(): _amount_after(kw) for kw in TAX_KEYWORDS},
+        re.IGNORECASE,
+        literals={kw.lower(): kw.upper() for kw in TAX_KEYWORDS},
+    )
+    registry.register_group(
+        "total_keyword",
+        {kw.lower(): _amount_after(kw) for kw in TOTAL_KEYWORDS},
+        re.IGNORECASE,
+        literals={kw.lower(): kw.upper() for kw in TOTAL_KEYWORDS},
+    )
+
+    # Totals and taxes (REWE layout)
+    registry.register_group(
+        "total",
+        {
+            "summe_eur": r"SUMME EUR\s+(\d+[,\.]\d{2})",
+            "gesamtbetrag": r"Gesamtbetrag\s+[\d,\.]+\s+[\d,\.]+\s+(\d+[,\.]\d{2})",
+            "betrag_eur": r"Betrag EUR\s+(\d+[,\.]\d{2})",
+        },
+        literals={
+            "summe_eur": "SUMME EUR",
+            "gesamtbetrag": "GESAMTBETRAG",
+            "betrag_eur": "BETRAG EUR",
+        },
+    )
+    registry.register(
+        "tax.summary",
+        r"Gesamtbetrag\s+[\d,\.]+\s+(\d+[,\.]\d{2})\s+[\d,\.]+$",
+        re.MULTILINE,
+        literal="GESAMTBETRAG",
+    )
+    # Tax lines like "A= 19,0% 0,84 0,16 1,00"
+    registry.register(
+        "tax.line",
+        r"([AB])=\s*(\d+[,\.]\d+)%\s+(\d+[,\.]\d+)\s+(\d+[,\.]\d+)\s+(\d+[,\.]\d+)",
+    )
+
+    # Payment
+    registry.register(
+        "payment.card_number", r"Nr\.############(\d{4})", literal="NR.####"
+    )
+
+    # Items
+    registry.register(
+        "item.rewe", r"^([A-ZÄÖÜ][A-ZÄÖÜ\s\.\!\-\/]+?)(\d+[,\.]\d{2})\s*([AB])$"
+    )
+    registry.register("item.trailing_punctuation", r"[\.\s]+$")
+    registry.register("item.discount", r"-(\d+[,\.]\d{2})")
+    registry.register(
+        "item.pfand", r"PFAND.*?(\d+[,\.]\d{2})\s*([AB])", literal="PFAND"
+    )
+
+    return registry
+
+
+# Global registry, compiled once at import time
+receipt_patterns = build_receipt_patterns()
@@ -0,0 +1,199 @@
+from collections.abc import Generator
+from datetime import date, datetime
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, delete
+
+from app import crud
+from app.core.config import settings
+from app.models import (
+    ExtractedData,
+    ExtractedDataCreate,
+    Product,
+    ProductCategory,
+    ProductPurchase,
+    UserCategorySpending,
+    UserProductSpending,
+)
+from app.schemas import UserCreate
+from app.tests.utils.pdf_document import create_random_document
+from app.tests.utils.user import user_authentication_headers
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture(scope="module")
+def shopper(
+    client: TestClient, db: Session
+) -> Generator[tuple[dict[str, str], Product]]:
+    """A user with two receipts from two stores; their headers and product."""
+    email, password = random_email(), random_lower_string()
+    user = crud.user.create(db, obj_in=UserCreate(email=email, password=password))
+    documents = [create_random_document(db, owner_id=user.id) for _ in range(2)]
+    # The ALDI receipt is from February but was only uploaded in March
+    rewe, aldi = (
+        crud.extracted_data.create(
+            db,
+            obj_in=ExtractedDataCreate(
+                document_id=document.id,
+                store_name=store,
+                transaction_date=transaction_date,
+            ),
+        )
+        for document, store, transaction_date in zip(
+            documents, ["REWE", "ALDI"], [None, date(2026, 2, 27)], strict=True
+        )
+    )
+    suffix = random_lower_string()[:8]
+    milk, bread = (
+        crud.product.add(
+            db,
+            db_obj=Product(
+                name=f"{name}{suffix}",
+                normalized_name=f"{name.lower()}{suffix}",
+                category=category,
+            ),
+        )
+        for name, category in [
+            ("Milch", ProductCategory.DAIRY),
+            ("Brot", ProductCategory.BAKERY),
+        ]
+    )
+
+    def purchase(
+        receipt: ExtractedData, product: Product, price: float, processed: datetime
+    ) -> dict[str, Any]:
+        return {
+            "product_id": product.id,
+            "extracted_data_id": receipt.id,
+            "user_id": user.id,
+            "receipt_item_name": product.name,
+            "unit_price": price,
+            "total_price": price,
+            "purchase_date": processed,
+        }
+
+    crud.product_purchase.create_many(
+        db,
+        purchases=[
+            purchase(rewe, milk, 1.0, datetime(2026, 1, 5)),
+            purchase(rewe, bread, 3.0, datetime(2026, 1, 5)),
+            purchase(aldi, milk, 2.0, datetime(2026, 3, 9)),
+        ],
+    )
+    db.commit()
+
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    yield headers, milk
+
+    db.execute(delete(ProductPurchase).where(col(ProductPurchase.user_id) == user.id))
+    for table in (UserCategorySpending, UserProductSpending):
+        db.execute(delete(table).where(col(table.user_id) == user.id))
+    db.commit()
+    for product in (milk, bread):
+        crud.product.remove(db, id=product.id)
+    for document in documents:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_spending_by_store(
+    client: TestClient, shopper: tuple[dict[str, str], Product]
+) -> None:
+    headers, _ = shopper
+    r = client.get(f"{settings.API_V1_STR}/analytics/spending/stores", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == [
+        {"store_name": "REWE", "receipts": 1, "items": 2, "total_spent": 4.0},
+        {"store_name": "ALDI", "receipts": 1, "items": 1, "total_spent": 2.0},
+    ]
+
+    url = f"{settings.API_V1_STR}/analytics/spending/stores"
+    r = client.get(url, headers=headers, params={"start": "2026-02-27"})
+    assert [row["store_name"] for row in r.json()] == ["ALDI"]
+    # Dates are those of the receipts, not of their upload
+    r = client.get(url, headers=headers, params={"start": "2026-03-01"})
+    assert r.json() == []
+
+
+def test_spending_by_period(
+    client: TestClient, shopper: tuple[dict[str, str], Product]
+) -> None:
+    headers, _ = shopper
+    url = f"{settings.API_V1_STR}/analytics/spending/periods"
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    assert [(row["period"], row["total_spent"]) for row in r.json()] == [
+        ("2026-01-01T00:00:00", 4.0),
+        ("2026-02-01T00:00:00", 2.0),
+    ]
+
+    r = client.get(
+        url, headers=headers, params={"bucket": "quarter", "category": "dairy"}
+    )
+    assert r.json() == [
+        {
+            "period": "2026-01-01T00:00:00",
+            "receipts": 2,
+            "items": 2,
+            "total_spent": 3.0,
+        }
+    ]
+
+    r = client.get(url, headers=headers, params={"bucket": "hour"})
+    assert r.status_code == 422
+
+
+def test_baskets(client: TestClient, shopper: tuple[dict[str, str], Product]) -> None:
+    headers, _ = shopper
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/baskets",
+        headers=headers,
+        params={"bucket": "year"},
+    )
+    assert r.status_code == 200
+    assert r.json() == [
+        {
+            "period": "2026-01-01T00:00:00",
+            "receipts": 2,
+            "average_items": 1.5,
+            "average_total": 3.0,
+        }
+    ]
+
+
+def test_price_history(
+    client: TestClient, shopper: tuple[dict[str, str], Product]
+) -> None:
+    headers, milk = shopper
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/products/{milk.id}/prices", headers=headers
+    )
+    assert r.status_code == 200
+    assert [
+        (row["period"], row["average_unit_price"], row["previous_average_unit_price"])
+        for row in r.json()
+    ] == [
+        ("2026-01-01T00:00:00", 1.0, None),
+        ("2026-02-01T00:00:00", 2.0, 1.0),
+    ]
+
+
+def test_analytics_of_other_users_are_empty(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    shopper: tuple[dict[str, str], Product],
+) -> None:
+    _, milk = shopper
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/products/{milk.id}/prices",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+def test_analytics_require_token(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/analytics/spending/stores")
+    assert r.status_code == 401
@@ -0,0 +1,339 @@
+import io
+import zipfile
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import DuplicateUploadPolicy, ExtractedDataCreate
+from app.tests.utils.pdf_document import create_processed_document
+from app.tests.utils.utils import count_queries, random_lower_string
+
+
+def _upload(
+    client: TestClient, headers: dict[str, str], content: bytes
+) -> dict[str, Any]:
+    response = client.post(
+        f"{settings.API_V1_STR}/pdf/upload",
+        headers=headers,
+        files={"file": ("receipt.pdf", content, "application/pdf")},
+    )
+    assert response.status_code == 200
+    result: dict[str, Any] = response.json()
+    return result
+
+
+def _delete(client: TestClient, headers: dict[str, str], document_id: object) -> None:
+    response = client.delete(
+        f"{settings.API_V1_STR}/pdf/documents/{document_id}", headers=headers
+    )
+    assert response.status_code == 200
+
+
+def test_duplicate_upload_links_existing_document(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    content = b"%PDF-1.4\n" + random_lower_string().encode()
+
+    first = _upload(client, superuser_token_headers, content)
+    assert first["duplicate_of"] is None
+    second = _upload(client, superuser_token_headers, content)
+    assert second["document_id"] == first["document_id"]
+    assert second["duplicate_of"] == first["document_id"]
+
+    _delete(client, superuser_token_headers, first["document_id"])
+
+
+def test_duplicate_upload_reuses_extraction(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.FIRST_SUPERUSER)
+    assert user
+    user.duplicate_upload_policy = DuplicateUploadPolicy.CREATE_DOCUMENT
+    db.add(user)
+    db.commit()
+
+    content = b"%PDF-1.4\n" + random_lower_string().encode()
+    first = _upload(client, superuser_token_headers, content)
+    first_id = first["document_id"]
+    assert isinstance(first_id, int)
+    crud.extracted_data.create(
+        db,
+        obj_in=ExtractedDataCreate(
+            document_id=first_id, store_name="REWE", total_amount=9.70
+        ),
+    )
+    crud.pdf_document.mark_as_processed(db, document_id=first_id)
+
+    second = _upload(client, superuser_token_headers, content)
+    assert second["document_id"] != first_id
+    assert second["duplicate_of"] == first_id
+    assert second["processing_status"] == "completed"
+    copied = crud.extracted_data.get_latest_by_document(
+        db, document_id=second["document_id"]
+    )
+    assert copied and copied.store_name == "REWE"
+
+    # The stored file is shared and survives deleting one of the documents
+    document = crud.pdf_document.get(db, id=second["document_id"])
+    assert document
+    file_path = document.file_path
+    _delete(client, superuser_token_headers, first_id)
+    assert crud.pdf_document.count_by_file_path(db, file_path=file_path) == 1
+    _delete(client, superuser_token_headers, second["document_id"])
+    assert crud.pdf_document.count_by_file_path(db, file_path=file_path) == 0
+
+    user.duplicate_upload_policy = DuplicateUploadPolicy.LINK_EXISTING
+    db.add(user)
+    db.commit()
+
+
+def test_batch_upload_with_zip(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    first = b"%PDF-1.4\n" + random_lower_string().encode()
+    second = b"%PDF-1.4\n" + random_lower_string().encode()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("receipts/second.pdf", second)
+        zf.writestr("receipts/again.pdf", first)
+        zf.writestr("notes.txt", b"ignored")
+
+    response = client.post(
+        f"{settings.API_V1_STR}/pdf/upload/batch",
+        headers=superuser_token_headers,
+        files=[
+            ("files", ("first.pdf", first, "application/pdf")),
+            ("files", ("broken.pdf", b"not a pdf", "application/pdf")),
+            ("files", ("receipts.zip", archive.getvalue(), "application/zip")),
+        ],
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["queued"] == 2
+    assert content["failed"] == 1
+    assert content["duplicates"] == 1
+    items = {item["filename"]: item for item in content["items"]}
+    assert items["broken.pdf"]["error"]
+    assert items["again.pdf"]["duplicate_of"] == items["first.pdf"]["document_id"]
+    assert "notes.txt" not in items
+
+    response = client.get(
+        f"{settings.API_V1_STR}/pdf/batches/{content['batch_id']}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    status = response.json()
+    assert status["total"] == 2
+    assert status["pending"] == 2
+    assert status["finished"] is False
+
+    for name in ("first.pdf", "second.pdf"):
+        _delete(client, superuser_token_headers, items[name]["document_id"])
+
+
+def test_batch_status_of_other_user_is_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/pdf/batches/999999",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_document_listing_query_count_is_constant(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    documents = [create_processed_document(db, owner_id=user.id) for _ in range(6)]
+
+    def listing_queries(limit: int) -> int:
+        with count_queries() as statements:
+            response = client.get(
+                f"{settings.API_V1_STR}/pdf/documents",
+                headers=normal_user_token_headers,
+                params={"limit": limit},
+            )
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        assert all(document["extracted_data"] for document in response.json())
+        return len(statements)
+
+    def search_queries(limit: int) -> int:
+        with count_queries() as statements:
+            response = client.post(
+                f"{settings.API_V1_STR}/pdf/search",
+                headers=normal_user_token_headers,
+                json={"store_name": "REWE", "limit": limit},
+            )
+        assert response.status_code == 200
+        assert len(response.json()["documents"]) == limit
+        return len(statements)
+
+    assert listing_queries(2) == listing_queries(6) > 0
+    assert search_queries(2) == search_queries(6) > 0
+
+    for document in documents:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_document_listing_cursor_pagination(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    documents = [create_processed_document(db, owner_id=user.id) for _ in range(5)]
+    created_ids = {document.id for document in documents if document.id is not None}
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params: dict[str, Any] = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"{settings.API_V1_STR}/pdf/documents",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        seen.extend(document["id"] for document in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert created_ids <= set(seen)
+    # Newest first
+    ours = [document_id for document_id in seen if document_id in created_ids]
+    assert ours == sorted(created_ids, reverse=True)
+
+    for document in documents:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_document_listing_invalid_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/pdf/documents",
+        headers=normal_user_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+
+
+def test_document_listing_summary_view(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    document = create_processed_document(db, owner_id=user.id)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/pdf/documents",
+        headers=normal_user_token_headers,
+        params={"view": "summary"},
+    )
+    assert response.status_code == 200
+    summary = next(row for row in response.json() if row["id"] == document.id)
+    assert summary["store_name"] == "REWE"
+    assert float(summary["total_amount"]) == 9.70
+    assert summary["processed"] is True
+    assert "extracted_data" not in summary
+
+    with count_queries() as statements:
+        response = client.post(
+            f"{settings.API_V1_STR}/pdf/search",
+            headers=normal_user_token_headers,
+            json={"store_name": "REWE", "view": "summary"},
+        )
+    assert response.status_code == 200
+    assert document.id in [row["id"] for row in response.json()["documents"]]
+    # Summary rows are read with a single column projection
+    assert not any("raw_text" in statement for statement in statements)
+
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_search_reports_total_matches(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    documents = [create_processed_document(db, owner_id=user.id) for _ in range(3)]
+
+    def search(**params: Any) -> dict[str, Any]:
+        response = client.post(
+            f"{settings.API_V1_STR}/pdf/search",
+            headers=normal_user_token_headers,
+            json={"store_name": "REWE", **params},
+        )
+        assert response.status_code == 200
+        result: dict[str, Any] = response.json()
+        return result
+
+    for view in ("full", "summary"):
+        everything = search(limit=1000, view=view)["total"]
+        assert everything >= 3
+        first = search(limit=1, view=view)
+        assert len(first["documents"]) == 1
+        assert first["total"] == everything
+        following = search(limit=1, view=view, cursor=first["next_cursor"])
+        assert following["total"] == everything
+        assert search(limit=1, view=view, skip=1)["total"] == everything
+
+    response = client.post(
+        f"{settings.API_V1_STR}/pdf/search",
+        headers=normal_user_token_headers,
+        json={"start_date": "03.09.2026"},
+    )
+    assert response.status_code == 422
+
+    for document in documents:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_search_ranks_free_text_matches(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    # A word no other receipt of the test user contains
+    word = random_lower_string()[:12]
+    in_text, in_items = (
+        create_processed_document(db, owner_id=user.id) for _ in range(2)
+    )
+    for document, items, raw_text in (
+        (in_text, [{"name": "BROT", "price": 2.49}], f"Aktion {word}"),
+        (in_items, [{"name": word.upper(), "price": 1.99}], None),
+    ):
+        assert document.id
+        crud.extracted_data.create(
+            db,
+            obj_in=ExtractedDataCreate(
+                document_id=document.id, items=items, raw_text=raw_text
+            ),
+        )
+
+    for view in ("full", "summary"):
+        for params in ({}, {"skip": 0, "limit": 1}, {"skip": 1, "limit": 1}):
+            response = client.post(
+                f"{settings.API_V1_STR}/pdf/search",
+                headers=normal_user_token_headers,
+                json={"query": word, "view": view, **params},
+            )
+            assert response.status_code == 200
+            found = [document["id"] for document in response.json()["documents"]]
+            expected = [in_items.id, in_text.id]
+            if params:
+                expected = expected[params["skip"] :][:1]
+            assert found == expected
+
+    for document in (in_text, in_items):
+        crud.pdf_document.remove(db, id=document.id)
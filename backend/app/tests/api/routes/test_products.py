@@ -0,0 +1,87 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models.product import Product, ProductCategory
+from app.tests.utils.utils import random_lower_string
+
+
+def test_read_products_by_category_pages(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    suffix = random_lower_string()[:8]
+    products = [
+        crud.product.add(
+            db,
+            db_obj=Product(
+                name=f"Tee{suffix} {i}",
+                normalized_name=f"tee{suffix} {i}",
+                category=ProductCategory.FROZEN,
+            ),
+        )
+        for i in range(3)
+    ]
+
+    url = f"{settings.API_V1_STR}/products/"
+    params: dict[str, Any] = {"category": ProductCategory.FROZEN.value, "limit": 2}
+    first = client.get(url, headers=superuser_token_headers, params=params)
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(
+        url, headers=superuser_token_headers, params={**params, "cursor": cursor}
+    )
+    assert second.status_code == 200
+    names = [product["name"] for product in first.json() + second.json()]
+    assert names == [product.name for product in products]
+
+    response = client.get(f"{url}{products[0].id}", headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["normalized_name"] == products[0].normalized_name
+
+    for product in products:
+        crud.product.remove(db, id=product.id)
+    response = client.get(f"{url}{products[0].id}", headers=superuser_token_headers)
+    assert response.status_code == 404
+
+
+def test_match_unknown_item_suggests_category(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/products/match/",
+        headers=superuser_token_headers,
+        params={"item_name": f"Bio Banane {random_lower_string()}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["matched"] is False
+    assert content["suggested_category"] == ProductCategory.FRUITS.value
+
+
+def test_read_products_requires_token(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers={"Authorization": "Bearer invalid"},
+    )
+    assert response.status_code == 403
+
+
+def test_read_product_insights(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/products/insights/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 200
+    insights = r.json()
+    assert set(insights) == {
+        "total_purchases",
+        "total_spent",
+        "top_categories",
+        "frequent_products",
+        "recent_purchases",
+    }
+    assert insights["total_purchases"] >= len(insights["recent_purchases"])
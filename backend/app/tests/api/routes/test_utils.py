@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from app.api.api_v1.api import EndpointRouter, build_api_router
+from app.core.config import settings
+
+
+def test_db_pool_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert set(stats) == {"sync", "async"}
+    assert stats["sync"]["pool"]
+
+
+def test_db_pool_stats_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_disabled_routers_are_not_imported() -> None:
+    router = build_api_router(
+        [
+            EndpointRouter("utils", "/utils", "utils"),
+            EndpointRouter("does_not_exist", "/missing", "missing", enabled=False),
+        ]
+    )
+    paths = {route.path for route in router.routes}  # type: ignore[attr-defined]
+    assert "/utils/health-check/" in paths
+    assert not any(path.startswith("/missing") for path in paths)
@@ -0,0 +1,33 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import app
+
+# Only the PDF worker and mail delivery need these
+LAZY_MODULES = [
+    "PyPDF2",
+    "app.services.pdf_processor",
+    "app.services.extraction_engine",
+    "concurrent.futures.process",
+    "emails",
+    "jinja2",
+    "sentry_sdk",
+]
+
+
+def test_app_import_does_not_load_optional_subsystems() -> None:
+    probe = (
+        "import json, sys\n"
+        "import app.main\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=Path(app.__file__).parents[1],
+    ).stdout
+    assert json.loads(output.splitlines()[-1]) == []
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.db_pool import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_records_checkouts_overflow_and_timeouts() -> None:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    first = engine.connect()
+    second = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["overflow_max"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["starved"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    first.close()
+    second.close()
+    with engine.connect():
+        pass
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 3
+    assert stats["checked_out"] == 0
+    engine.dispose()
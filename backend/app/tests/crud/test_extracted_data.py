@@ -0,0 +1,213 @@
+from datetime import date
+from typing import Any
+
+from sqlmodel import Session
+
+from app import crud
+from app.models import ExtractedDataCreate
+from app.models.product import Product, ProductCategory
+from app.services.product_catalog import product_catalog
+from app.services.product_integration import product_integration
+from app.tests.utils.pdf_document import create_random_document
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def test_search_filters_and_counts(db: Session) -> None:
+    user = create_random_user(db)
+    receipts = [
+        ("REWE Markt", date(2026, 1, 10)),
+        ("REWE City", date(2026, 2, 10)),
+        ("ALDI Sued", date(2026, 2, 20)),
+        ("REWE Markt", None),
+    ]
+    documents = []
+    for store_name, transaction_date in receipts:
+        document = create_random_document(db, owner_id=user.id)
+        assert document.id
+        crud.extracted_data.create(
+            db,
+            obj_in=ExtractedDataCreate(
+                document_id=document.id,
+                store_name=store_name,
+                transaction_date=transaction_date,
+            ),
+        )
+        documents.append(document)
+    # Another owner's receipt never matches
+    other = create_random_document(db)
+    assert other.id
+    crud.extracted_data.create(
+        db, obj_in=ExtractedDataCreate(document_id=other.id, store_name="REWE Markt")
+    )
+
+    def stores(**filters: Any) -> list[str | None]:
+        found, total = crud.extracted_data.search(db, owner_id=user.id, **filters)
+        assert total == len(found)
+        return [data.store_name for data in found]
+
+    # Newest first
+    assert stores(store_name="rewe") == ["REWE Markt", "REWE City", "REWE Markt"]
+    assert stores(start_date=date(2026, 2, 10)) == ["ALDI Sued", "REWE City"]
+    assert stores(end_date=date(2026, 2, 10)) == ["REWE City", "REWE Markt"]
+    assert stores(
+        store_name="REWE", start_date=date(2026, 2, 1), end_date=date(2026, 2, 28)
+    ) == ["REWE City"]
+
+    # The total counts every match, not just the page
+    page, total = crud.extracted_data.search(
+        db, owner_id=user.id, store_name="REWE", skip=1, limit=1
+    )
+    assert [data.store_name for data in page] == ["REWE City"]
+    assert total == 3
+    assert crud.extracted_data.search(
+        db, owner_id=user.id, store_name="REWE", skip=5
+    ) == ([], 3)
+
+    seen: list[str | None] = []
+    cursor = None
+    while True:
+        page, cursor, total = crud.extracted_data.search_page(
+            db, owner_id=user.id, store_name="REWE", cursor=cursor, limit=2
+        )
+        assert total == 3
+        seen.extend(data.store_name for data in page)
+        if cursor is None:
+            break
+    assert seen == ["REWE Markt", "REWE City", "REWE Markt"]
+
+    # Summaries count every matching document too
+    summaries, total = crud.pdf_document.search_summaries(
+        db, owner_id=user.id, store_name="REWE", skip=1, limit=1
+    )
+    assert [row.store_name for row in summaries] == ["REWE City"]
+    assert total == 3
+    assert crud.pdf_document.search_summaries(
+        db, owner_id=user.id, store_name="REWE", skip=5
+    ) == ([], 3)
+    summary_cursor = None
+    while True:
+        summaries, summary_cursor, total = crud.pdf_document.search_summary_page(
+            db, owner_id=user.id, store_name="REWE", cursor=summary_cursor, limit=2
+        )
+        assert total == 3
+        if summary_cursor is None:
+            break
+
+    # Only the latest extraction of a document processed again matches
+    retried = documents[0]
+    assert retried.id
+    crud.extracted_data.create(
+        db, obj_in=ExtractedDataCreate(document_id=retried.id, store_name="EDEKA")
+    )
+    assert stores(store_name="rewe") == ["REWE Markt", "REWE City"]
+    assert stores(store_name="edeka") == ["EDEKA"]
+
+    for document in [*documents, other]:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_search_free_text(db: Session) -> None:
+    user = create_random_user(db)
+    receipts = [
+        ("EDEKA", [{"name": "BROT", "price": 2.49}], "Danke fuer Ihre Hafermilch"),
+        ("REWE", [{"name": "HAFERMILCH BIO", "price": 1.99}], None),
+        ("ALDI", [{"name": "VOLLMILCH", "price": 0.99}], "Vollmilch 3,5%"),
+    ]
+    documents = []
+    for store_name, items, raw_text in receipts:
+        document = create_random_document(db, owner_id=user.id)
+        assert document.id
+        crud.extracted_data.create(
+            db,
+            obj_in=ExtractedDataCreate(
+                document_id=document.id,
+                store_name=store_name,
+                items=items,
+                raw_text=raw_text,
+            ),
+        )
+        documents.append(document)
+
+    def stores(query: str, **filters: Any) -> list[str | None]:
+        found, total = crud.extracted_data.search(
+            db, owner_id=user.id, query=query, **filters
+        )
+        assert total == len(found)
+        return [data.store_name for data in found]
+
+    # Item names rank above the raw text, whatever the receipt dates
+    assert stores("Hafermilch") == ["REWE", "EDEKA"]
+    # Words are stemmed, and the query understands quotes, or and -word
+    assert stores("Brote") == ["EDEKA"]
+    assert stores("hafermilch -brot") == ["REWE"]
+    assert stores("brot or vollmilch") == ["ALDI", "EDEKA"]
+    assert stores("Hafermilch", store_name="edeka") == ["EDEKA"]
+    assert stores("Kaffee") == []
+
+    seen: list[str | None] = []
+    cursor = None
+    while True:
+        page, cursor, total = crud.extracted_data.search_page(
+            db, owner_id=user.id, query="hafermilch", cursor=cursor, limit=1
+        )
+        assert total == 2
+        seen.extend(data.store_name for data in page)
+        if cursor is None:
+            break
+    assert seen == ["REWE", "EDEKA"]
+
+    summaries, _ = crud.pdf_document.get_summary_page_by_owner(
+        db, owner_id=user.id, query="hafermilch"
+    )
+    assert [row.store_name for row in summaries] == ["REWE", "EDEKA"]
+
+    # Updates are indexed too
+    assert documents[2].id
+    data = crud.extracted_data.get_latest_by_document(db, document_id=documents[2].id)
+    assert data
+    crud.extracted_data.update(db, db_obj=data, obj_in={"store_name": "Hafer Shop"})
+    assert stores("hafer") == ["Hafer Shop"]
+
+    for document in documents:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_create_receipt_replaces_earlier_extraction(db: Session) -> None:
+    user = create_random_user(db)
+    document = create_random_document(db, owner_id=user.id)
+    assert document.id
+    suffix = random_lower_string()[:8]
+    product = crud.product.add(
+        db,
+        db_obj=Product(
+            name=f"Gouda{suffix}",
+            normalized_name=f"gouda{suffix}",
+            category=ProductCategory.DAIRY,
+        ),
+    )
+    obj_in = ExtractedDataCreate(
+        document_id=document.id, items=[{"name": product.name, "price": 2.49}]
+    )
+    first = crud.extracted_data.create(db, obj_in=obj_in)
+    product_catalog.invalidate()
+    product_integration.process_receipt_items(db, first, user.id)
+    assert crud.purchase_aggregate.get_category_spending(db, user_id=user.id)
+
+    # Processing the document again, e.g. after a crash, keeps one receipt
+    second = crud.extracted_data.create_receipt(
+        db, obj_in=obj_in, owner_id=user.id, replace=True
+    )
+    assert second.id
+    assert [
+        data.id
+        for data in crud.extracted_data.get_by_document(db, document_id=document.id)
+    ] == [second.id]
+    assert (
+        len(crud.receipt_line_item.get_by_receipt(db, extracted_data_id=second.id)) == 1
+    )
+    assert crud.product_purchase.get_by_user(db, user_id=user.id) == []
+    assert crud.purchase_aggregate.get_category_spending(db, user_id=user.id) == []
+
+    crud.pdf_document.remove(db, id=document.id)
+    crud.product.remove(db, id=product.id)
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, col, select
+
+from app.crud.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+from app.models import PDFDocument
+from app.tests.utils.pdf_document import create_random_document
+from app.tests.utils.user import create_random_user
+
+COLUMNS = [col(PDFDocument.created_at), col(PDFDocument.id)]
+
+
+def test_cursor_round_trip() -> None:
+    created_at = datetime(2026, 10, 17, 9, 30, 15, 123456)
+    cursor = encode_cursor([created_at, 42])
+    assert decode_cursor(cursor, COLUMNS) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1]), "W10"])
+def test_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, COLUMNS)
+
+
+def test_paginate_breaks_ties_on_id(db: Session) -> None:
+    user = create_random_user(db)
+    documents = [create_random_document(db, owner_id=user.id) for _ in range(5)]
+    # Identical timestamps must neither skip nor repeat rows across pages
+    created_at = datetime(2026, 1, 1)
+    for document in documents:
+        document.created_at = created_at
+        db.add(document)
+    db.commit()
+
+    statement = select(PDFDocument).where(PDFDocument.owner_id == user.id)
+    seen: list[int | None] = []
+    cursor = None
+    while True:
+        page, cursor = paginate(db, statement, columns=COLUMNS, cursor=cursor, limit=2)
+        seen.extend(document.id for document in page)
+        if cursor is None:
+            break
+
+    ids = [document.id for document in documents if document.id is not None]
+    assert seen == sorted(ids, reverse=True)
+
+    for document in documents:
+        db.delete(document)
+    db.delete(user)
+    db.commit()
@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app import crud
+from app.crud.crud_processing_job import ABANDONED_ERROR
+from app.models import JobStatus, ProcessingJob
+from app.tests.utils.pdf_document import create_random_document
+
+
+def test_enqueue_returns_active_job(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+    again = crud.processing_job.enqueue(db, document_id=document.id)
+    assert job.id == again.id
+    assert job.status == JobStatus.PENDING
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_enqueue_many_counts_only_new_jobs(db: Session) -> None:
+    documents = [create_random_document(db) for _ in range(3)]
+    document_ids = [document.id for document in documents if document.id]
+    crud.processing_job.enqueue(db, document_id=document_ids[0])
+
+    queued = crud.processing_job.enqueue_many(db, document_ids=document_ids)
+    assert queued == 2
+    assert crud.processing_job.enqueue_many(db, document_ids=document_ids) == 0
+    for document_id in document_ids:
+        assert crud.processing_job.get_active_by_document(db, document_id=document_id)
+
+    for document in documents:
+        crud.pdf_document.remove(db, id=document.id)
+
+
+def test_document_has_one_active_job(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+
+    db.add(ProcessingJob(document_id=document.id))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+    # Finished jobs do not count, the document can be queued again
+    db.refresh(job)
+    job.status = JobStatus.FAILED
+    db.add(job)
+    db.commit()
+    again = crud.processing_job.enqueue(db, document_id=document.id)
+    assert again.id != job.id
+    assert again.status == JobStatus.PENDING
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_claim_locks_job_for_one_worker(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+
+    claimed = crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+    assert job.id in [claimed_job.id for claimed_job in claimed]
+    db.refresh(job)
+    assert job.status == JobStatus.RUNNING
+    assert job.attempts == 1
+    assert job.locked_by == "worker-1"
+    assert job.locked_until and job.locked_until > datetime.utcnow()
+
+    # Still locked, so another worker does not get it
+    claimed = crud.processing_job.claim(db, worker_id="worker-2", limit=100)
+    assert job.id not in [claimed_job.id for claimed_job in claimed]
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_claim_reclaims_expired_job(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+    crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+
+    db.refresh(job)
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.add(job)
+    db.commit()
+
+    claimed = crud.processing_job.claim(db, worker_id="worker-2", limit=100)
+    assert job.id in [claimed_job.id for claimed_job in claimed]
+    db.refresh(job)
+    assert job.locked_by == "worker-2"
+    assert job.attempts == 2
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_claim_fails_expired_job_without_attempts_left(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+    job.max_attempts = 1
+    db.add(job)
+    db.commit()
+    crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+
+    db.refresh(job)
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.add(job)
+    db.commit()
+
+    claimed = crud.processing_job.claim(db, worker_id="worker-2", limit=100)
+    assert job.id not in [claimed_job.id for claimed_job in claimed]
+    db.refresh(job)
+    assert job.status == JobStatus.FAILED
+    assert job.locked_by == "worker-1"
+    assert job.last_error == ABANDONED_ERROR
+    db.refresh(document)
+    assert document.processed
+    assert document.processing_error == ABANDONED_ERROR
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_finishing_needs_the_current_lease(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+    crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+    db.refresh(job)
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.add(job)
+    db.commit()
+    crud.processing_job.claim(db, worker_id="worker-2", limit=100)
+
+    # worker-1 lost the job to worker-2, its result is discarded
+    db.refresh(job)
+    assert crud.processing_job.complete(db, job=job, worker_id="worker-1") is None
+    assert (
+        crud.processing_job.fail(db, job=job, worker_id="worker-1", error="x") is None
+    )
+    db.refresh(job)
+    assert job.status == JobStatus.RUNNING
+
+    finished = crud.processing_job.complete(db, job=job, worker_id="worker-2")
+    assert finished is not None
+    assert finished.status == JobStatus.SUCCEEDED
+    assert finished.locked_until is None
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_fail_retries_with_backoff_then_gives_up(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    job = crud.processing_job.enqueue(db, document_id=document.id)
+    job.max_attempts = 2
+    db.add(job)
+    db.commit()
+
+    crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+    db.refresh(job)
+    failed = crud.processing_job.fail(db, job=job, worker_id="worker-1", error="boom")
+    assert failed is not None
+    job = failed
+    assert job.status == JobStatus.PENDING
+    assert job.run_after > datetime.utcnow()
+    assert job.last_error == "boom"
+
+    # Not due yet
+    claimed = crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+    assert job.id not in [claimed_job.id for claimed_job in claimed]
+
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    db.add(job)
+    db.commit()
+    crud.processing_job.claim(db, worker_id="worker-1", limit=100)
+    db.refresh(job)
+    failed = crud.processing_job.fail(
+        db, job=job, worker_id="worker-1", error="boom again"
+    )
+    assert failed is not None
+    job = failed
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 2
+    crud.pdf_document.remove(db, id=document.id)
+
+
+def test_get_unprocessed_skips_documents_with_active_job(db: Session) -> None:
+    queued = create_random_document(db)
+    orphan = create_random_document(db)
+    assert queued.id and orphan.id
+    crud.processing_job.enqueue(db, document_id=queued.id)
+
+    unprocessed = crud.pdf_document.get_unprocessed(db, limit=1000)
+    ids = [document.id for document in unprocessed]
+    assert orphan.id in ids
+    assert queued.id not in ids
+    crud.pdf_document.remove(db, id=queued.id)
+    crud.pdf_document.remove(db, id=orphan.id)
@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlmodel import Session, col, delete, select
+
+from app import crud
+from app.models import (
+    ExtractedDataCreate,
+    Product,
+    ProductCategory,
+    ProductPurchase,
+    UserCategorySpending,
+    UserProductSpending,
+)
+from app.tests.utils.pdf_document import create_random_document
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def _aggregates(db: Session, user_id: uuid.UUID) -> tuple[list[Any], list[Any]]:
+    categories = db.exec(
+        select(
+            UserCategorySpending.category,
+            UserCategorySpending.month,
+            UserCategorySpending.purchase_count,
+            UserCategorySpending.total_spent,
+        ).where(UserCategorySpending.user_id == user_id)
+    ).all()
+    products = db.exec(
+        select(
+            UserProductSpending.product_id,
+            UserProductSpending.purchase_count,
+            UserProductSpending.total_spent,
+            UserProductSpending.last_purchase_date,
+        ).where(UserProductSpending.user_id == user_id)
+    ).all()
+    # Enums sort by declaration order on Postgres, compare by value instead
+    return (
+        sorted(categories, key=lambda row: (row[0].value, row[1])),
+        sorted(products),
+    )
+
+
+def test_aggregates_follow_purchase_writes(db: Session) -> None:
+    user = create_random_user(db)
+    document = create_random_document(db, owner_id=user.id)
+    assert document.id
+    extracted_data = crud.extracted_data.create(
+        db, obj_in=ExtractedDataCreate(document_id=document.id)
+    )
+    suffix = random_lower_string()[:8]
+    milk, water = (
+        crud.product.add(
+            db,
+            db_obj=Product(
+                name=f"{name}{suffix}",
+                normalized_name=f"{name.lower()}{suffix}",
+                category=category,
+            ),
+        )
+        for name, category in [
+            ("Milch", ProductCategory.DAIRY),
+            ("Wasser", ProductCategory.BEVERAGES),
+        ]
+    )
+
+    def purchase(product: Product, price: float, date: datetime) -> dict[str, Any]:
+        return {
+            "product_id": product.id,
+            "extracted_data_id": extracted_data.id,
+            "user_id": user.id,
+            "receipt_item_name": product.name,
+            "unit_price": price,
+            "total_price": price,
+            "purchase_date": date,
+        }
+
+    crud.product_purchase.create_many(
+        db,
+        purchases=[
+            purchase(milk, 1.0, datetime(2026, 1, 5)),
+            purchase(milk, 2.0, datetime(2026, 2, 7)),
+            purchase(water, 4.0, datetime(2026, 2, 9)),
+        ],
+    )
+    db.commit()
+    crud.product_purchase.create_purchase(
+        db, purchase_data=purchase(milk, 0.5, datetime(2026, 2, 20))
+    )
+
+    assert crud.purchase_aggregate.get_category_spending(db, user_id=user.id) == [
+        (ProductCategory.BEVERAGES, 1, 4.0),
+        (ProductCategory.DAIRY, 3, 3.5),
+    ]
+    frequent = crud.purchase_aggregate.get_frequent_products(db, user_id=user.id)
+    assert [(p.id, s.purchase_count, s.total_spent) for p, s in frequent] == [
+        (milk.id, 3, 3.5),
+        (water.id, 1, 4.0),
+    ]
+    assert frequent[0][1].last_purchase_date == datetime(2026, 2, 20)
+    categories, products = _aggregates(db, user.id)
+    assert [(c, m.month, n) for c, m, n, _ in categories] == [
+        (ProductCategory.BEVERAGES, 2, 1),
+        (ProductCategory.DAIRY, 1, 1),
+        (ProductCategory.DAIRY, 2, 2),
+    ]
+
+    # Maintained incrementally, equal to a rebuild from scratch
+    crud.purchase_aggregate.rebuild(db)
+    db.commit()
+    assert _aggregates(db, user.id) == (categories, products)
+
+    crud.product.update(db, db_obj=water, obj_in={"category": ProductCategory.DAIRY})
+    assert crud.purchase_aggregate.get_category_spending(db, user_id=user.id) == [
+        (ProductCategory.DAIRY, 4, 7.5)
+    ]
+
+    crud.product.merge_many(db, merges={water.id: milk.id})
+    frequent = crud.purchase_aggregate.get_frequent_products(db, user_id=user.id)
+    assert [(p.id, s.purchase_count, s.total_spent) for p, s in frequent] == [
+        (milk.id, 4, 7.5)
+    ]
+
+    db.execute(delete(ProductPurchase).where(col(ProductPurchase.user_id) == user.id))
+    for table in (UserCategorySpending, UserProductSpending):
+        db.execute(delete(table).where(col(table.user_id) == user.id))
+    db.commit()
+    for alias in crud.product_alias.get_by_product(db, product_id=milk.id):
+        crud.product_alias.remove(db, id=alias.id)
+    crud.product.remove(db, id=milk.id)
+    crud.pdf_document.remove(db, id=document.id)
@@ -0,0 +1,167 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlmodel import Session, col, delete
+
+from app import crud
+from app.models import (
+    ExtractedDataCreate,
+    Product,
+    ProductCategory,
+    ProductPurchase,
+    UserCategorySpending,
+    UserProductSpending,
+)
+from app.services.product_catalog import product_catalog
+from app.services.product_integration import product_integration
+from app.tests.utils.pdf_document import create_random_document
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def test_line_items_follow_the_receipt(db: Session) -> None:
+    user = create_random_user(db)
+    document, duplicate = (
+        create_random_document(db, owner_id=user.id) for _ in range(2)
+    )
+    assert document.id and duplicate.id
+    suffix = random_lower_string()[:8].upper()
+    milk, pfand = f"MILCH {suffix}", f"PFAND {suffix}"
+    extracted_data = crud.extracted_data.create_receipt(
+        db,
+        obj_in=ExtractedDataCreate(
+            document_id=document.id,
+            transaction_date=date(2026, 3, 9),
+            items=[
+                {
+                    "name": milk,
+                    "price": 0.89,
+                    "quantity": 1,
+                    "tax_code": "B",
+                    "unit_type": "pieces",
+                    "is_discount": False,
+                    "original_price": 1.19,
+                    "discount_amount": 0.3,
+                },
+                {"name": "", "price": 1.0},
+                {"name": f"BROT {suffix}", "price": "n/a"},
+                {
+                    "name": pfand,
+                    "price": 0.25,
+                    "quantity": 1,
+                    # Longer than the columns, cut instead of failing the save
+                    "tax_code": "A 19% MwSt",
+                    "unit_type": "deposit (reusable glass)",
+                    "is_discount": False,
+                },
+            ],
+        ),
+        owner_id=user.id,
+    )
+    assert extracted_data.id
+
+    lines = crud.receipt_line_item.get_by_receipt(
+        db, extracted_data_id=extracted_data.id
+    )
+    # Lines keep their position in items, invalid items are left out
+    assert [(line.line_index, line.name) for line in lines] == [
+        (0, milk),
+        (3, pfand),
+    ]
+    assert lines[0].owner_id == user.id
+    assert lines[0].transaction_date == date(2026, 3, 9)
+    assert lines[0].price == Decimal("0.89")
+    assert lines[0].original_price == Decimal("1.19")
+    assert lines[0].discount_amount == Decimal("0.3")
+    assert (lines[1].tax_code, lines[1].unit_type) == (
+        "A 19% Mw",
+        "deposit (reusable gl",
+    )
+    assert lines[1].original_price is None
+
+    # Matched items link their line to the product
+    product_catalog.invalidate()
+    product_catalog.ensure_loaded(db)
+    results = product_integration.process_receipt_items(db, extracted_data, user.id)
+    products = {item["item_name"]: item["product"] for item in results["matched_items"]}
+    db.expire_all()
+    lines = crud.receipt_line_item.get_by_receipt(
+        db, extracted_data_id=extracted_data.id
+    )
+    assert [line.product_id for line in lines] == [
+        products[milk].id,
+        products[pfand].id,
+    ]
+
+    # A reused extraction gets its own copy of the lines
+    copy = crud.extracted_data.copy_to_document(
+        db, source=extracted_data, document_id=duplicate.id
+    )
+    assert copy.id
+    copied = crud.receipt_line_item.get_by_receipt(db, extracted_data_id=copy.id)
+    assert [(line.line_index, line.product_id) for line in copied] == [
+        (line.line_index, line.product_id) for line in lines
+    ]
+
+    history = crud.receipt_line_item.get_by_name(db, owner_id=user.id, name=milk)
+    assert [line.extracted_data_id for line in history] == [
+        extracted_data.id,
+        copy.id,
+    ]
+    assert not crud.receipt_line_item.get_by_name(
+        db, owner_id=user.id, name=milk, start_date=date(2026, 3, 10)
+    )
+
+    # Deleting a document deletes the lines of its receipts
+    crud.pdf_document.remove(db, id=duplicate.id)
+    assert not crud.receipt_line_item.get_by_receipt(db, extracted_data_id=copy.id)
+
+    db.execute(delete(ProductPurchase).where(col(ProductPurchase.user_id) == user.id))
+    for table in (UserCategorySpending, UserProductSpending):
+        db.execute(delete(table).where(col(table.user_id) == user.id))
+    db.commit()
+    crud.pdf_document.remove(db, id=document.id)
+    for product in products.values():
+        crud.product.remove(db, id=product.id)
+
+
+def test_merged_products_keep_their_lines(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    suffix = random_lower_string()[:8]
+    source, target = (
+        crud.product.add(
+            db,
+            db_obj=Product(
+                name=f"{name}{suffix}",
+                normalized_name=f"{name}{suffix}",
+                category=ProductCategory.DAIRY,
+            ),
+        )
+        for name in ("gouda", "goudakaese")
+    )
+    extracted_data = crud.extracted_data.create_receipt(
+        db,
+        obj_in=ExtractedDataCreate(
+            document_id=document.id, items=[{"name": source.name, "price": 2.49}]
+        ),
+        owner_id=document.owner_id,
+    )
+    assert extracted_data.id
+    crud.receipt_line_item.link_products(
+        db, extracted_data_id=extracted_data.id, product_ids={0: source.id}
+    )
+    db.commit()
+
+    crud.product.merge_many(db, merges={source.id: target.id})
+
+    db.expire_all()
+    [line] = crud.receipt_line_item.get_by_receipt(
+        db, extracted_data_id=extracted_data.id
+    )
+    assert line.product_id == target.id
+
+    crud.pdf_document.remove(db, id=document.id)
+    for alias in crud.product_alias.get_by_product(db, product_id=target.id):
+        crud.product_alias.remove(db, id=alias.id)
+    crud.product.remove(db, id=target.id)
@@ -0,0 +1,75 @@
+import random
+import re
+
+from app.models.product import ProductCategory
+from app.services.category_classifier import (
+    CATEGORY_KEYWORDS,
+    HEAD_WEIGHT,
+    MODIFIER_WEIGHT,
+    CategoryClassifier,
+)
+
+classifier = CategoryClassifier(CATEGORY_KEYWORDS)
+
+
+def test_scores_compound_words() -> None:
+    assert classifier.predict("bio banane") == ProductCategory.FRUITS
+    assert classifier.predict("vollmilch 3 5") == ProductCategory.DAIRY
+    assert classifier.predict("xyz") == ProductCategory.OTHER
+
+    ranked = classifier.classify("Apfelsaft naturtrüb")
+    assert ranked[0] == (ProductCategory.BEVERAGES, 1.0 + HEAD_WEIGHT)
+    assert ranked[1] == (ProductCategory.FRUITS, MODIFIER_WEIGHT)
+    # Keywords in the middle of a word do not count
+    assert classifier.classify("spreisel") == []
+
+
+def test_ties_follow_table_order() -> None:
+    # "keks" is both a bakery and a snack keyword
+    assert classifier.predict("keks") == ProductCategory.BAKERY
+
+
+def test_matches_brute_force_scan() -> None:
+    random.seed(1)
+    alphabet = "abcdeä"
+    categories = list(ProductCategory)
+    keywords = {
+        "".join(random.choices(alphabet, k=random.randint(1, 5))): random.choice(
+            categories
+        )
+        for _ in range(300)
+    }
+    automaton = CategoryClassifier()
+    for keyword, category in keywords.items():
+        automaton.add_keyword(keyword, category)
+
+    for _ in range(200):
+        text = " ".join(
+            "".join(random.choices(alphabet, k=random.randint(1, 8)))
+            for _ in range(random.randint(1, 4))
+        )
+        expected: dict[ProductCategory, float] = {}
+        for keyword, category in keywords.items():
+            for match in re.finditer(f"(?={re.escape(keyword)})", text):
+                start, end = match.start(), match.start() + len(keyword)
+                starts_word = start == 0 or text[start - 1] == " "
+                ends_word = end == len(text) or text[end] == " "
+                factor = {
+                    (True, True): 1.0,
+                    (False, True): HEAD_WEIGHT,
+                    (True, False): MODIFIER_WEIGHT,
+                }.get((starts_word, ends_word))
+                if factor:
+                    expected[category] = expected.get(category, 0.0) + factor
+        result = dict(automaton.classify(text))
+        assert result.keys() == expected.keys(), text
+        for category, score in expected.items():
+            assert abs(result[category] - score) < 1e-9, text
+
+
+def test_keywords_can_be_added_later() -> None:
+    extended = CategoryClassifier(CATEGORY_KEYWORDS)
+    assert extended.predict("kombucha") == ProductCategory.OTHER
+    extended.add_keyword("Kombucha", ProductCategory.BEVERAGES)
+    assert extended.predict("kombucha ingwer") == ProductCategory.BEVERAGES
+    assert extended.predict("bio banane") == ProductCategory.FRUITS
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.extraction_engine import (
+    ExtractionEngine,
+    ExtractionQueueFullError,
+    ExtractionTimeoutError,
+)
+
+
+def _double(value: int) -> int:
+    return value * 2
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _make_engine(
+    max_pending: int = 4, timeout: float = 10.0, max_tasks_per_child: int = 2
+) -> ExtractionEngine:
+    return ExtractionEngine(
+        max_workers=1,
+        max_tasks_per_child=max_tasks_per_child,
+        max_pending=max_pending,
+        timeout=timeout,
+    )
+
+
+def test_run_returns_result() -> None:
+    engine = _make_engine()
+    try:
+        results = [asyncio.run(engine.run(_double, value)) for value in range(3)]
+    finally:
+        engine.shutdown()
+
+    # Three jobs with max_tasks_per_child=2 forces a worker to be recycled
+    assert results == [0, 2, 4]
+    assert engine.pending == 0
+
+
+def test_submit_rejects_when_queue_is_full() -> None:
+    engine = _make_engine(max_pending=1)
+    try:
+        future = engine.submit(_sleep, 0.5)
+        assert engine.saturated
+        with pytest.raises(ExtractionQueueFullError):
+            engine.submit(_sleep, 0.5)
+        assert future.result(timeout=30) == 0.5
+    finally:
+        engine.shutdown()
+
+
+def test_run_times_out() -> None:
+    engine = _make_engine(timeout=0.2)
+    try:
+        with pytest.raises(ExtractionTimeoutError):
+            asyncio.run(engine.run(_sleep, 2))
+    finally:
+        engine.shutdown()
+
+
+def test_timed_out_job_frees_its_worker() -> None:
+    # Long enough for a new worker process to start
+    engine = _make_engine(timeout=3)
+    try:
+        with pytest.raises(ExtractionTimeoutError):
+            asyncio.run(engine.run(_sleep, 60))
+        # The hung worker was killed, the only worker slot is free again
+        assert asyncio.run(engine.run(_double, 21)) == 42
+        assert engine.pending == 0
+    finally:
+        engine.shutdown()
+
+
+def test_timeout_starts_when_the_job_runs() -> None:
+    engine = _make_engine(timeout=1.5, max_tasks_per_child=10)
+
+    async def run_both() -> list[float]:
+        # The second job waits for the only worker longer than the timeout
+        return list(await asyncio.gather(engine.run(_sleep, 1), engine.run(_sleep, 1)))
+
+    try:
+        # Start the worker first, its start-up counts towards the first job
+        assert asyncio.run(engine.run(_double, 1)) == 2
+        assert asyncio.run(run_both()) == [1, 1]
+    finally:
+        engine.shutdown()
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def test_run_replaces_a_broken_pool() -> None:
+    engine = _make_engine()
+    try:
+        with pytest.raises(BrokenProcessPool):
+            asyncio.run(engine.run(_crash))
+        # The next job gets a new pool instead of the broken one
+        assert asyncio.run(engine.run(_double, 21)) == 42
+        assert engine.pending == 0
+    finally:
+        engine.shutdown()
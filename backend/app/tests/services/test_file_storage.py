@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from app.services.file_storage import FileStorageService
+
+
+def _upload(content: bytes, filename: str = "receipt.pdf") -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        filename=filename,
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+
+
+@pytest.fixture()
+def storage(tmp_path: Path) -> FileStorageService:
+    service = FileStorageService(upload_dir=str(tmp_path / "uploads"))
+    service.CHUNK_SIZE = 16
+    return service
+
+
+def _leftover_temp_files(storage: FileStorageService) -> list[Path]:
+    return list(storage.pdf_dir.glob(".upload-*"))
+
+
+def test_save_file_streams_to_content_addressed_path(
+    storage: FileStorageService,
+) -> None:
+    content = b"%PDF-1.4\n" + b"x" * 100
+    stored = asyncio.run(storage.save_file(_upload(content)))
+
+    content_hash = hashlib.sha256(content).hexdigest()
+    assert stored.content_hash == content_hash
+    assert stored.file_size == len(content)
+    assert Path(stored.file_path) == storage.content_path(content_hash)
+    # Nothing is visible at the path until the upload is placed
+    assert not Path(stored.file_path).exists()
+    storage.place(stored)
+    assert Path(stored.file_path).read_bytes() == content
+    assert not _leftover_temp_files(storage)
+
+    # Same content again maps to the same file
+    again = asyncio.run(storage.save_file(_upload(content)))
+    assert again.file_path == stored.file_path
+    storage.place(again)
+    assert not _leftover_temp_files(storage)
+
+    # Dropped uploads leave nothing behind
+    other = asyncio.run(storage.save_file(_upload(content + b"y")))
+    storage.discard(other)
+    assert not Path(other.file_path).exists()
+    assert not _leftover_temp_files(storage)
+
+
+def test_save_file_rejects_missing_pdf_magic(storage: FileStorageService) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(storage.save_file(_upload(b"not a pdf at all")))
+    assert exc_info.value.status_code == 400
+    assert not _leftover_temp_files(storage)
+
+
+def test_save_file_enforces_size_limit_while_streaming(
+    storage: FileStorageService,
+) -> None:
+    storage.MAX_FILE_SIZE = 64
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(storage.save_file(_upload(b"%PDF-1.4\n" + b"x" * 200)))
+    assert exc_info.value.status_code == 413
+    assert not _leftover_temp_files(storage)
+
+
+def test_save_file_rejects_wrong_extension(storage: FileStorageService) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(storage.save_file(_upload(b"%PDF-1.4\n", filename="receipt.txt")))
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,130 @@
+from collections.abc import Generator
+
+import pytest
+from sqlmodel import Session
+
+from app import crud
+from app.models.product import Product, ProductCategory
+from app.services.product_catalog import (
+    ProductCatalogIndex,
+    product_catalog,
+    trigram_similarity,
+    trigrams,
+)
+from app.services.product_matcher import product_matcher
+from app.tests.utils.utils import count_queries, random_lower_string
+
+
+@pytest.fixture
+def catalog(db: Session) -> Generator[list[Product]]:
+    suffix = random_lower_string()[:8]
+    products = [
+        crud.product.add(
+            db,
+            db_obj=Product(
+                name=name,
+                normalized_name=name.lower(),
+                category=category,
+            ),
+        )
+        for name, category in [
+            (f"Vollmilch{suffix} 3,5%", ProductCategory.DAIRY),
+            (f"Bio Banane{suffix}", ProductCategory.FRUITS),
+        ]
+    ]
+    product_catalog.invalidate()
+    product_catalog.ensure_loaded(db)
+    yield products
+    for product in products:
+        crud.product.remove(db, id=product.id)
+
+
+def test_match_needs_no_queries(db: Session, catalog: list[Product]) -> None:
+    milk, banana = catalog
+    with count_queries() as statements:
+        exact, exact_confidence = product_matcher.find_best_match(db, banana.name)
+        similar, _ = product_matcher.find_best_match(
+            db, f"{milk.name.split()[0]} milch", confidence_threshold=0.3
+        )
+    assert statements == []
+    assert exact is not None and exact.id == banana.id
+    assert exact_confidence == 1.0
+    assert similar is not None and similar.id == milk.id
+    # Matches are usable as regular session objects
+    assert exact in db
+
+
+def test_alias_match(db: Session, catalog: list[Product]) -> None:
+    _, banana = catalog
+    alias_name = f"BANANEN{random_lower_string()[:8]}"
+    alias = crud.product_alias.create_alias(
+        db, product_id=banana.id, alias_name=alias_name
+    )
+
+    match, confidence = product_matcher.find_best_match(db, alias_name)
+    assert match is not None and match.id == banana.id
+    assert confidence == 0.95
+
+    crud.product_alias.remove(db, id=alias.id)
+    match, _ = product_matcher.find_best_match(db, alias_name)
+    assert match is None
+
+
+def test_index_follows_crud_writes(db: Session, catalog: list[Product]) -> None:
+    milk, _ = catalog
+    renamed = f"Hafermilch{random_lower_string()[:8]}"
+    crud.product.update(
+        db, db_obj=milk, obj_in={"name": renamed, "normalized_name": renamed.lower()}
+    )
+    assert product_catalog.get_by_normalized_name(renamed.lower()) is not None
+
+    created = product_matcher.create_product_from_item(
+        db, item_name=f"Apfel{random_lower_string()[:8]}", price=1.0
+    )
+    match, confidence = product_matcher.find_best_match(db, created.name)
+    assert match is not None and match.id == created.id
+    assert confidence == 1.0
+
+    crud.product.remove(db, id=created.id)
+    assert product_catalog.get_by_normalized_name(created.normalized_name) is None
+
+
+def test_trigrams_match_pg_trgm() -> None:
+    assert trigrams("Ei") == {"  e", " ei", "ei "}
+    assert trigrams("KÄSE, gerieben") == trigrams("käse gerieben")
+    assert trigram_similarity(trigrams("milch"), trigrams("milch")) == 1.0
+    assert trigram_similarity(trigrams("milch"), frozenset()) == 0.0
+
+
+def test_top_k_ranks_by_similarity(db: Session) -> None:
+    index = ProductCatalogIndex(refresh_interval=300)
+    index.load(db)
+    names = ["vollmilch 3 5", "fettarme milch 1 5", "milchbroetchen", "ja vollmilch"]
+    names += [f"artikel {i}" for i in range(2000)]
+    # Synthetic products that only live in this index
+    first_id = 10**9
+    for offset, name in enumerate(names):
+        index.add_product(
+            Product(
+                id=first_id + offset,
+                name=name,
+                normalized_name=name,
+                category=ProductCategory.DAIRY,
+            )
+        )
+
+    # An abbreviated word still finds the product
+    results = index.top_k("vollm 3 5", k=2)
+    assert results[0][0].name == "vollmilch 3 5"
+
+    # Prefix filtering must not lose anything a full scan would find
+    cases = [("vollmilch", 0.3), ("milch", 0.1), ("artikel 7", 0.5)]
+    for query, min_similarity in cases:
+        all_scores = [trigram_similarity(trigrams(query), trigrams(n)) for n in names]
+        expected = sorted(
+            (score for score in all_scores if score >= min_similarity), reverse=True
+        )[:5]
+        results = index.top_k(query, k=5, min_similarity=min_similarity)
+        assert [score for _, score in results] == expected
+
+    assert index.top_k("vollmilch", category=ProductCategory.FRUITS) == []
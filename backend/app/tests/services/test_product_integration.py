@@ -0,0 +1,83 @@
+from sqlmodel import Session, col, delete
+
+from app import crud
+from app.models import ExtractedDataCreate
+from app.models.product import Product, ProductCategory, ProductPurchase
+from app.services.product_catalog import product_catalog
+from app.services.product_integration import product_integration
+from app.tests.utils.pdf_document import create_random_document
+from app.tests.utils.utils import count_queries, random_lower_string
+
+
+def test_receipt_items_are_stored_in_one_batch(db: Session) -> None:
+    document = create_random_document(db)
+    assert document.id
+    suffix = random_lower_string()[:8]
+    known = crud.product.add(
+        db,
+        db_obj=Product(
+            name=f"Gouda{suffix}",
+            normalized_name=f"gouda{suffix}",
+            category=ProductCategory.DAIRY,
+        ),
+    )
+    new_name = f"Wasser{suffix}"
+    extracted_data = crud.extracted_data.create(
+        db,
+        obj_in=ExtractedDataCreate(
+            document_id=document.id,
+            items=[
+                {"name": known.name, "price": 2.49},
+                {"name": new_name, "price": 0.99},
+                {"name": new_name.upper(), "price": 0.99},
+                {"name": "", "price": 1.0},
+                {"name": f"Brot{suffix}", "price": "n/a"},
+            ],
+        ),
+    )
+    product_catalog.invalidate()
+    product_catalog.ensure_loaded(db)
+
+    with count_queries() as statements:
+        results = product_integration.process_receipt_items(
+            db, extracted_data, document.owner_id
+        )
+    inserts = [
+        statement.split(" (")[0]
+        for statement in statements
+        if statement.startswith("INSERT")
+    ]
+    # One statement creates the new products; the purchases are inserted
+    # with one executemany (a single statement on Postgres) and added to
+    # each spending aggregate with one statement
+    assert inserts.count("INSERT INTO product") == 1
+    assert inserts.count("INSERT INTO usercategoryspending") == 1
+    assert inserts.count("INSERT INTO userproductspending") == 1
+    assert set(inserts) == {
+        "INSERT INTO product",
+        "INSERT INTO productpurchase",
+        "INSERT INTO usercategoryspending",
+        "INSERT INTO userproductspending",
+    }
+
+    assert results["total_items"] == 5
+    assert len(results["matched_items"]) == 3
+    assert len(results["created_purchases"]) == 3
+    assert [product.name for product in results["created_products"]] == [new_name]
+    assert results["matched_items"][0]["product"].id == known.id
+    assert results["matched_items"][0]["confidence"] == 1.0
+    errors = [item.get("error") for item in results["unmatched_items"]]
+    assert errors[0] == "Missing item name"
+    assert errors[1]
+
+    created = results["created_products"][0]
+    assert product_catalog.get_by_normalized_name(created.normalized_name)
+    purchase_ids = [purchase.id for purchase in results["created_purchases"]]
+    assert None not in purchase_ids
+
+    db.execute(delete(ProductPurchase).where(col(ProductPurchase.id).in_(purchase_ids)))
+    crud.purchase_aggregate.refresh_users(db, user_ids=[document.owner_id])
+    db.commit()
+    crud.product.remove(db, id=created.id)
+    crud.product.remove(db, id=known.id)
+    crud.pdf_document.remove(db, id=document.id)
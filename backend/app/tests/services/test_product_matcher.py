@@ -0,0 +1,19 @@
+from app.models.product import ProductCategory
+from app.services.product_matcher import ProductMatcher
+
+
+def test_repeated_names_are_served_from_cache() -> None:
+    matcher = ProductMatcher()
+    for _ in range(3):
+        assert matcher.predict_category("Bio Banane") == ProductCategory.FRUITS
+        assert matcher.predict_category("xyz") == ProductCategory.OTHER
+        assert matcher.extract_quantity_and_unit("Milch 1,5 l") == (1.5, "l")
+        assert matcher.normalize_product_name("Die Milch, 3,5%") == "milch 3 5"
+
+    stats = matcher.cache_stats()
+    assert stats["predict_category"]["misses"] == 2
+    assert stats["predict_category"]["hits"] == 4
+    assert stats["extract_quantity_and_unit"]["hit_rate"] == 2 / 3
+
+    matcher.clear_caches()
+    assert matcher.cache_stats()["predict_category"]["size"] == 0
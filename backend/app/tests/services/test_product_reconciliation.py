@@ -0,0 +1,83 @@
+import numpy as np
+from sqlmodel import Session
+
+from app import crud
+from app.models.product import Product, ProductCategory
+from app.services.product_catalog import product_catalog
+from app.services.product_matcher import RECEIPT_AUTO_SOURCE
+from app.services.product_reconciliation import (
+    encode_names,
+    product_reconciliation,
+    top_k_neighbors,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+def test_top_k_neighbors_match_dense_cosine() -> None:
+    names = ["vollmilch 3 5", "vollmilch 3 5 bio", "vollmich 3 5", "gouda jung"]
+    names += [f"artikel {i}" for i in range(50)]
+    vectors = encode_names(names)
+    dense = vectors.toarray()
+    assert np.allclose(np.linalg.norm(dense, axis=1), 1.0)
+
+    similarities = dense @ dense.T
+    neighbors = list(
+        top_k_neighbors(vectors, rows=[0, 3, 10], k=2, min_similarity=0.5, block_size=2)
+    )
+    expected = []
+    for row in (0, 3, 10):
+        scores = [(similarities[row, other], other) for other in range(len(names))]
+        best = sorted(
+            (score, other) for score, other in scores if other != row and score >= 0.5
+        )[::-1][:2]
+        expected += [(row, other, score) for score, other in best]
+    assert [(row, other) for row, other, _ in neighbors] == [
+        (row, other) for row, other, _ in expected
+    ]
+    assert np.allclose([s for *_, s in neighbors], [s for *_, s in expected])
+
+
+def test_duplicates_are_merged(db: Session) -> None:
+    suffix = random_lower_string()[:8]
+
+    def add(name: str, data_source: str | None) -> Product:
+        return crud.product.add(
+            db,
+            db_obj=Product(
+                name=name,
+                normalized_name=name,
+                category=ProductCategory.DAIRY,
+                data_source=data_source,
+            ),
+        )
+
+    manual = add(f"vollmilch{suffix} 3 5", "manual")
+    typo = add(f"vollmich{suffix} 3 5", RECEIPT_AUTO_SOURCE)
+    older = add(f"gouda{suffix} jung geschnitten", RECEIPT_AUTO_SOURCE)
+    newer = add(f"gouda{suffix} jung geschniten", RECEIPT_AUTO_SOURCE)
+    other = add(f"joghurt{suffix} natur", RECEIPT_AUTO_SOURCE)
+    product_catalog.invalidate()
+    product_catalog.ensure_loaded(db)
+
+    candidates = product_reconciliation.find_merge_candidates(db, min_similarity=0.6)
+    ours = {
+        candidate.source_id: candidate.target_id
+        for candidate in candidates
+        if candidate.source_id in {typo.id, older.id, newer.id, other.id}
+    }
+    assert ours == {typo.id: manual.id, newer.id: older.id}
+
+    removed = product_reconciliation.merge(
+        db, [c for c in candidates if c.source_id in ours]
+    )
+    assert removed == 2
+    assert crud.product.get(db, id=typo.id) is None
+    aliases = crud.product_alias.get_by_product(db, product_id=manual.id)
+    assert [alias.normalized_alias for alias in aliases] == [typo.normalized_name]
+    match = product_catalog.find_by_alias(typo.normalized_name)
+    assert match is not None and match.id == manual.id
+
+    for product in (manual, older, other):
+        for alias in crud.product_alias.get_by_product(db, product_id=product.id):
+            crud.product_alias.remove(db, id=alias.id)
+        crud.product.remove(db, id=product.id)
@@ -0,0 +1,61 @@
+from app.services.pdf_processor import pdf_processor
+from app.services.receipt_lexer import LineKind, tokenize_receipt
+
+RECEIPT = """REWE Markt GmbH
+Hochzoller Str. 12
+86163 Augsburg
+Tel.: +49 821 123456
+EUR
+HAFERMILCH BARISTA 2,49 B
+PFAND 0,25 A
+KAESE GOUDA 2,99 B
+--------------------------------------
+SUMME EUR 5,73
+Geg. Mastercard EUR 5,73
+Nr.############1234
+A= 19,0% 0,21 0,04 0,25
+B= 7,0% 5,13 0,35 5,48
+Gesamtbetrag 5,34 0,39 5,73
+Datum: 12.03.2025 Uhrzeit: 18:42:13
+Vielen Dank für Ihren Einkauf
+"""
+
+
+def test_tokenize_receipt_classifies_lines() -> None:
+    receipt = tokenize_receipt(RECEIPT)
+    kinds = {line.text: line.kind for line in receipt.lines}
+
+    assert kinds["REWE Markt GmbH"] == LineKind.HEADER
+    assert kinds["HAFERMILCH BARISTA 2,49 B"] == LineKind.ITEM
+    assert kinds["PFAND 0,25 A"] == LineKind.ITEM
+    assert kinds["SUMME EUR 5,73"] == LineKind.TOTAL
+    assert kinds["Nr.############1234"] == LineKind.PAYMENT
+    assert kinds["A= 19,0% 0,21 0,04 0,25"] == LineKind.TAX
+    assert kinds["Vielen Dank für Ihren Einkauf"] == LineKind.FOOTER
+
+    assert receipt.lines[receipt.item_end].text.startswith("------")
+    assert all(line.kind != LineKind.ITEM for line in receipt.digit_lines)
+
+
+def test_tokenize_receipt_prematches_item_and_tax_lines() -> None:
+    receipt = tokenize_receipt(RECEIPT)
+
+    item = next(line for line in receipt.lines if line.text.startswith("KAESE"))
+    assert item.item is not None
+    assert item.item.group(2) == "2,99"
+
+    tax_line = next(line for line in receipt.lines if line.text.startswith("B="))
+    assert tax_line.tax == [("B", "7,0", "5,13", "0,35", "5,48")]
+
+
+def test_process_text_extracts_fields() -> None:
+    result = pdf_processor.process_text(RECEIPT)
+
+    assert result["store_name"] == "Rewe Markt Gmbh"
+    assert result["store_phone"] == "+49 821 123456"
+    assert str(result["total_amount"]) == "5.73"
+    assert str(result["tax_amount"]) == "0.39"
+    assert str(result["transaction_date"]) == "2025-03-12"
+    assert str(result["transaction_time"]) == "18:42:13"
+    assert set(result["tax_breakdown"]) == {"tax_a", "tax_b"}
+    assert [item["name"] for item in result["items"]][-1] == "KAESE GOUDA"
@@ -0,0 +1,45 @@
+import uuid
+
+from sqlmodel import Session
+
+from app import crud
+from app.models import ExtractedDataCreate, PDFDocument
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_document(
+    db: Session, owner_id: uuid.UUID | None = None
+) -> PDFDocument:
+    if owner_id is None:
+        owner_id = create_random_user(db).id
+    filename = f"{random_lower_string()}.pdf"
+    document = PDFDocument(
+        filename=filename,
+        original_filename=filename,
+        file_size=1024,
+        content_type="application/pdf",
+        file_path=f"uploads/pdfs/{owner_id}/{filename}",
+        owner_id=owner_id,
+    )
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    return document
+
+
+def create_processed_document(db: Session, owner_id: uuid.UUID) -> PDFDocument:
+    """Create a processed document with one extraction result."""
+    document = create_random_document(db, owner_id=owner_id)
+    assert document.id
+    crud.extracted_data.create(
+        db,
+        obj_in=ExtractedDataCreate(
+            document_id=document.id,
+            store_name="REWE",
+            total_amount=9.70,
+            items=[{"name": "BANANE", "price": 1.79}],
+        ),
+    )
+    crud.pdf_document.mark_as_processed(db, document_id=document.id)
+    return document
@@ -4,9 +4,7 @@ from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-import emails
 import jwt
-from jinja2 import Template
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
@@ -23,6 +21,10 @@ class EmailData:
 
 
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
+    # jinja2 and emails are only needed to send mail, which is off in most
+    # deployments, so they are imported when the first email is rendered
+    from jinja2 import Template
+
     template_str = (
         Path(__file__).parent / "email-templates" / "build" / template_name
     ).read_text()
@@ -38,6 +40,8 @@ def send_email(
 ) -> None:
     if not settings.emails_enabled:
         raise ValueError("no provided configuration for email variables")
+    import emails
+
     message = emails.Message(
         subject=subject,
         html=html_content,
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.db_pool import pool_stats
+from app.models.processing_job import JobStatus
+from app.services.document_processing import document_processing
+from app.services.extraction_engine import extraction_engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How often idle workers look for unprocessed documents without a job
+ORPHAN_SWEEP_INTERVAL_SECONDS = 60
+ORPHAN_SWEEP_BATCH_SIZE = 100
+
+
+def enqueue_orphans() -> int:
+    """Queue unprocessed documents that have no pending or running job."""
+    with Session(engine) as db:
+        documents = crud.pdf_document.get_unprocessed(db, limit=ORPHAN_SWEEP_BATCH_SIZE)
+        document_ids = [document.id for document in documents if document.id]
+        if not document_ids:
+            return 0
+        return crud.processing_job.enqueue_many(db, document_ids=document_ids)
+
+
+async def run_job(job_id: int, worker_id: str) -> None:
+    with Session(engine) as db:
+        job = crud.processing_job.get(db, id=job_id)
+        if not job:
+            return
+        try:
+            await document_processing.process_document(db, job.document_id)
+        except Exception as e:
+            logger.exception("Job %s for document %s failed", job.id, job.document_id)
+            db.rollback()
+            failed = crud.processing_job.fail(
+                db, job=job, worker_id=worker_id, error=str(e)
+            )
+            if failed is not None and failed.status == JobStatus.FAILED:
+                document_processing.mark_failed(db, job.document_id, str(e))
+            return
+        crud.processing_job.complete(db, job=job, worker_id=worker_id)
+
+
+async def run_worker(worker_id: str, stop: asyncio.Event) -> None:
+    batch_size = settings.PDF_WORKER_PROCESSES
+    last_sweep = 0.0
+
+    while not stop.is_set():
+        if time.monotonic() - last_sweep > ORPHAN_SWEEP_INTERVAL_SECONDS:
+            last_sweep = time.monotonic()
+            queued = enqueue_orphans()
+            if queued:
+                logger.info("Queued %s unprocessed documents", queued)
+            logger.info("Database pool: %s", pool_stats(engine))
+
+        with Session(engine) as db:
+            jobs = crud.processing_job.claim(db, worker_id=worker_id, limit=batch_size)
+            job_ids = [job.id for job in jobs if job.id]
+
+        if not job_ids:
+            try:
+                await asyncio.wait_for(
+                    stop.wait(), settings.PDF_WORKER_POLL_INTERVAL_SECONDS
+                )
+            except TimeoutError:
+                pass
+            continue
+
+        logger.info("Claimed jobs %s", job_ids)
+        await asyncio.gather(*(run_job(job_id, worker_id) for job_id in job_ids))
+
+
+async def run() -> None:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Worker %s started", worker_id)
+    # Every job holds a connection while its PDF is extracted
+    if settings.PDF_WORKER_PROCESSES > settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW:
+        logger.warning(
+            "PDF_WORKER_PROCESSES (%s) exceeds the database pool "
+            "(DB_POOL_SIZE + DB_MAX_OVERFLOW = %s); jobs will wait for connections",
+            settings.PDF_WORKER_PROCESSES,
+            settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+        )
+    try:
+        await run_worker(worker_id, stop)
+    finally:
+        extraction_engine.shutdown()
+        logger.info("Worker %s stopped", worker_id)
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()